@@ -10,7 +10,8 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    # numpy нужен только для Database(columnar=True), приложение его не использует
+    excludes=['numpy'],
     noarchive=False,
     optimize=0,
 )
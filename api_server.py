@@ -0,0 +1,365 @@
+"""
+Локальный JSON API над журналом для дашбордов и скриптов, без интерфейса.
+
+Сервер слушает только 127.0.0.1 (запуск: `SalaryTracker serve --port 8765`)
+и работает с организацией, текущей на момент запуска (или --org).
+
+    GET    /api/summary[?after=ГГГГ-ММ&limit=N]   сводка (целиком или страница)
+    GET    /api/total                              сумма всех записей
+    GET    /api/months/ГГГГ-ММ/records             записи месяца
+    GET    /api/months/ГГГГ-ММ/breakdown           суммы месяца по категориям
+    GET    /api/records/ID                         одна запись
+    POST   /api/records                            {"date", "amount", "category"}
+    PUT    /api/records/ID                         {"date", "amount", "category"}
+    DELETE /api/records/ID
+
+Чтения выполняются в пуле потоков размером с пул соединений профиля хранения;
+в WAL они не ждут запись. Все изменения идут через отдельный однопоточный
+исполнитель — единственного писателя. Повтор зарплаты/аванса в месяце
+отсекает уникальный индекс базы, сервер отвечает на него 409.
+
+Ответы GET несут ETag из Database.data_version: версия читается до запроса,
+поэтому под старым ETag никогда не оказываются новые данные. Перед этим
+Database.poll_changes() замечает коммиты интерфейса и других процессов —
+они тоже сдвигают версию и сбрасывают кэш чтения. На If-None-Match с текущей
+версией сервер отвечает 304 после одного PRAGMA data_version, не читая таблиц.
+"""
+import asyncio
+import json
+import re
+import secrets
+import sys
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
+from urllib.parse import parse_qs, urlsplit
+
+from async_database import AsyncDatabase
+from validation import DuplicateRecordError, RecordValidationError, validate_record
+
+if TYPE_CHECKING:
+    from database import Database
+
+HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BODY_BYTES = 1024 * 1024
+MAX_HEADERS = 100
+MAX_LINE_BYTES = 8 * 1024
+# ожидание следующего запроса на keep-alive соединении, секунд
+IDLE_TIMEOUT = 30.0
+MAX_PAGE_LIMIT = 1000
+# допустимые JSON-типы полей записи; отсутствующее поле (null) проверит validate_record
+FIELD_TYPES = {"date": (str,), "amount": (int, float, str), "category": (str,)}
+
+REASONS = {
+    200: "OK",
+    201: "Created",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    411: "Length Required",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    query: dict[str, list[str]]
+    headers: dict[str, str]
+    body: bytes = b""
+    params: dict[str, str] = field(default_factory=dict)
+
+    def json(self) -> dict[str, Any]:
+        try:
+            payload = json.loads(self.body or b"null")
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            raise ApiError(400, "Тело запроса — не JSON") from None
+        if not isinstance(payload, dict):
+            raise ApiError(400, "Ожидается JSON-объект")
+        return payload
+
+    def query_value(self, name: str) -> str | None:
+        values = self.query.get(name)
+        return values[-1] if values else None
+
+    @property
+    def keep_alive(self) -> bool:
+        return self.headers.get("connection", "").lower() != "close"
+
+
+Handler = Callable[[Request], Awaitable[tuple[int, Any]]]
+
+
+def _record_json(record) -> dict[str, Any]:
+    id_, date, amount, category = record
+    return {"id": id_, "date": date, "amount": amount, "category": category}
+
+
+class ApiServer:
+    def __init__(self, db: "Database", port: int = DEFAULT_PORT, read_workers: int | None = None):
+        self.db = db
+        self.port = port
+        self.reads = AsyncDatabase(db, max_workers=read_workers or db.storage_profile.pool_size)
+        # единственный писатель: изменения выполняются строго по одному и не спорят за блокировку SQLite
+        self.writes = AsyncDatabase(db, max_workers=1)
+        # ETag не совпадёт с выданным до перезапуска сервера, хотя data_version начнётся заново
+        self._instance = secrets.token_hex(4)
+        self._server: asyncio.Server | None = None
+        self._routes: list[tuple[str, re.Pattern, Handler, bool]] = [
+            ("GET", re.compile(r"/api/summary"), self._summary, True),
+            ("GET", re.compile(r"/api/total"), self._total, True),
+            ("GET", re.compile(r"/api/months/(?P<month>\d{4}-\d{2})/records"), self._month_records, True),
+            ("GET", re.compile(r"/api/months/(?P<month>\d{4}-\d{2})/breakdown"), self._breakdown, True),
+            ("GET", re.compile(r"/api/records/(?P<id>\d+)"), self._get_record, True),
+            ("POST", re.compile(r"/api/records"), self._add_record, False),
+            ("PUT", re.compile(r"/api/records/(?P<id>\d+)"), self._update_record, False),
+            ("DELETE", re.compile(r"/api/records/(?P<id>\d+)"), self._delete_record, False),
+        ]
+
+    @property
+    def url(self) -> str:
+        return f"http://{HOST}:{self.port}"
+
+    async def start(self):
+        self._server = await asyncio.start_server(
+            self._handle_connection, HOST, self.port, backlog=1024, limit=MAX_LINE_BYTES
+        )
+        # при port=0 система выбирает свободный порт
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        assert self._server is not None
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self.reads.close()
+        self.writes.close()
+
+    def etag(self, version: int) -> str:
+        return f'"{self._instance}-{version}"'
+
+    # --- HTTP ---
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), IDLE_TIMEOUT)
+                except ApiError as e:
+                    await self._send(writer, e.status, {"error": str(e)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                status, payload, headers = await self._dispatch(request)
+                await self._send(writer, status, payload, headers, keep_alive=request.keep_alive)
+                if not request.keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Request | None:
+        try:
+            line = await reader.readline()
+        except ValueError:
+            raise ApiError(400, "Слишком длинная строка запроса") from None
+        if not line:
+            return None
+        try:
+            method, target, _version = line.decode("latin-1").split()
+        except ValueError:
+            raise ApiError(400, "Некорректная строка запроса") from None
+
+        headers: dict[str, str] = {}
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                raise ApiError(400, "Слишком длинный заголовок") from None
+            if line in (b"\r\n", b"\n", b""):
+                break
+            if len(headers) >= MAX_HEADERS:
+                raise ApiError(400, "Слишком много заголовков")
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if "transfer-encoding" in headers:
+            raise ApiError(411, "Нужен Content-Length")
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise ApiError(400, "Некорректный Content-Length") from None
+        if length > MAX_BODY_BYTES:
+            raise ApiError(413, "Слишком большое тело запроса")
+        body = await reader.readexactly(length) if length > 0 else b""
+
+        parts = urlsplit(target)
+        return Request(method.upper(), parts.path.rstrip("/") or "/", parse_qs(parts.query), headers, body)
+
+    async def _dispatch(self, request: Request) -> tuple[int, Any, dict[str, str]]:
+        allowed = []
+        for method, pattern, handler, versioned in self._routes:
+            match = pattern.fullmatch(request.path)
+            if match is None:
+                continue
+            if method != request.method:
+                allowed.append(method)
+                continue
+            request.params = match.groupdict()
+            try:
+                if not versioned:
+                    status, payload = await handler(request)
+                    return status, payload, {}
+                # чужие коммиты (интерфейс, другой процесс) сдвигают data_version и сбрасывают кэш;
+                # версия читается до запроса: данные в ответе не старше неё
+                await self.reads.poll_changes()
+                etag = self.etag(self.db.data_version)
+                if etag in request.headers.get("if-none-match", ""):
+                    return 304, None, {"ETag": etag}
+                status, payload = await handler(request)
+                return status, payload, {"ETag": etag} if status == 200 else {}
+            except ApiError as e:
+                return e.status, {"error": str(e)}, {}
+            except Exception as e:
+                print(f"api: {request.method} {request.path}: {e!r}", file=sys.stderr)
+                return 500, {"error": "Внутренняя ошибка сервера"}, {}
+        if allowed:
+            return 405, {"error": "Метод не поддерживается"}, {"Allow": ", ".join(allowed)}
+        return 404, {"error": "Нет такого адреса"}, {}
+
+    async def _send(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        payload: Any,
+        headers: dict[str, str] | None = None,
+        keep_alive: bool = True,
+    ):
+        body = b"" if status == 304 else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}"]
+        if status != 304:
+            lines.append("Content-Type: application/json; charset=utf-8")
+        lines += [
+            f"Content-Length: {len(body)}",
+            "Cache-Control: no-cache",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    # --- чтение ---
+
+    async def _summary(self, request: Request) -> tuple[int, Any]:
+        after = request.query_value("after")
+        limit = request.query_value("limit")
+        if after is None and limit is None:
+            rows = await self.reads.get_monthly_summary()
+        else:
+            try:
+                limit_value = int(limit) if limit is not None else 100
+            except ValueError:
+                raise ApiError(400, "limit должен быть числом") from None
+            if not 1 <= limit_value <= MAX_PAGE_LIMIT:
+                raise ApiError(400, f"limit должен быть от 1 до {MAX_PAGE_LIMIT}")
+            rows = await self.reads.get_monthly_summary_page(after, limit_value)
+        return 200, [{"month": month, "total": total, "total_for_display": shown} for month, total, shown in rows]
+
+    async def _total(self, request: Request) -> tuple[int, Any]:
+        return 200, {"total": await self.reads.get_grand_total()}
+
+    async def _month_records(self, request: Request) -> tuple[int, Any]:
+        records = await self.reads.get_records_by_month(request.params["month"])
+        return 200, [_record_json(record) for record in records]
+
+    async def _breakdown(self, request: Request) -> tuple[int, Any]:
+        return 200, await self.reads.get_monthly_breakdown(request.params["month"])
+
+    async def _get_record(self, request: Request) -> tuple[int, Any]:
+        record = await self.reads.get_record_by_id(int(request.params["id"]))
+        if record is None:
+            raise ApiError(404, "Запись не найдена")
+        return 200, _record_json(record)
+
+    # --- запись (только в потоке писателя) ---
+
+    def _validated(self, request: Request) -> tuple[str, float, str]:
+        payload = request.json()
+        for name, types in FIELD_TYPES.items():
+            value = payload.get(name)
+            # bool — подкласс int, но суммой не считается
+            if value is not None and (isinstance(value, bool) or not isinstance(value, types)):
+                raise ApiError(400, f"Поле {name} имеет неверный тип")
+        try:
+            date, amount, category, _month = validate_record(
+                payload.get("date"), payload.get("amount"), payload.get("category") or "other"
+            )
+        except RecordValidationError as e:
+            raise ApiError(400, str(e)) from None
+        return date, amount, category
+
+    def _add_record_sync(self, request: Request) -> tuple[int, Any]:
+        date, amount, category = self._validated(request)
+        try:
+            changes = self.db.add_record(date, amount, category)
+        except DuplicateRecordError as e:
+            raise ApiError(409, str(e)) from None
+        return 201, _record_json(changes.inserted[0])
+
+    def _update_record_sync(self, request: Request) -> tuple[int, Any]:
+        record_id = int(request.params["id"])
+        date, amount, category = self._validated(request)
+        try:
+            changes = self.db.update_record(record_id, date, amount, category)
+        except DuplicateRecordError as e:
+            raise ApiError(409, str(e)) from None
+        if not changes.updated:
+            raise ApiError(404, "Запись не найдена")
+        return 200, _record_json(changes.updated[0])
+
+    def _delete_record_sync(self, request: Request) -> tuple[int, Any]:
+        record_id = int(request.params["id"])
+        if not self.db.delete_record_by_id(record_id).removed:
+            raise ApiError(404, "Запись не найдена")
+        return 200, {"deleted": record_id}
+
+    async def _add_record(self, request: Request) -> tuple[int, Any]:
+        return await self.writes.call(self._add_record_sync, request)
+
+    async def _update_record(self, request: Request) -> tuple[int, Any]:
+        return await self.writes.call(self._update_record_sync, request)
+
+    async def _delete_record(self, request: Request) -> tuple[int, Any]:
+        return await self.writes.call(self._delete_record_sync, request)
+
+
+async def serve(db: "Database", port: int = DEFAULT_PORT):
+    """Запускает сервер и работает до отмены (Ctrl+C)."""
+    server = ApiServer(db, port)
+    await server.start()
+    print(f"API: {server.url}/api/summary (Ctrl+C — остановить)", file=sys.stderr)
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
@@ -0,0 +1,16 @@
+# app/messages.py
+from textual.message import Message
+
+
+class ExternalDataChanged(Message):
+    """
+    Записи изменил другой процесс (второй экземпляр приложения, импорт из
+    консоли). Приложение рассылает сообщение открытым экранам; months —
+    затронутые месяцы "YYYY-MM".
+    """
+
+    bubble = False
+
+    def __init__(self, months: frozenset[str]):
+        super().__init__()
+        self.months = months
@@ -1,20 +1,35 @@
+from textual import events, work
 from textual.app import App
+from textual.binding import Binding
 from textual._on import on
 from textual.widgets import Header, Footer, Button, DataTable, Static
 from textual.containers import Horizontal, Vertical
 from textual.coordinate import Coordinate
+from textual.worker import get_current_worker
 
+import time
 from datetime import datetime
+from typing import TYPE_CHECKING, Callable
 
+# экраны импортируются при первом открытии: до первого кадра нужен только главный экран
+from .messages import ExternalDataChanged
+from .widgets.paged_table import PagedDataTable
 
-from .screens.input_dialog import InputDialog
-from .screens.question_dialog import QuestionDialog
-from .screens.org_settings_screen import OrgSettingsScreen
-from .screens.about_screen import AboutScreen
-from .screens.add_record_dialog import AddRecordDialog
-from .screens.month_records_screen import MonthRecordsScreen
+from async_database import AsyncDatabase
+from profiler import profiled
+from update_check import UpdateChecker, UpdateCheckError
 
-from database import Database
+# фоновая проверка обновлений стартует, когда главный экран уже загружен
+UPDATE_CHECK_DELAY = 2.0
+# резервная копия и обслуживание базы (maintenance) — только после паузы во вводе
+MAINTENANCE_POLL = 60.0
+MAINTENANCE_IDLE = 120.0
+# изменения базы другими процессами; пока их нет, проверка — один PRAGMA data_version
+CHANGE_POLL = 1.0
+
+if TYPE_CHECKING:
+    from database import ChangeSet, Database
+    from startup import StartupReport
 
 
 class SalaryApp(App):
@@ -23,15 +38,37 @@ class SalaryApp(App):
         ("m", "toggle_dark", "Поменять тему"),
         ("q", "request_quit", "Выйти"),
         ("i", "result_financess", "Всего"),
+        ("p", "open_periods", "Периоды"),
         ("n", "open_settings", "Настройки"),
+        ("g", "switch_org", "Организация"),
+        ("o", "open_import", "Импорт"),
+        ("e", "open_export", "Экспорт"),
         # ("c", "change", "Изменить"),
         # ('a', 'add', "Добавить"),
-        ('u', 'open_about', 'О версии')
+        ('u', 'open_about', 'О версии'),
+        Binding("f9", "open_profiler", "Профилировщик", show=False),
     ]
 
-    def __init__(self, db: Database):
+    def __init__(self, db: "Database | Callable[[], Database]", startup: "StartupReport | None" = None):
+        """
+        db — готовый Database или фабрика: тогда база открывается в пуле
+        AsyncDatabase при первом запросе, уже после первого кадра.
+        startup — замер холодного старта (main.py --startup-report): приложение
+        закрывается после первого кадра и первой страницы сводки.
+        """
         super().__init__()
-        self.db = db
+        # экраны читают и пишут через adb в воркерах, чтобы не блокировать event loop
+        self.adb = AsyncDatabase(db)
+        self.startup = startup
+        # один httpx-клиент на все проверки обновлений; не чаще раза в UPDATE_CHECK_TTL
+        self.update_checker = UpdateChecker()
+        self._last_input = time.monotonic()
+        self._maintaining = False
+        self._polling = False
+
+    @property
+    def db(self) -> "Database":
+        return self.adb.db
 
     def compose(self):
         yield Header()
@@ -44,81 +81,230 @@ class SalaryApp(App):
                 Button("Настройки", variant="primary", id="settings"),
                 classes="buttons_panel"
             ),
-            DataTable(id="salary_app_table",classes="salaries_list")
+            PagedDataTable(id="salary_app_table",classes="salaries_list")
         )
         yield Footer()
 
     def on_mount(self):
         self.title = "Доходы"
-        table = self.query_one(DataTable)
+        table = self.query_one(PagedDataTable)
         table.add_columns("Месяц", "Сумма", "Итого за месяц")
         table.cursor_type = "row"
         table.zebra_stripes = True
-        self._update_subtitle()
-        self._load_monthly_view()
+        table.set_source(
+            fetch_page=lambda after, limit: self.adb.get_monthly_summary_page(after, limit),
+            format_row=lambda r: (r[0], (r[0], f"{r[1]:,.2f} ₽", f"{r[2]:,.2f} ₽")),
+            cursor_of=lambda r: r[0],
+        )
+        if self.startup is not None:
+            self.call_after_refresh(self._startup_stage, "первый кадр")
+        # база открывается (и SQLAlchemy импортируется) в пуле уже после первого кадра,
+        # чтобы не отнимать GIL у отрисовки
+        self.call_after_refresh(self._load_monthly_view)
+        self.call_after_refresh(self._open_initial_setup)
+        if self.startup is None:
+            self.set_timer(UPDATE_CHECK_DELAY, self._check_updates_in_background)
+            self.set_interval(MAINTENANCE_POLL, self._maybe_maintain)
+            self.set_interval(CHANGE_POLL, self._poll_changes)
+
+    @on(PagedDataTable.Loaded, "#salary_app_table")
+    def _on_summary_loaded(self):
+        if self.startup is not None:
+            self._startup_stage("первая страница сводки")
+
+    def _startup_stage(self, stage: str):
+        assert self.startup is not None
+        self.startup.mark(stage)
+        done = {name for name, _ in self.startup.marks}
+        if {"первый кадр", "первая страница сводки"} <= done:
+            self.exit()
 
-        if not self.db.get_organization_name():
+    @work(exclusive=True, group="subtitle")
+    async def _open_initial_setup(self):
+        from .screens.org_settings_screen import OrgSettingsScreen
+
+        if not await self.adb.get_organization_name():
             self.sub_title = "Первоначальная настройка"
             self.push_screen(OrgSettingsScreen())
         else:
             self._update_subtitle()
-            self._load_monthly_view()
 
+    @work(exclusive=True, group="update-check")
+    async def _check_updates_in_background(self):
+        """Ошибки сети молча пропускаются: повторит окно "О версии" или следующий запуск."""
+        try:
+            check = await self.update_checker.check()
+        except UpdateCheckError:
+            return
+        if check.is_newer():
+            self.notify(f"Доступна новая версия {check.latest_version} (u — О версии)", severity="information")
+
+    async def on_event(self, event: events.Event) -> None:
+        if isinstance(event, (events.Key, events.MouseDown, events.MouseScrollDown, events.MouseScrollUp)):
+            self._last_input = time.monotonic()
+        await super().on_event(event)
+
+    def _maybe_maintain(self):
+        if not self._maintaining and time.monotonic() - self._last_input >= MAINTENANCE_IDLE:
+            self._maintaining = True
+            self._run_maintenance()
+
+    @work(thread=True, group="maintenance", exit_on_error=False)
+    def _run_maintenance(self):
+        """Просроченные копия и компактизация; backup API идёт шагами и не блокирует базу."""
+        import sqlite3
+
+        import maintenance
+
+        worker = get_current_worker()
+        try:
+            reports = maintenance.run_due(self.db, cancelled=lambda: worker.is_cancelled)
+        except maintenance.MaintenanceCancelled:
+            return
+        except (OSError, sqlite3.Error) as e:
+            self.call_from_thread(self.notify, f"Обслуживание базы не удалось: {e}", severity="warning")
+            return
+        finally:
+            self._maintaining = False
+        for report in reports:
+            self.call_from_thread(self.notify, report.describe(), severity="information")
+
+    @work(group="change-poll")
+    async def _poll_changes(self):
+        """Переносит в сводку и открытые экраны месяцы, изменённые другим процессом."""
+        # не exclusive: отменённая проверка уже сдвинула снимок, и её изменения потерялись бы
+        if self._polling:
+            return
+        self._polling = True
+        try:
+            change = await self.adb.poll_changes()
+        finally:
+            self._polling = False
+        if change is None:
+            return
+        self.apply_changes(change.changes)
+        for screen in self.screen_stack:
+            screen.post_message(ExternalDataChanged(change.months))
+
+    async def on_unmount(self):
+        self.adb.close()
+        await self.update_checker.aclose()
+
+    @profiled("ui.SalaryApp._load_monthly_view")
     def _load_monthly_view(self):
-        table = self.query_one(DataTable)
-        table.clear()
-        for month, total, total_for_display in self.db.get_monthly_summary():
-            table.add_row(month, f"{total:,.2f} ₽", f"{total_for_display:,.2f} ₽", key=month)
-
-    def _update_subtitle(self):
-        org = self.db.get_organization_name() or ""
-        start = self.db.get_start_date() or ""
-        end = self.db.get_end_date()
+        self.query_one(PagedDataTable).reload()
+
+    def apply_changes(self, changes: "ChangeSet"):
+        """Обновляет в сводке только затронутые месяцы."""
+        table = self.query_one("#salary_app_table", PagedDataTable)
+        for month in changes.summary_removed:
+            table.discard_row(month)
+        for row in changes.summary_updated:
+            table.apply_row(row)
+
+    @work(exclusive=True, group="subtitle")
+    async def _update_subtitle(self):
+        settings = await self.adb.get_settings()
+        org = settings.org_name or ""
+        start = settings.start_date or ""
+        end = settings.end_date
         period = f" ({start} — наст. вр.)" if start and not end else f" ({start} — {end})" if start else ""
         self.sub_title = f"Финансовая история {org}{period}"
     
     def action_request_quit(self):
+        from .screens.question_dialog import QuestionDialog
+
         def check_answer(accepted):
             if accepted:
                 self.exit()
         self.push_screen(QuestionDialog('Вы действительно хотите выйти ?'),check_answer)
 
-    def action_result_financess(self):
-        total = 0.0
-        for _, _, amount, _ in self.db.get_all_records():
-            total += amount
+    @work(exclusive=True, group="grand-total")
+    async def action_result_financess(self):
+        total = await self.adb.get_grand_total()
         self.notify(f"Всего заработано по организации: {total:,.2f} ₽", severity="information")
 
     def action_setting_screen(self):
+        from .screens.org_settings_screen import OrgSettingsScreen
+
         self.push_screen(OrgSettingsScreen())
 
                 
 
     @on(Button.Pressed, "#add")
     def action_add(self):
+        self._add_record()
+
+    @work(exclusive=True, group="add-record")
+    async def _add_record(self):
+        from .screens.add_record_dialog import AddRecordDialog
+
         today_year = datetime.today().year
-        def handle_result(result):
-            if result:
-                self.db.add_record(result["date"], result["amount"], result["category"])
-                self._load_monthly_view()
+        result = await self.push_screen_wait(AddRecordDialog(month_prefix=today_year))
+        if result:
+            from validation import DuplicateRecordError
 
-        self.push_screen(AddRecordDialog(month_prefix=today_year), handle_result)
+            try:
+                changes = await self.adb.add_record(result["date"], result["amount"], result["category"])
+            except DuplicateRecordError as e:
+                self.notify(str(e), severity="error")
+                return
+            self.apply_changes(changes)
 
     @on(DataTable.RowSelected, "#salary_app_table")
     def on_month_selected(self, event):
-        month = event.row_key.value
+        from .screens.month_records_screen import MonthRecordsScreen
 
-        def after_month_screen(result):
-            if result is True:
-                self._load_monthly_view()
-
-        self.push_screen(MonthRecordsScreen(month), after_month_screen)
+        month = event.row_key.value
+        # изменения в записях месяца экран применяет к сводке сам, через apply_changes
+        self.push_screen(MonthRecordsScreen(month))
     
 
 
     @on(Button.Pressed, "#settings")
     def action_open_settings(self):
+        from .screens.org_settings_screen import OrgSettingsScreen
+
         self.push_screen(OrgSettingsScreen())
 
+    @work(exclusive=True, group="switch-org")
+    async def action_switch_org(self):
+        from .screens.org_switch_screen import OrgSwitchScreen
+
+        current = await self.adb.call(lambda: self.db.org_id)
+        org_id = await self.push_screen_wait(OrgSwitchScreen(current))
+        if org_id is None or org_id == current:
+            return
+        await self.adb.switch_organization(org_id)
+        # сводка перечитывается целиком: данные другой организации лежат в своём диапазоне индекса
+        self._load_monthly_view()
+        self._open_initial_setup()
+
+    def action_open_import(self):
+        from .screens.import_screen import ImportScreen
+
+        def after_import(imported):
+            if imported:
+                self._load_monthly_view()
+
+        self.push_screen(ImportScreen(), after_import)
+
+    def action_open_export(self):
+        from .screens.export_screen import ExportScreen
+
+        self.push_screen(ExportScreen())
+
     def action_open_about(self):
-        self.push_screen(AboutScreen())
\ No newline at end of file
+        from .screens.about_screen import AboutScreen
+
+        self.push_screen(AboutScreen())
+
+    def action_open_periods(self):
+        from .screens.periods_screen import PeriodsScreen
+
+        self.push_screen(PeriodsScreen())
+
+    def action_open_profiler(self):
+        from .screens.profiler_screen import ProfilerScreen
+
+        self.push_screen(ProfilerScreen())
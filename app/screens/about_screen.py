@@ -1,15 +1,17 @@
 # app/screens/about_screen.py
+from datetime import datetime
+from typing import TYPE_CHECKING
+
 from textual.screen import ModalScreen
 from textual.containers import Grid
 from textual.widgets import Button, Label
 from textual import work
-import webbrowser
-import httpx
-from app.constants import APP_NAME, APP_VERSION, GITHUB_REPO
+from app.constants import APP_NAME, APP_VERSION
+from update_check import GITHUB_RELEASES_PAGE, ReleaseCheck, UpdateCheckError
+
+if TYPE_CHECKING:
+    from salary_app import SalaryApp
 
-# 🔴 ИСПРАВЛЕНО: УБРАНЫ ПРОБЕЛЫ В URL!
-GITHUB_API_URL = f"https://api.github.com/repos/{GITHUB_REPO}/releases/latest"
-GITHUB_RELEASES_PAGE = f"https://github.com/{GITHUB_REPO}/releases"
 
 class AboutScreen(ModalScreen):
     DEFAULT_CSS = """
@@ -44,6 +46,10 @@ class AboutScreen(ModalScreen):
     }
     """
 
+    @property
+    def app(self) -> "SalaryApp":
+        return super().app  # type: ignore
+
     def compose(self):
         yield Grid(
             Label(f"{APP_NAME} v{APP_VERSION}", id="about-title"),
@@ -57,43 +63,48 @@ class AboutScreen(ModalScreen):
             id="about-dialog"
         )
 
+    def on_mount(self):
+        # сразу показываем сохранённый результат, а устаревший кэш перепроверяем в фоне
+        cached = self.app.update_checker.cached()
+        if cached is not None:
+            self._show(cached)
+        self.check_updates(force=False)
+
+    def _show(self, check: ReleaseCheck):
+        checked = datetime.fromtimestamp(check.checked_at).strftime("%d.%m.%Y %H:%M")
+        status = self.query_one("#update-status", Label)
+        if check.is_newer(APP_VERSION):
+            status.update(f"[green]Доступна новая версия: {check.latest_version}[/]\n[dim]проверено {checked}[/]")
+            self.query_one("#open", Button).disabled = False
+        else:
+            status.update(f"[dim]У вас последняя версия\nпроверено {checked}[/]")
+
     def on_button_pressed(self, event: Button.Pressed):
         if event.button.id == "close":
             self.dismiss()
         elif event.button.id == "open":
+            import webbrowser
+
             webbrowser.open(GITHUB_RELEASES_PAGE)
         elif event.button.id == "check":
-            self.check_updates()
+            self.check_updates(force=True)
 
-    @work
-    async def check_updates(self):
+    @work(exclusive=True, group="about-update-check")
+    async def check_updates(self, force: bool):
+        """force=False — только если кэш устарел; "Проверить" перепроверяет условным запросом."""
+        checker = self.app.update_checker
         status = self.query_one("#update-status", Label)
         check_btn = self.query_one("#check", Button)
-        open_btn = self.query_one("#open", Button)
+        shown = checker.cached() is not None
 
         try:
             check_btn.disabled = True
-            status.update("Проверка...")
-            async with httpx.AsyncClient(timeout=8.0) as client:
-                resp = await client.get(GITHUB_API_URL)
-                resp.raise_for_status()
-                latest = resp.json()
-                latest_tag = latest["tag_name"].lstrip("v")
-                current = APP_VERSION.lstrip("v")
-
-                if latest_tag != current:
-                    status.update(f"[green]Доступна новая версия: {latest_tag}[/]")
-                    open_btn.disabled = False
-                else:
-                    status.update("[dim]У вас последняя версия[/]")
-        except (httpx.ConnectTimeout, httpx.NetworkError):
-            status.update("[red]Нет подключения к интернету[/]")
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 404:
-                status.update("[red]Репозиторий не найден (404)[/]")
-            else:
-                status.update(f"[red]Ошибка GitHub: {e.response.status_code}[/]")
-        except Exception as e:
-            status.update(f"[red]Ошибка: {type(e).__name__}[/]")
+            if force or not shown:
+                status.update("Проверка...")
+            self._show(await checker.check(force=force))
+        except UpdateCheckError as e:
+            if force or not shown:
+                status.update(f"[red]{e}[/]")
+            # иначе остаётся прошлый результат из кэша
         finally:
-            check_btn.disabled = False
\ No newline at end of file
+            check_btn.disabled = False
@@ -4,10 +4,15 @@ if TYPE_CHECKING:
     from salary_app import SalaryApp
 
 
+from textual import work
 from textual.widgets import Button, Label, Input, Checkbox, Static, Rule
 from textual.containers import Grid, Horizontal
 from textual.screen import ModalScreen
 
+from database import format_month, month_number
+from profiler import profiled
+from validation import ONCE_PER_MONTH, RecordValidationError, duplicate_message, validate_record
+
 class AddRecordDialog(ModalScreen):
     @property
     def app(self) -> "SalaryApp":
@@ -67,10 +72,20 @@ class AddRecordDialog(ModalScreen):
 
     def on_mount(self):
         if self.month_prefix and not self.is_edit:
-            if self.app.db.has_salary_or_advance_in_month(self.month_prefix, "salary"):
-                self.query_one("#chk_salary", Checkbox).disabled = True
-            if self.app.db.has_salary_or_advance_in_month(self.month_prefix, "advance"):
-                self.query_one("#chk_advance", Checkbox).disabled = True
+            self._load_month_status()
+
+    @work(exclusive=True, group="add-record-status")
+    @profiled("ui.AddRecordDialog._load_month_status")
+    async def _load_month_status(self):
+        """Блокирует зарплату/аванс, если они уже есть в месяце; пока идёт запрос, чекбоксы недоступны."""
+        checkboxes = self.query_one("#add_record_checkboxs", Horizontal)
+        checkboxes.loading = True
+        try:
+            taken = await self.app.adb.get_month_status(self.month_prefix)
+        finally:
+            checkboxes.loading = False
+        self.query_one("#chk_salary", Checkbox).disabled = "salary" in taken
+        self.query_one("#chk_advance", Checkbox).disabled = "advance" in taken
 
     def _sync_checkboxes(self, changed_id: str):
         """Снимает галочки со всех, кроме changed_id"""
@@ -85,6 +100,30 @@ class AddRecordDialog(ModalScreen):
         if checkbox.value and checkbox.id is not None:
             self._sync_checkboxes(checkbox.id)
 
+    @work(exclusive=True, group="add-record-save")
+    async def _save(self, result: dict, month: int):
+        """
+        Предупреждает о повторе зарплаты/аванса, пока введённое ещё не потеряно, и закрывает
+        диалог с результатом. Окончательно правило проверяет уникальный индекс при записи.
+        """
+        save_button = self.query_one("#add_record_save", Button)
+        category = result["category"]
+        # запись, которая уже была зарплатой/авансом этого месяца, не конфликтует сама с собой
+        # (месяц сравнивается числом: дата вида "2024-3-5" тоже корректна)
+        unchanged = self.is_edit and self.record is not None and (
+            month_number(self.record[1]), self.record[3]
+        ) == (month, category)
+        if category in ONCE_PER_MONTH and not unchanged:
+            save_button.disabled = True
+            try:
+                taken = category in await self.app.adb.get_month_status(format_month(month))
+            finally:
+                save_button.disabled = False
+            if taken:
+                self.notify(duplicate_message(category), severity="error")
+                return
+        self.dismiss(result)
+
     def on_button_pressed(self, event):
         if event.button.id == "add_record_save":
             date = self.query_one("#date", Input).value.strip()
@@ -99,24 +138,10 @@ class AddRecordDialog(ModalScreen):
             elif self.query_one("#chk_other", Checkbox).value:
                 category = "other"
 
-            if not date or not amount_str:
-                self.notify("Заполните все поля", severity="error")
-                return
-
             try:
-                amount = float(amount_str)
-                if amount <= 0:
-                    raise ValueError
-            except ValueError:
-                self.notify("Сумма должна быть положительным числом", severity="error")
-                return
-
-            try:
-                from datetime import datetime
-                dt = datetime.strptime(date, "%Y-%m-%d")
-                year_month = dt.strftime("%Y-%m")
-            except ValueError:
-                self.notify("Неверный формат даты (используйте ГГГГ-ММ-ДД)", severity="error")
+                date, amount, category, month = validate_record(date, amount_str, category)
+            except RecordValidationError as e:
+                self.notify(str(e), severity="error")
                 return
 
             result = {
@@ -125,18 +150,12 @@ class AddRecordDialog(ModalScreen):
                 "category": category
             }
 
-            if category in ("salary", "advance"):
-                if self.app.db.has_salary_or_advance_in_month(year_month, category):
-                    cat_name = "зарплата" if category == "salary" else "аванс"
-                    self.notify(f"В этом месяце уже есть запись '{cat_name}'. Нельзя добавить вторую.", severity="error")
-                    return
-
-            
             if self.is_edit:
                 assert self.record is not None
                 result["id"] = self.record[0]
-            self.dismiss(result)
+            self._save(result, month)
         elif event.button.id == "add_record_cancel":
+            self.workers.cancel_group(self, "add-record-save")
             self.dismiss(None)
         elif event.button.id == "delete_record":
             assert self.record is not None
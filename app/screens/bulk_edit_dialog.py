@@ -0,0 +1,109 @@
+# app/screens/bulk_edit_dialog.py
+from textual.containers import Grid, Horizontal
+from textual.screen import ModalScreen
+from textual.widgets import Button, Input, Label, RadioButton, RadioSet
+
+from validation import RecordValidationError, parse_amount
+
+# порядок кнопок RadioSet: "не менять" и категории
+CATEGORY_CHOICES = (None, "salary", "advance", "other")
+
+
+class BulkEditDialog(ModalScreen[dict | None]):
+    """
+    Что сделать с отмеченными записями месяца: задать им сумму и/или категорию
+    или удалить. Возвращает {"action": "update", "amount": float | None,
+    "category": str | None}, {"action": "delete"} или None при отмене.
+    """
+
+    DEFAULT_CSS = """
+    BulkEditDialog {
+        align: center middle;
+    }
+    #bulk-edit-dialog {
+        grid-size: 1;
+        grid-rows: auto auto auto auto auto;
+        grid-gutter: 1;
+        padding: 1 2;
+        width: 70;
+        height: auto;
+        border: thick $primary;
+        background: $surface;
+    }
+    #bulk-edit-amount-row {
+        height: auto;
+    }
+    #bulk-edit-amount-row Label {
+        width: 10;
+        padding: 1 0;
+    }
+    #bulk-edit-amount {
+        width: 1fr;
+    }
+    #bulk-edit-category {
+        width: 100%;
+        layout: horizontal;
+    }
+    #bulk-edit-buttons {
+        height: auto;
+        align: center middle;
+    }
+    """
+
+    def __init__(self, count: int, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count = count
+
+    def compose(self):
+        yield Grid(
+            Label(f"Отмечено записей: {self.count}", id="bulk-edit-title"),
+            Horizontal(
+                Label("Сумма:"),
+                Input(placeholder="не менять", id="bulk-edit-amount"),
+                id="bulk-edit-amount-row",
+            ),
+            RadioSet(
+                RadioButton("Не менять", value=True),
+                RadioButton("Зарплата"),
+                RadioButton("Аванс"),
+                RadioButton("Другое"),
+                id="bulk-edit-category",
+            ),
+            Horizontal(
+                Button("Отмена", variant="warning", id="bulk-edit-cancel"),
+                Button("Удалить", variant="error", id="bulk-edit-delete"),
+                Button("Применить", variant="success", id="bulk-edit-apply"),
+                id="bulk-edit-buttons",
+            ),
+            id="bulk-edit-dialog",
+        )
+
+    def _apply(self):
+        amount_str = self.query_one("#bulk-edit-amount", Input).value.strip()
+        try:
+            amount = parse_amount(amount_str) if amount_str else None
+        except RecordValidationError as e:
+            self.notify(str(e), severity="error")
+            return
+        pressed = self.query_one("#bulk-edit-category", RadioSet).pressed_index
+        category = CATEGORY_CHOICES[pressed] if pressed >= 0 else None
+        if amount is None and category is None:
+            self.notify("Укажите сумму или категорию", severity="warning")
+            return
+        self.dismiss({"action": "update", "amount": amount, "category": category})
+
+    def on_button_pressed(self, event: Button.Pressed):
+        if event.button.id == "bulk-edit-apply":
+            self._apply()
+        elif event.button.id == "bulk-edit-delete":
+            self.dismiss({"action": "delete"})
+        elif event.button.id == "bulk-edit-cancel":
+            self.dismiss(None)
+
+    def on_input_submitted(self, event: Input.Submitted):
+        self._apply()
+
+    def on_key(self, event):
+        if event.key == "escape":
+            self.dismiss(None)
+            event.stop()
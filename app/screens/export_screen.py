@@ -0,0 +1,115 @@
+# app/screens/export_screen.py
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from salary_app import SalaryApp
+
+from pathlib import Path
+
+from rich.markup import escape
+from sqlalchemy.exc import SQLAlchemyError
+from textual import work
+from textual.containers import Grid, Horizontal
+from textual.screen import ModalScreen
+from textual.widgets import Button, Input, Label, ProgressBar, RadioButton, RadioSet
+
+from exporter import export_ledger
+
+
+class ExportScreen(ModalScreen):
+    DEFAULT_CSS = """
+    ExportScreen {
+        align: center middle;
+    }
+    #export-dialog {
+        grid-size: 1;
+        grid-gutter: 1;
+        padding: 1 2;
+        width: 80;
+        height: auto;
+        border: thick $primary;
+        background: $surface;
+    }
+    #export-title {
+        text-align: center;
+        text-style: bold;
+        width: 100%;
+    }
+    #export-format {
+        layout: horizontal;
+        width: 100%;
+    }
+    #export-progress {
+        width: 100%;
+    }
+    #export-buttons {
+        height: auto;
+        align: center middle;
+    }
+    #export-buttons Button {
+        width: auto;
+        margin: 0 1;
+    }
+    """
+
+    FORMATS = {"export-csv": "csv", "export-jsonl": "jsonl", "export-sqlite": "sqlite"}
+
+    @property
+    def app(self) -> "SalaryApp":
+        return super().app  # type: ignore
+
+    def compose(self):
+        yield Grid(
+            Label("Экспорт записей и сводки по месяцам", id="export-title"),
+            Input(placeholder="Путь к файлу", id="export-path"),
+            RadioSet(
+                RadioButton("CSV", id="export-csv", value=True),
+                RadioButton("JSON Lines", id="export-jsonl"),
+                RadioButton("Снимок SQLite", id="export-sqlite"),
+                id="export-format",
+            ),
+            ProgressBar(id="export-progress", show_eta=True),
+            Label("", id="export-status"),
+            Horizontal(
+                Button("Экспорт", variant="success", id="export-start"),
+                Button("Закрыть", variant="default", id="export-close"),
+                id="export-buttons",
+            ),
+            id="export-dialog",
+        )
+
+    def on_button_pressed(self, event: Button.Pressed):
+        if event.button.id == "export-start":
+            raw_path = self.query_one("#export-path", Input).value.strip()
+            if not raw_path:
+                self.notify("Укажите путь к файлу", severity="error")
+                return
+            pressed = self.query_one("#export-format", RadioSet).pressed_button
+            fmt = self.FORMATS[pressed.id] if pressed is not None and pressed.id else "csv"
+            self.query_one("#export-start", Button).disabled = True
+            self.query_one("#export-status", Label).update("Экспорт...")
+            self.run_export(Path(raw_path).expanduser(), fmt)
+        elif event.button.id == "export-close":
+            self.dismiss()
+
+    @work(thread=True, exclusive=True)
+    def run_export(self, path: Path, fmt: str):
+        progress_bar = self.query_one("#export-progress", ProgressBar)
+
+        def on_progress(done: int, total: int):
+            self.app.call_from_thread(progress_bar.update, total=max(total, 1), progress=done)
+
+        try:
+            written = export_ledger(self.app.db, path, fmt, progress=on_progress)
+        except (OSError, SQLAlchemyError) as e:
+            self.app.call_from_thread(self._show_status, f"[red]Ошибка экспорта: {escape(str(e))}[/]")
+            return
+        self.app.call_from_thread(self._show_status, escape(f"Выгружено записей: {written} → {path}"))
+
+    def _show_status(self, message: str):
+        self.query_one("#export-status", Label).update(message)
+        self.query_one("#export-start", Button).disabled = False
+
+    def on_key(self, event):
+        if event.key == "escape":
+            self.dismiss()
+            event.stop()
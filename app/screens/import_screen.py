@@ -0,0 +1,117 @@
+# app/screens/import_screen.py
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from salary_app import SalaryApp
+
+from pathlib import Path
+
+from rich.markup import escape
+from textual import work
+from textual.containers import Grid, Horizontal
+from textual.screen import ModalScreen
+from textual.widgets import Button, Input, Label, ProgressBar
+
+from importer import ImportReport, import_records
+from validation import DuplicateRecordError
+
+
+class ImportScreen(ModalScreen):
+    DEFAULT_CSS = """
+    ImportScreen {
+        align: center middle;
+    }
+    #import-dialog {
+        grid-size: 1;
+        grid-gutter: 1;
+        padding: 1 2;
+        width: 80;
+        height: auto;
+        border: thick $primary;
+        background: $surface;
+    }
+    #import-title {
+        text-align: center;
+        text-style: bold;
+        width: 100%;
+    }
+    #import-progress {
+        width: 100%;
+    }
+    #import-buttons {
+        height: auto;
+        align: center middle;
+    }
+    #import-buttons Button {
+        width: auto;
+        margin: 0 1;
+    }
+    """
+
+    @property
+    def app(self) -> "SalaryApp":
+        return super().app  # type: ignore
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.imported = 0
+
+    def compose(self):
+        yield Grid(
+            Label("Импорт записей (CSV или JSON Lines: date, amount, category)", id="import-title"),
+            Input(placeholder="Путь к файлу", id="import-path"),
+            ProgressBar(id="import-progress", show_eta=True),
+            Label("", id="import-status"),
+            Horizontal(
+                Button("Импорт", variant="success", id="import-start"),
+                Button("Закрыть", variant="default", id="import-close"),
+                id="import-buttons",
+            ),
+            id="import-dialog",
+        )
+
+    def on_button_pressed(self, event: Button.Pressed):
+        if event.button.id == "import-start":
+            path = Path(self.query_one("#import-path", Input).value.strip()).expanduser()
+            if not path.is_file():
+                self.notify("Файл не найден", severity="error")
+                return
+            self.query_one("#import-start", Button).disabled = True
+            self.query_one("#import-status", Label).update("Импорт...")
+            self.run_import(path)
+        elif event.button.id == "import-close":
+            self.dismiss(self.imported > 0)
+
+    @work(thread=True, exclusive=True)
+    def run_import(self, path: Path):
+        progress_bar = self.query_one("#import-progress", ProgressBar)
+
+        def on_progress(done: int, total: int):
+            self.app.call_from_thread(progress_bar.update, total=total, progress=done)
+
+        try:
+            report = import_records(self.app.db, path, progress=on_progress)
+        except (OSError, UnicodeDecodeError) as e:
+            self.app.call_from_thread(self._show_failure, f"{type(e).__name__}: {e}")
+            return
+        except DuplicateRecordError as e:
+            self.app.call_from_thread(self._show_failure, f"{e} Импорт отменён, попробуйте ещё раз.")
+            return
+        self.app.call_from_thread(self._show_report, report)
+
+    def _show_failure(self, message: str):
+        self.query_one("#import-status", Label).update(f"[red]Ошибка импорта: {escape(message)}[/]")
+        self.query_one("#import-start", Button).disabled = False
+
+    def _show_report(self, report: ImportReport):
+        self.imported += report.imported
+        lines = [f"Импортировано: {report.imported}, отклонено: {report.rejected}"]
+        lines += [f"  строка {line_no}: {reason}" for line_no, reason in report.errors[:10]]
+        if report.rejected > 10:
+            lines.append(f"  ... и ещё {report.rejected - 10}")
+        self.query_one("#import-status", Label).update(escape("\n".join(lines)))
+        self.query_one("#import-start", Button).disabled = False
+
+    def on_key(self, event):
+        if event.key == "escape":
+            self.dismiss(self.imported > 0)
+            event.stop()
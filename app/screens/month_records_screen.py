@@ -4,12 +4,21 @@ if TYPE_CHECKING:
     from salary_app import SalaryApp
 
 
+from textual import on, work
 from textual.screen import ModalScreen, Screen
 from textual.widgets import DataTable, Header, Footer, Button, Label, Rule
 from textual.containers import Horizontal, Grid
 from textual.containers import Vertical
 from .add_record_dialog import AddRecordDialog
+from .bulk_edit_dialog import BulkEditDialog
 from .question_dialog import QuestionDialog
+from ..messages import ExternalDataChanged
+from ..widgets.paged_table import PagedDataTable
+from database import ChangeSet, month_number, parse_year_month
+from profiler import profiled
+from validation import DuplicateRecordError
+
+CATEGORY_LABELS = {"salary": "Зарплата", "advance": "Аванс", "other": "Другое"}
 
 
 class MonthRecordsScreen(ModalScreen):
@@ -20,16 +29,19 @@ class MonthRecordsScreen(ModalScreen):
     def __init__(self, month: str, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.month = month  # например: "2025-03"
+        # id записей, отмеченных пробелом для пакетного изменения
+        self._marked: set[int] = set()
 
     def compose(self):
         yield Grid (
             Button("Назад", id="back_record", variant="default"),
             Label(f"Записи за {self.month}", id="month-title"),
             Rule(),
-            DataTable(id="month_records"),
+            PagedDataTable(id="month_records"),
             Rule(),
             Horizontal(
                 Button("Добавить запись", id="add_record", variant="success"),
+                Button("Отмеченные (0)", id="bulk_apply", variant="primary"),
                 Button("Удалить", variant="error", id="delete_record"),
                 classes="button-row"
             ),
@@ -37,33 +49,86 @@ class MonthRecordsScreen(ModalScreen):
         )
 
     def on_mount(self):
-        table = self.query_one("#month_records", DataTable)
+        table = self.query_one("#month_records", PagedDataTable)
         table.add_columns("Дата", "Сумма", "Категория")
+        table.add_column("✓", key="mark")
         table.cursor_type = "row"
+        table.set_source(
+            fetch_page=lambda after, limit: self.app.adb.get_records_page(self.month, after, limit),
+            format_row=lambda r: (r[0], (r[1], f"{r[2]:.2f}", CATEGORY_LABELS[r[3]], self._mark_cell(r[0]))),
+            cursor_of=lambda r: (r[1], r[0]),
+        )
         self._load_records()
 
-    def _load_records(self):
-        table = self.query_one("#month_records", DataTable)
-        table.clear()
-        
-        records = self.app.db.get_records_by_month(self.month)
-        
-        if not records:
-            self.app.pop_screen()
+    def _mark_cell(self, record_id: int) -> str:
+        return "✓" if record_id in self._marked else ""
+
+    def _update_marked_label(self):
+        self.query_one("#bulk_apply", Button).label = f"Отмеченные ({len(self._marked)})"
+
+    def _toggle_mark(self):
+        """Отмечает запись под курсором или снимает отметку."""
+        table = self.query_one("#month_records", PagedDataTable)
+        if not table.row_count:
             return
+        row_key = table.ordered_rows[table.cursor_row].key
+        record_id = row_key.value
+        self._marked ^= {record_id}
+        table.update_cell(row_key, "mark", self._mark_cell(record_id))
+        self._update_marked_label()
+        if table.cursor_row < table.row_count - 1:
+            table.move_cursor(row=table.cursor_row + 1)
+
+    @profiled("ui.MonthRecordsScreen._load_records")
+    def _load_records(self):
+        self.query_one("#month_records", PagedDataTable).reload()
+
+    def on_external_data_changed(self, message: ExternalDataChanged):
+        if self.month in message.months:
+            self._reload_external()
+
+    @work(exclusive=True, group="month-records-external")
+    async def _reload_external(self):
+        """Месяц изменил другой процесс: отметки остаются только у записей, что ещё в месяце."""
+        if self._marked:
+            self._marked &= {record[0] for record in await self.app.adb.get_records_by_month(self.month)}
+            self._update_marked_label()
+        self._load_records()
 
-        for id_, date, amount, category in records:
-            cat_label = {"salary": "Зарплата", "advance": "Аванс", "other": "Другое"}[category]
-            table.add_row(date, f"{amount:.2f}", cat_label, key=id_)
+    @on(PagedDataTable.Loaded, "#month_records")
+    def _close_if_empty(self, event: PagedDataTable.Loaded):
+        if event.table.row_count == 0 and event.table.exhausted and self.is_current:
+            self.dismiss()
+
+    def _apply_changes(self, changes: ChangeSet):
+        """Точечно обновляет таблицу месяца и главную сводку по результату записи."""
+        table = self.query_one("#month_records", PagedDataTable)
+        month = parse_year_month(self.month)
+        for record_id in changes.removed:
+            table.discard_row(record_id)
+            self._marked.discard(record_id)
+        for record in changes.inserted + changes.updated:
+            if month_number(record[1]) == month:
+                table.apply_row(record)
+            else:
+                table.discard_row(record[0])
+        self.app.apply_changes(changes)
+        self._update_marked_label()
 
+        if table.row_count == 0:
+            if table.exhausted:
+                self.dismiss()
+            else:
+                table.load_next_page()
 
-        
     def on_data_table_row_selected(self, event):
         """Обрабатывает клик по строке — открывает диалог редактирования"""
-        record_id = event.row_key.value  # ID записи из БД
+        self._edit_record(event.row_key.value)  # ID записи из БД
 
-        # Получаем запись напрямую из базы данных
-        record_data = self.app.db.get_record_by_id(record_id)
+    @work(exclusive=True, group="month-records-edit")
+    async def _edit_record(self, record_id: int):
+        # Получаем запись из базы данных, не блокируя интерфейс
+        record_data = await self.app.adb.get_record_by_id(record_id)
         if record_data is None:
             self.notify("Запись не найдена", severity="error")
             self._load_records()
@@ -73,57 +138,105 @@ class MonthRecordsScreen(ModalScreen):
         id_, date, amount, category = record_data
         record = (id_, date, amount, category)
 
-        def handle_update(result):
-            if result is None:
-                return  # пользователь нажал "Отмена" или закрыл окно
-
-            # Проверяем, не является ли результат запросом на удаление
-            if isinstance(result, dict) and result.get("action") == "delete":
-                # Удаляем запись из БД
-                self.app.db.delete_record_by_id(result["id"])
-                # Обновляем таблицу
-                self._load_records()
-                self.notify("Запись удалена", severity="information")
-            else:
-                # Обычное обновление записи
-                self.app.db.update_record(
+        result = await self.app.push_screen_wait(AddRecordDialog(is_edit=True, record=record))
+        if result is None:
+            return  # пользователь нажал "Отмена" или закрыл окно
+
+        # Проверяем, не является ли результат запросом на удаление
+        if isinstance(result, dict) and result.get("action") == "delete":
+            # Удаляем запись из БД и убираем её строку из таблицы
+            self._apply_changes(await self.app.adb.delete_record_by_id(result["id"]))
+            self.notify("Запись удалена", severity="information")
+        else:
+            # Обычное обновление записи; повтор зарплаты/аванса отсекает уникальный индекс
+            try:
+                changes = await self.app.adb.update_record(
                     id_=result["id"],
                     date=result["date"],
                     amount=result["amount"],
                     category=result["category"]
                 )
-                self._load_records()
-                self.notify("Запись обновлена", severity="information")
+            except DuplicateRecordError as e:
+                self.notify(str(e), severity="error")
+                return
+            self._apply_changes(changes)
+            self.notify("Запись обновлена", severity="information")
+
+    @work(exclusive=True, group="month-records-edit")
+    async def _add_record(self):
+        result = await self.app.push_screen_wait(AddRecordDialog(month_prefix=self.month))
+        if result:
+            try:
+                changes = await self.app.adb.add_record(
+                    result["date"],
+                    result["amount"],
+                    result["category"]
+                )
+            except DuplicateRecordError as e:
+                self.notify(str(e), severity="error")
+                return
+            self._apply_changes(changes)
+
+    @work(exclusive=True, group="month-records-edit")
+    async def _apply_to_marked(self):
+        """Одно изменение для всех отмеченных записей — одной транзакцией в базе."""
+        if not self._marked:
+            self.notify("Отметьте записи пробелом", severity="warning")
+            return
+        ids = sorted(self._marked)
+        result = await self.app.push_screen_wait(BulkEditDialog(len(ids)))
+        if result is None:
+            return
 
-        self.app.push_screen(
-            AddRecordDialog(is_edit=True, record=record),
-            handle_update
-        )
+        if result["action"] == "delete":
+            accepted = await self.app.push_screen_wait(QuestionDialog(f"Удалить отмеченные записи ({len(ids)})?"))
+            if not accepted:
+                return
+            changes = await self.app.adb.delete_records(ids)
+            self._apply_changes(changes)
+            self.notify(f"Удалено записей: {len(changes.removed)}", severity="information")
+            return
+
+        amount, category = result["amount"], result["category"]
+        records = await self.app.adb.get_records_by_month(self.month)
+        updates = [
+            (id_, date, amount if amount is not None else old_amount, category or old_category)
+            for id_, date, old_amount, old_category in records
+            if id_ in self._marked
+        ]
+        try:
+            changes = await self.app.adb.update_records(updates)
+        except DuplicateRecordError as e:
+            self.notify(str(e), severity="error")
+            return
+        self._marked.clear()
+        self._apply_changes(changes)
+        self.notify(f"Изменено записей: {len(changes.updated)}", severity="information")
+
+    @work(exclusive=True, group="month-records-edit")
+    async def _delete_month(self):
+        accepted = await self.app.push_screen_wait(QuestionDialog(f"Удаить все записи за {self.month} ?"))
+        if accepted:
+            self.app.apply_changes(await self.app.adb.delete_records_by_month(self.month))
+            self.dismiss()
     
     def on_button_pressed(self, event):
         if event.button.id == "add_record":
-            def handle_new(result):
-                if result:
-                    self.app.db.add_record(
-                        result["date"],
-                        result["amount"],
-                        result["category"]
-                    )
-                    self._load_records()
-            self.app.push_screen(AddRecordDialog(month_prefix=self.month), handle_new)
+            self._add_record()
+
+        elif event.button.id == "bulk_apply":
+            self._apply_to_marked()
 
         elif event.button.id == "back_record":
             self.dismiss(True)
 
         elif event.button.id == "delete_record":
-            def confirm_delete(accepted):
-                if accepted:
-                    self.app.db.delete_records_by_month(self.month)
-                    self._load_records()
-                    self.dismiss()
-            self.app.push_screen(QuestionDialog(f"Удаить все записи за {self.month} ?"), confirm_delete)
+            self._delete_month()
     
     def on_key(self, event):
         if event.key == "escape":
             self.dismiss(True)
-            event.stop()  # предотвращает стандартное поведение
\ No newline at end of file
+            event.stop()  # предотвращает стандартное поведение
+        elif event.key == "space":
+            self._toggle_mark()
+            event.stop()
\ No newline at end of file
@@ -1,33 +1,81 @@
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from salary_app import SalaryApp
+
+from textual import work
 from textual.screen import Screen
 from textual.widgets import Button, Label, Input, Static
 from textual.containers import Grid
 from datetime import datetime
 
-class OrgSettingsScreen(Screen):
-    def compose(self):
-        db = self.app.db
-        org_name = db.get_organization_name() or ""
-        start_date = db.get_start_date() or ""
-        end_date = db.get_end_date() or ""
+from database import OrgSettings
 
-        title = "Добро пожаловать! Настройте организацию" if not org_name else "Настройки организации"
-        subtitle = "Это нужно сделать только один раз" if not org_name else "Измените данные при необходимости"
+class OrgSettingsScreen(Screen):
+    @property
+    def app(self) -> "SalaryApp":
+        return super().app  # type: ignore
 
+    def compose(self):
+        # значения подставляет _load_settings: чтение базы не идёт в event loop
         yield Grid(
-            Label(title, id="org_setting_title"),
-            Label(subtitle, classes="org_setting_label"),
+            Label("Настройки организации", id="org_setting_title"),
+            Label("", classes="org_setting_label", id="org_setting_subtitle"),
             Label("Название организации:", classes="label"),
-            Input(value=org_name, placeholder="ООО «Ромашка»",classes="input-setting", id="org_name"),
+            Input(placeholder="ООО «Ромашка»",classes="input-setting", id="org_name"),
             Label("Дата начала работы:", classes="label"),
-            Input(value=start_date, placeholder="01.01.2024",classes="input-setting", id="start_date"),
+            Input(placeholder="01.01.2024",classes="input-setting", id="start_date"),
             Label("Дата окончания (пусто = по наст. время):", classes="label"),
-            Input(value=end_date, placeholder="31.12.2024 или оставить пустым",classes="input-setting", id="end_date"),
+            Input(placeholder="31.12.2024 или оставить пустым",classes="input-setting", id="end_date"),
             Static(),
             Button("Отмена", variant="warning", id="cancel"),
             Button("Сохранить", variant="success", id="save"),
             id="settings_grid",
         )
 
+    def on_mount(self):
+        self._load_settings()
+
+    @work(exclusive=True, group="org-settings-load")
+    async def _load_settings(self):
+        """Заполняет форму текущими настройками; пока идёт запрос, форма недоступна."""
+        grid = self.query_one("#settings_grid", Grid)
+        grid.loading = True
+        try:
+            settings = await self.app.adb.get_settings()
+        finally:
+            grid.loading = False
+        org_name = settings.org_name or ""
+        if not org_name:
+            self.query_one("#org_setting_title", Label).update("Добро пожаловать! Настройте организацию")
+        self.query_one("#org_setting_subtitle", Label).update(
+            "Это нужно сделать только один раз" if not org_name else "Измените данные при необходимости"
+        )
+        self.query_one("#org_name", Input).value = org_name
+        self.query_one("#start_date", Input).value = settings.start_date or ""
+        self.query_one("#end_date", Input).value = settings.end_date or ""
+
+    @work(exclusive=True, group="org-settings-save")
+    async def _save(self, settings: OrgSettings):
+        save_button = self.query_one("#save", Button)
+        save_button.disabled = True
+        try:
+            await self.app.adb.save_settings(settings)
+        finally:
+            save_button.disabled = False
+
+        self.app._update_subtitle()
+        if self.app.query_one("DataTable").row_count == 0:
+            self.app.call_after_refresh(self.app._load_monthly_view)
+
+        self.dismiss()
+
+    @work(exclusive=True, group="org-settings-cancel")
+    async def _cancel(self):
+        if not await self.app.adb.get_organization_name():
+            self.notify("Сначала настройте организацию!", severity="warning")
+        else:
+            self.dismiss()
+
     def on_button_pressed(self, event):
         if event.button.id == "save":
             org_name = self.query_one("#org_name", Input).value.strip()
@@ -46,18 +94,6 @@ class OrgSettingsScreen(Screen):
                 self.notify("Неверный формат даты! ДД.ММ.ГГГГ", severity="error")
                 return
 
-            db = self.app.db
-            db.set_organization_name(org_name)
-            db.set_start_date(start_date)
-            db.set_end_date(end_date)
-
-            self.app._update_subtitle()
-            if self.app.query_one("DataTable").row_count == 0:
-                self.app.call_after_refresh(self.app._load_salaries)
-
-            self.dismiss()
+            self._save(OrgSettings(org_name, start_date, end_date))
         else:
-            if not self.app.db.get_organization_name():
-                self.notify("Сначала настройте организацию!", severity="warning")
-            else:
-                self.dismiss()
\ No newline at end of file
+            self._cancel()
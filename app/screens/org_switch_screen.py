@@ -0,0 +1,117 @@
+# app/screens/org_switch_screen.py
+from textual import on, work
+from textual.containers import Grid, Horizontal
+from textual.screen import ModalScreen
+from textual.widgets import Button, DataTable, Input, Label
+
+
+class OrgSwitchScreen(ModalScreen[int | None]):
+    """Выбор текущей организации и создание новой. Возвращает id выбранной организации."""
+
+    DEFAULT_CSS = """
+    OrgSwitchScreen {
+        align: center middle;
+    }
+    #org-switch-dialog {
+        grid-size: 1;
+        grid-rows: auto 1fr auto auto;
+        grid-gutter: 1;
+        padding: 1 2;
+        width: 80%;
+        height: 80%;
+        border: thick $primary;
+        background: $surface;
+    }
+    #org-switch-title {
+        text-style: bold;
+        width: 100%;
+    }
+    #org-switch-buttons {
+        height: auto;
+        align: center middle;
+    }
+    """
+
+    def __init__(self, current_org_id: int, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.current_org_id = current_org_id
+
+    def compose(self):
+        yield Grid(
+            Label("Организации", id="org-switch-title"),
+            DataTable(id="org-switch-table", cursor_type="row", zebra_stripes=True),
+            Input(placeholder="Название новой организации", id="org-switch-name"),
+            Horizontal(
+                Button("Создать", variant="primary", id="org-switch-create"),
+                Button("Выбрать", variant="success", id="org-switch-select"),
+                Button("Закрыть", variant="default", id="org-switch-close"),
+                id="org-switch-buttons",
+            ),
+            id="org-switch-dialog",
+        )
+
+    def on_mount(self):
+        table = self.query_one("#org-switch-table", DataTable)
+        table.add_columns("", "Организация", "Период")
+        self._load_organizations(self.current_org_id)
+
+    @work(exclusive=True, group="org-switch-load")
+    async def _load_organizations(self, cursor_org_id: int):
+        table = self.query_one("#org-switch-table", DataTable)
+        table.loading = True
+        try:
+            orgs = await self.app.adb.list_organizations()
+        finally:
+            table.loading = False
+        table.clear()
+        for org in orgs:
+            period = f"{org.start_date or ''} — {org.end_date or 'наст. вр.'}" if org.start_date else ""
+            table.add_row(
+                "●" if org.id == self.current_org_id else "",
+                org.name or "(без названия)",
+                period,
+                key=str(org.id),
+            )
+            if org.id == cursor_org_id:
+                table.move_cursor(row=table.row_count - 1)
+
+    @work(exclusive=True, group="org-switch-create")
+    async def _create_organization(self, name: str):
+        org_id = await self.app.adb.create_organization(name)
+        self.query_one("#org-switch-name", Input).value = ""
+        self._load_organizations(org_id)
+
+    def _selected_org_id(self) -> int | None:
+        table = self.query_one("#org-switch-table", DataTable)
+        if not table.row_count:
+            return None
+        row_key, _ = table.coordinate_to_cell_key(table.cursor_coordinate)
+        return int(row_key.value)
+
+    @on(DataTable.RowSelected, "#org-switch-table")
+    def _on_row_selected(self):
+        self.dismiss(self._selected_org_id())
+
+    @on(Input.Submitted, "#org-switch-name")
+    def _on_name_submitted(self):
+        self._create_from_input()
+
+    def _create_from_input(self):
+        name = self.query_one("#org-switch-name", Input).value.strip()
+        if not name:
+            self.notify("Введите название организации", severity="error")
+            return
+        self._create_organization(name)
+
+    def on_button_pressed(self, event: Button.Pressed):
+        if event.button.id == "org-switch-create":
+            self._create_from_input()
+        elif event.button.id == "org-switch-select":
+            self.dismiss(self._selected_org_id())
+        elif event.button.id == "org-switch-close":
+            self.dismiss(None)
+
+    def on_key(self, event):
+        if event.key == "escape":
+            self.dismiss(None)
+            event.stop()
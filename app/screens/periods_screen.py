@@ -0,0 +1,137 @@
+# app/screens/periods_screen.py
+import asyncio
+from datetime import datetime
+
+from textual import on, work
+from textual.containers import Grid, Horizontal
+from textual.screen import ModalScreen
+from textual.widgets import Button, DataTable, Input, Label
+
+from periods import Period, standard_periods
+from ..messages import ExternalDataChanged
+
+
+class PeriodsScreen(ModalScreen):
+    """Суммы за год, квартал, период работы, последние 12 месяцев и произвольный диапазон."""
+
+    DEFAULT_CSS = """
+    PeriodsScreen {
+        align: center middle;
+    }
+    #periods-dialog {
+        grid-size: 1;
+        grid-rows: auto 1fr auto;
+        grid-gutter: 1;
+        padding: 1 2;
+        width: 95%;
+        height: 90%;
+        border: thick $primary;
+        background: $surface;
+    }
+    #periods-title {
+        text-style: bold;
+        width: 100%;
+    }
+    #periods-range {
+        height: auto;
+        align: center middle;
+    }
+    #periods-range Input {
+        width: 16;
+    }
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # произвольные периоды пересчитываются вместе со стандартными
+        self._custom: list[Period] = []
+
+    def compose(self):
+        yield Grid(
+            Label("Суммы по периодам", id="periods-title"),
+            DataTable(id="periods-table", cursor_type="row", zebra_stripes=True),
+            Horizontal(
+                Input(placeholder="с ГГГГ-ММ", id="periods-from"),
+                Input(placeholder="по ГГГГ-ММ", id="periods-to"),
+                Button("Посчитать", variant="primary", id="periods-custom"),
+                Button("Закрыть", variant="default", id="periods-close"),
+                id="periods-range",
+            ),
+            id="periods-dialog",
+        )
+
+    def on_mount(self):
+        table = self.query_one("#periods-table", DataTable)
+        table.add_columns("Период", "С", "По", "Зарплата", "Аванс", "Другое", "Итого", "Записей")
+        self._load_periods()
+
+    def _add_period(self, period: Period, totals):
+        self.query_one("#periods-table", DataTable).add_row(
+            period.label,
+            period.first_month,
+            period.last_month,
+            f"{totals.salary:,.2f} ₽",
+            f"{totals.advance:,.2f} ₽",
+            f"{totals.other:,.2f} ₽",
+            f"{totals.total:,.2f} ₽",
+            totals.records,
+        )
+
+    @work(exclusive=True, group="periods-load")
+    async def _load_periods(self):
+        table = self.query_one("#periods-table", DataTable)
+        table.loading = True
+        try:
+            adb = self.app.adb
+            bounds, settings = await asyncio.gather(adb.get_month_range(), adb.get_settings())
+            periods = standard_periods(bounds, settings.start_date, settings.end_date) + self._custom
+            # каждый период — два префикса индекса, поэтому считаются все сразу
+            totals = await adb.call(
+                lambda: [self.app.db.get_period_totals(p.first_month, p.last_month) for p in periods]
+            )
+        finally:
+            table.loading = False
+        table.clear()
+        for period, period_totals in zip(periods, totals):
+            self._add_period(period, period_totals)
+
+    @work(exclusive=True, group="periods-custom")
+    async def _add_custom(self, first_month: str, last_month: str):
+        period = Period("Произвольный", first_month, last_month)
+        totals = await self.app.adb.get_period_totals(first_month, last_month)
+        table = self.query_one("#periods-table", DataTable)
+        self._custom.append(period)
+        self._add_period(period, totals)
+        table.move_cursor(row=table.row_count - 1)
+
+    def _submit_custom(self):
+        first_month = self.query_one("#periods-from", Input).value.strip()
+        last_month = self.query_one("#periods-to", Input).value.strip()
+        try:
+            first = datetime.strptime(first_month, "%Y-%m")
+            last = datetime.strptime(last_month, "%Y-%m")
+        except ValueError:
+            self.notify("Месяцы в формате ГГГГ-ММ", severity="error")
+            return
+        if first > last:
+            self.notify("Начало периода позже конца", severity="error")
+            return
+        self._add_custom(first_month, last_month)
+
+    def on_external_data_changed(self, message: ExternalDataChanged):
+        self._load_periods()
+
+    @on(Input.Submitted)
+    def _on_range_submitted(self):
+        self._submit_custom()
+
+    def on_button_pressed(self, event: Button.Pressed):
+        if event.button.id == "periods-custom":
+            self._submit_custom()
+        elif event.button.id == "periods-close":
+            self.dismiss()
+
+    def on_key(self, event):
+        if event.key == "escape":
+            self.dismiss()
+            event.stop()
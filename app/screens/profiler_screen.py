@@ -0,0 +1,109 @@
+# app/screens/profiler_screen.py
+from datetime import datetime
+from pathlib import Path
+
+from rich.markup import escape
+from textual.containers import Grid, Horizontal
+from textual.screen import ModalScreen
+from textual.widgets import Button, Checkbox, DataTable, Label
+
+from profiler import PROFILER
+
+REFRESH_SECONDS = 1.0
+
+
+class ProfilerScreen(ModalScreen):
+    """Живая статистика профилировщика. Открытие экрана включает сбор, если он был выключен."""
+
+    DEFAULT_CSS = """
+    ProfilerScreen {
+        align: center middle;
+    }
+    #profiler-dialog {
+        grid-size: 1;
+        grid-rows: auto 1fr auto auto;
+        grid-gutter: 1;
+        padding: 1 2;
+        width: 95%;
+        height: 90%;
+        border: thick $primary;
+        background: $surface;
+    }
+    #profiler-title {
+        text-style: bold;
+        width: 100%;
+    }
+    #profiler-buttons {
+        height: auto;
+        align: center middle;
+    }
+    """
+
+    def compose(self):
+        yield Grid(
+            Label("", id="profiler-title"),
+            DataTable(id="profiler-table", cursor_type="row", zebra_stripes=True),
+            Label("", id="profiler-status"),
+            Horizontal(
+                Checkbox("Память (tracemalloc)", id="profiler-memory"),
+                Button("Сбросить", variant="warning", id="profiler-reset"),
+                Button("Сохранить JSON", variant="success", id="profiler-dump"),
+                Button("Закрыть", variant="default", id="profiler-close"),
+                id="profiler-buttons",
+            ),
+            id="profiler-dialog",
+        )
+
+    def on_mount(self):
+        if not PROFILER.enabled:
+            PROFILER.enable()
+        self.query_one("#profiler-memory", Checkbox).value = PROFILER.trace_memory
+        table = self.query_one("#profiler-table", DataTable)
+        table.add_columns("Операция", "Вызовов", "SQL", "Среднее, мс", "p50, мс", "p95, мс", "Макс, мс", "Пик, КиБ")
+        self._refresh_stats()
+        self.set_interval(REFRESH_SECONDS, self._refresh_stats)
+
+    def _refresh_stats(self):
+        table = self.query_one("#profiler-table", DataTable)
+        cursor_row = table.cursor_row
+        table.clear()
+        for name, stats in PROFILER.snapshot().items():
+            table.add_row(
+                name,
+                stats["calls"],
+                stats["queries"],
+                f"{stats['mean_ms']:.2f}",
+                f"≤{stats['p50_ms']:g}",
+                f"≤{stats['p95_ms']:g}",
+                f"{stats['max_ms']:.2f}",
+                f"{stats['peak_kib']:.0f}" if PROFILER.trace_memory else "—",
+            )
+        if table.row_count:
+            table.move_cursor(row=min(cursor_row, table.row_count - 1))
+        started = PROFILER.started.astimezone().strftime("%H:%M:%S") if PROFILER.started else "—"
+        self.query_one("#profiler-title", Label).update(f"Профилировщик: сбор с {started}")
+
+    def on_checkbox_changed(self, event: Checkbox.Changed):
+        if event.checkbox.id == "profiler-memory" and event.value != PROFILER.trace_memory:
+            PROFILER.disable()
+            PROFILER.enable(trace_memory=event.value)
+
+    def on_button_pressed(self, event: Button.Pressed):
+        if event.button.id == "profiler-reset":
+            PROFILER.reset()
+            self._refresh_stats()
+        elif event.button.id == "profiler-dump":
+            path = Path.cwd() / f"salary-profile-{datetime.now():%Y%m%d-%H%M%S}.json"
+            try:
+                PROFILER.dump(path)
+            except OSError as e:
+                self.query_one("#profiler-status", Label).update(f"[red]Ошибка записи: {escape(str(e))}[/]")
+                return
+            self.query_one("#profiler-status", Label).update(escape(f"Сохранено: {path}"))
+        elif event.button.id == "profiler-close":
+            self.dismiss()
+
+    def on_key(self, event):
+        if event.key == "escape":
+            self.dismiss()
+            event.stop()
@@ -0,0 +1,206 @@
+# app/widgets/paged_table.py
+from typing import Any, Awaitable, Callable, Hashable
+
+from textual import work
+from textual.message import Message
+from textual.widgets import DataTable
+from textual.widgets.data_table import RowKey
+
+from profiler import profiled
+
+# Сколько строк до конца загруженной части должно остаться, чтобы подгрузить следующую страницу
+LOOKAHEAD_ROWS = 10
+
+FetchPage = Callable[[Any, int], Awaitable[list]]       # (ключ после которого читать, лимит) -> строки
+FormatRow = Callable[[Any], tuple[Hashable, tuple]]     # строка -> (ключ строки таблицы, ячейки)
+CursorOf = Callable[[Any], Any]                          # строка -> ключ для следующей страницы
+
+FormattedPage = tuple[list[tuple[Hashable, tuple]], Any]  # (отформатированные строки, ключ следующей страницы)
+
+
+class PagedDataTable(DataTable):
+    """
+    DataTable, который читает данные страницами по ключу (keyset) и подгружает
+    следующую страницу, когда курсор или прокрутка подходят к концу загруженного.
+    Отформатированные ячейки кэшируются постранично до следующего reload().
+
+    fetch_page — корутина (обычно метод AsyncDatabase), страницы читаются в
+    воркерах, и таблица не блокирует интерфейс. После каждой загрузки
+    отправляется сообщение PagedDataTable.Loaded.
+
+    apply_row()/discard_row() точечно меняют одну строку, не перечитывая таблицу.
+    Новая строка добавляется, только если она попадает в уже загруженный диапазон
+    ключей; остальные придут со следующими страницами.
+    """
+
+    class Loaded(Message):
+        """Загружена первая или очередная страница."""
+
+        def __init__(self, table: "PagedDataTable"):
+            super().__init__()
+            self.table = table
+
+        @property
+        def control(self) -> "PagedDataTable":
+            return self.table
+
+    def __init__(self, *args, page_size: int = 100, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.page_size = page_size
+        self._fetch_page: FetchPage | None = None
+        self._format_row: FormatRow | None = None
+        self._cursor_of: CursorOf | None = None
+        # ключ начала страницы -> (отформатированные строки, ключ следующей страницы)
+        self._page_cache: dict[Any, FormattedPage] = {}
+        self._next_cursor: Any = None
+        self._exhausted = True
+        self._fetching = False
+        # номер последнего reload(); воркеры, запущенные до него, свои результаты не применяют
+        self._reloads = 0
+        # растёт при каждом изменении данных; страница, прочитанная до изменения, перечитывается
+        self._generation = 0
+
+    def set_source(self, fetch_page: FetchPage, format_row: FormatRow, cursor_of: CursorOf):
+        self._fetch_page = fetch_page
+        self._format_row = format_row
+        self._cursor_of = cursor_of
+
+    @property
+    def exhausted(self) -> bool:
+        """Загружены ли все строки источника."""
+        return self._exhausted
+
+    def reload(self, invalidate: bool = True):
+        """Перечитывает таблицу с первой страницы, сохраняя позицию курсора, если это возможно."""
+        if invalidate:
+            self._page_cache.clear()
+            self._generation += 1
+        # пока идёт перечитывание, подгрузка из watch_scroll_y не нужна
+        self._exhausted = True
+        self._reloads += 1
+        self.loading = True
+        self._reload(self._reloads, self.cursor_row)
+
+    def load_next_page(self):
+        """Запускает подгрузку следующей страницы, если она есть и ещё не грузится."""
+        if self._exhausted or self._fetching or self._fetch_page is None:
+            return
+        self._load_next_page()
+
+    async def _read_page(self, page_key: Any) -> FormattedPage:
+        assert self._fetch_page is not None
+        assert self._format_row is not None and self._cursor_of is not None
+        while True:
+            cached = self._page_cache.get(page_key)
+            if cached is not None:
+                return cached
+            generation = self._generation
+            rows = await self._fetch_page(page_key, self.page_size)
+            if generation != self._generation:
+                continue
+            cached = ([self._format_row(row) for row in rows], self._cursor_of(rows[-1]) if rows else None)
+            self._page_cache[page_key] = cached
+
+    @profiled("ui.PagedDataTable._add_rows")
+    def _add_rows(self, formatted: list[tuple[Hashable, tuple]]):
+        for key, cells in formatted:
+            # строку могли уже добавить через apply_row, пока страница читалась
+            if RowKey(key) not in self.rows:
+                self.add_row(*cells, key=key)
+
+    @work(exclusive=True, group="paged-table-reload")
+    @profiled("ui.PagedDataTable._reload")
+    async def _reload(self, reload_no: int, cursor_row: int):
+        try:
+            while True:
+                generation = self._generation
+                pages: list[FormattedPage] = []
+                page_key, loaded = None, 0
+                while True:
+                    formatted, next_cursor = await self._read_page(page_key)
+                    pages.append((formatted, next_cursor))
+                    loaded += len(formatted)
+                    if len(formatted) < self.page_size or loaded > cursor_row:
+                        break
+                    page_key = next_cursor
+                if generation == self._generation:
+                    break
+
+            self.clear()
+            for formatted, _ in pages:
+                self._add_rows(formatted)
+            last_page, self._next_cursor = pages[-1]
+            self._exhausted = len(last_page) < self.page_size
+            if self.row_count:
+                self.move_cursor(row=min(cursor_row, self.row_count - 1))
+        finally:
+            if reload_no == self._reloads:
+                self.loading = False
+        self.post_message(self.Loaded(self))
+
+    @work(group="paged-table-page")
+    @profiled("ui.PagedDataTable._load_next_page")
+    async def _load_next_page(self):
+        reload_no = self._reloads
+        self._fetching = True
+        try:
+            formatted, next_cursor = await self._read_page(self._next_cursor)
+            if reload_no != self._reloads:
+                # пока страница читалась, таблицу начали перечитывать
+                return
+            self._add_rows(formatted)
+            self._next_cursor = next_cursor
+            self._exhausted = len(formatted) < self.page_size
+        finally:
+            self._fetching = False
+        self.post_message(self.Loaded(self))
+
+    def apply_row(self, row: Any):
+        """Добавляет строку источника или обновляет её ячейки, если она уже в таблице."""
+        assert self._format_row is not None and self._cursor_of is not None
+        key, cells = self._format_row(row)
+        row_key = RowKey(key)
+        # загруженные страницы больше не соответствуют базе
+        self._page_cache.clear()
+        self._generation += 1
+
+        if row_key in self.rows:
+            old_order = self.get_row(row_key)[0]
+            for column, value in zip(self.ordered_columns, cells):
+                self.update_cell(row_key, column.key, value)
+            if cells[0] != old_order and not self._in_order(row_key):
+                self._restore_order()
+        elif self._exhausted or self._next_cursor is None or self._cursor_of(row) <= self._next_cursor:
+            # add_row ставит строку в конец; сортировка нужна, только если её место выше
+            self.add_row(*cells, key=key)
+            if not self._in_order(row_key):
+                self._restore_order()
+
+    def discard_row(self, key: Hashable):
+        """Удаляет строку с ключом key, если она загружена."""
+        row_key = RowKey(key)
+        self._page_cache.clear()
+        self._generation += 1
+        if row_key in self.rows:
+            self.remove_row(row_key)
+
+    def _in_order(self, row_key: RowKey) -> bool:
+        """Стоит ли строка на своём месте относительно соседей по первой колонке."""
+        index = self.get_row_index(row_key)
+        value = self.get_row(row_key)[0]
+        if index > 0 and self.get_row_at(index - 1)[0] > value:
+            return False
+        return index + 1 >= self.row_count or not value > self.get_row_at(index + 1)[0]
+
+    def _restore_order(self):
+        """Сортирует по первой колонке; порядок строк с равным значением не меняется."""
+        self.sort(key=lambda values: values[0])
+
+    def on_data_table_row_highlighted(self, event: DataTable.RowHighlighted):
+        if event.cursor_row >= self.row_count - LOOKAHEAD_ROWS:
+            self.load_next_page()
+
+    def watch_scroll_y(self, old_value: float, new_value: float) -> None:
+        super().watch_scroll_y(old_value, new_value)
+        if new_value >= self.max_scroll_y - self.scrollable_content_region.height:
+            self.load_next_page()
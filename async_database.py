@@ -0,0 +1,69 @@
+"""
+Асинхронный фасад над Database для интерфейса.
+
+Каждый вызов выполняется в отдельном пуле потоков, поэтому event loop Textual
+не блокируется даже на долгих запросах: экраны делают `await app.adb.<метод>(...)`
+внутри @work-воркеров и продолжают перерисовываться.
+
+Методы фасада совпадают с методами Database:
+    summary = await adb.get_monthly_summary()
+    changes = await adb.add_record("2025-03-10", 40000.0, "advance")
+
+Вместо готового Database можно передать фабрику: тогда модуль database (и
+SQLAlchemy) импортируется и база открывается в пуле при первом вызове, а
+интерфейс успевает отрисоваться раньше.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import TYPE_CHECKING, Any, Callable
+
+if TYPE_CHECKING:
+    from database import Database
+
+DEFAULT_WORKERS = 4
+
+
+class AsyncDatabase:
+    def __init__(self, db: "Database | Callable[[], Database]", max_workers: int = DEFAULT_WORKERS):
+        self._db: Database | None = None
+        self._factory: Callable[[], Database] | None = None
+        if callable(db):
+            self._factory = db
+        else:
+            self._db = db
+        self._db_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="salary-db")
+
+    @property
+    def db(self) -> "Database":
+        """Синхронный Database; при ленивой инициализации создаётся при первом обращении."""
+        if self._db is None:
+            with self._db_lock:
+                if self._db is None:
+                    assert self._factory is not None
+                    self._db = self._factory()
+        return self._db
+
+    async def call(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Выполняет func(*args, **kwargs) в пуле потоков базы."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        async def method(*args, **kwargs):
+            # метод ищется уже в потоке пула: там же при необходимости создаётся Database
+            return await self.call(lambda: getattr(self.db, name)(*args, **kwargs))
+
+        method.__name__ = name
+        return method
+
+    def close(self):
+        """Останавливает пул; Database, созданный фабрикой, закрывается вместе с ним."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._factory is not None and self._db is not None:
+            self._db.close()
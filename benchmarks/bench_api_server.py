@@ -0,0 +1,129 @@
+"""
+Нагрузка на локальный JSON API (api_server): сотни одновременных клиентов
+читают сводку и месяцы, часть из них пишет.
+
+Сервер запускается в этом же процессе на свободном порту над синтетическим
+журналом. Каждый клиент держит своё keep-alive соединение и повторяет GET
+сводки с If-None-Match, поэтому видно и долю дешёвых 304. Клиенты пишут
+запросы прямо в asyncio-потоки: полноценный HTTP-клиент в том же процессе
+отнимал бы у сервера GIL и измерялся бы вместо него. Печатаются
+медиана и p95 задержки чтений и записей по отдельности: чтения не должны
+выстраиваться в очередь за записями.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_api_server --size 100000 --clients 200 --requests 50
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api_server import ApiServer
+from benchmarks.synthetic import build_ledger, month_label, months_for
+from database import Database
+
+
+def percentiles(samples: list[float]) -> tuple[float, float]:
+    """(медиана, p95) в миллисекундах."""
+    if not samples:
+        return 0.0, 0.0
+    samples = sorted(samples)
+    return statistics.median(samples), samples[max(0, int(len(samples) * 0.95) - 1)]
+
+
+async def request(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, method: str, path: str,
+    headers: dict[str, str] | None = None, payload=None,
+) -> tuple[int, dict[str, str]]:
+    """Один запрос на keep-alive соединении; возвращает (код, заголовки ответа)."""
+    body = json.dumps(payload).encode() if payload is not None else b""
+    lines = [f"{method} {path} HTTP/1.1", "Host: localhost", f"Content-Length: {len(body)}"]
+    lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+    head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+    response_headers = {}
+    for line in head[1:]:
+        name, _, value = line.partition(":")
+        if name:
+            response_headers[name.strip().lower()] = value.strip()
+    await reader.readexactly(int(response_headers.get("content-length", "0")))
+    return int(head[0].split()[1]), response_headers
+
+
+async def client(port: int, index: int, requests: int, write_every: int, months: list[str], stats: dict):
+    etag = None
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        for i in range(requests):
+            start = time.perf_counter()
+            if write_every and (index + i) % write_every == write_every - 1:
+                status, _ = await request(
+                    reader, writer, "POST", "/api/records",
+                    payload={"date": f"2099-01-{i % 28 + 1:02d}", "amount": 1.0, "category": "other"},
+                )
+                kind = "write"
+            elif i % 2 == 0:
+                status, headers = await request(
+                    reader, writer, "GET", "/api/summary", {"If-None-Match": etag} if etag else None
+                )
+                etag = headers.get("etag", etag)
+                kind = "read"
+            else:
+                status, _ = await request(reader, writer, "GET", f"/api/months/{months[(index + i) % len(months)]}/records")
+                kind = "read"
+            stats[kind].append((time.perf_counter() - start) * 1000)
+            stats["status"][status] = stats["status"].get(status, 0) + 1
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def run(db: Database, clients: int, requests: int, write_every: int, months: list[str]):
+    server = ApiServer(db, port=0)
+    await server.start()
+    stats: dict = {"read": [], "write": [], "status": {}}
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(
+            client(server.port, index, requests, write_every, months, stats) for index in range(clients)
+        ))
+    finally:
+        await server.close()
+    elapsed = time.perf_counter() - start
+
+    total = len(stats["read"]) + len(stats["write"])
+    print(f"запросов: {total} за {elapsed:.2f} с ({total / elapsed:.0f}/с), коды: {dict(sorted(stats['status'].items()))}")
+    for kind in ("read", "write"):
+        median, p95 = percentiles(stats[kind])
+        print(f"{kind:<6} {len(stats[kind]):>7} медиана {median:>8.2f} мс  p95 {p95:>8.2f} мс")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100_000, help="записей в журнале")
+    parser.add_argument("--clients", type=int, default=200, help="одновременных клиентов")
+    parser.add_argument("--requests", type=int, default=50, help="запросов на клиента")
+    parser.add_argument("--write-every", type=int, default=20, help="каждый N-й запрос — запись (0 — без записей)")
+    parser.add_argument("--storage", default="fast", help="профиль хранения")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "api.db"
+        build_ledger(path, args.size).close()
+        db = Database(path, cache_size=256, storage_profile=args.storage)
+        months = [month_label(index) for index in range(months_for(args.size))]
+        try:
+            asyncio.run(run(db, args.clients, args.requests, args.write_every, months))
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Сравнение SQLite-пути и колоночного журнала (Database(columnar=True))
+для сводки по месяцам, разбивки за месяц и общей суммы.
+
+Запуск из корня репозитория (нужен numpy):
+    python -m benchmarks.bench_columnar --sizes 10000 100000 1000000
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_monthly_summary import fill_ledger, same_summary
+from database import Database
+
+
+def timed(func, *args, repeat: int = 5) -> tuple[float, object]:
+    """Лучшее время из repeat запусков и результат последнего."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'записей':>10} {'операция':<22} {'SQLite, мс':>11} {'numpy, мс':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            path = Path(tmp) / f"bench_{size}.db"
+            fill_ledger(Database(path), size)
+            sql_db, col_db = Database(path), Database(path, columnar=True)
+
+            start = time.perf_counter()
+            with col_db._ledger_lock:
+                col_db._loaded_ledger()
+            print(f"{size:>10} {'загрузка журнала':<22} {'—':>11} {(time.perf_counter() - start) * 1000:>10.1f}")
+
+            month = sql_db.get_monthly_summary()[0][0]
+            for name, args_ in (("get_monthly_summary", ()), ("get_monthly_breakdown", (month,)), ("get_grand_total", ())):
+                sql_time, sql_result = timed(getattr(sql_db, name), *args_)
+                col_time, col_result = timed(getattr(col_db, name), *args_)
+                if name == "get_monthly_summary":
+                    assert same_summary(sql_result, col_result), f"{name}: результаты расходятся"
+                elif name == "get_monthly_breakdown":
+                    assert all(abs(sql_result[key] - col_result[key]) < 0.005 for key in sql_result), name
+                else:
+                    assert abs(sql_result - col_result) < 0.005 * size, name
+                print(f"{size:>10} {name:<22} {sql_time * 1000:>11.2f} {col_time * 1000:>10.2f}")
+
+            start = time.perf_counter()
+            col_db.add_record(f"{month}-15", 123.45, "other")
+            col_db.get_monthly_summary()
+            append_ms = (time.perf_counter() - start) * 1000
+            print(f"{size:>10} {'add_record + сводка':<22} {'—':>11} {append_ms:>10.2f}")
+            assert same_summary(sql_db.get_monthly_summary(), col_db.get_monthly_summary())
+
+            sql_db.engine.dispose()
+            col_db.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Обслуживание базы под нагрузкой: задержка записи во время онлайн-копии.
+
+Поток пишет по одной записи подряд; сначала без обслуживания, потом пока
+maintenance.backup() снимает копию шагами, потом пока compact() возвращает
+место после удаления части месяцев. Печатаются длительность операции и
+медиана, p99 и максимум задержки записи в каждом режиме: копия и
+компактизация не должны заметно тормозить запись.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_maintenance --size 1000000
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import maintenance
+from benchmarks.synthetic import build_ledger
+from database import Database
+
+WRITE_MONTH = "2099-01"
+IDLE_SECONDS = 1.0
+
+
+def write_latencies(db: Database, operation: Callable[[], object]) -> tuple[object, float, list[float]]:
+    """Пишет записи, пока идёт operation; возвращает (результат, секунды, задержки в мс)."""
+    stop = threading.Event()
+    samples: list[float] = []
+
+    def writer():
+        day = 0
+        while not stop.is_set():
+            start = time.perf_counter()
+            db.add_record(f"{WRITE_MONTH}-{day % 28 + 1:02d}", 1.0, "other")
+            samples.append((time.perf_counter() - start) * 1000)
+            day += 1
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    start = time.perf_counter()
+    try:
+        result = operation()
+    finally:
+        elapsed = time.perf_counter() - start
+        stop.set()
+        thread.join()
+    return result, elapsed, samples
+
+
+def report(label: str, elapsed: float, samples: list[float]):
+    samples = sorted(samples) or [0.0]
+    p99 = samples[max(0, int(len(samples) * 0.99) - 1)]
+    print(f"{label:<12} {elapsed:>7.2f} с  записей {len(samples):>6}  медиана {statistics.median(samples):>6.2f} мс"
+          f"  p99 {p99:>7.2f} мс  макс {samples[-1]:>7.2f} мс")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=1_000_000, help="записей в журнале")
+    parser.add_argument("--storage", default="durable", help="профиль хранения")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        build_ledger(Path(tmp) / "maint.db", args.size).close()
+        db = Database(Path(tmp) / "maint.db", storage_profile=args.storage)
+        try:
+            _, elapsed, samples = write_latencies(db, lambda: time.sleep(IDLE_SECONDS))
+            report("без операций", elapsed, samples)
+
+            backup, elapsed, samples = write_latencies(db, lambda: maintenance.backup(db))
+            report("backup", elapsed, samples)
+            print(f"  {backup.describe()}")
+
+            # треть месяцев удаляется, чтобы компактизации было что возвращать
+            months = [row[0] for row in db.get_monthly_summary()]
+            for month in months[: len(months) // 3]:
+                db.delete_records_by_month(month)
+            compact, elapsed, samples = write_latencies(db, lambda: maintenance.compact(db))
+            report("compact", elapsed, samples)
+            print(f"  {compact.describe()}")
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Сравнение старой (Python, strptime по каждой строке) и новой (monthly_rollup + LEAD)
+реализации Database.get_monthly_summary на синтетическом журнале.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_monthly_summary --sizes 1000 10000 100000 1000000
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import insert
+
+from database import Database, FinancialRecord
+
+
+def fill_ledger(db: Database, size: int, seed: int = 0):
+    """Заполняет базу size записями: по зарплате и авансу в месяц, остальное — "other"."""
+    rnd = random.Random(seed)
+    months = max(1, size // 20)
+    rows = []
+    for i in range(size):
+        month = i % months
+        year, mon = 2000 + month // 12, month % 12 + 1
+        if i < months:
+            rows.append({"date": f"{year:04d}-{mon:02d}-25", "amount": 60000.0, "category": "salary"})
+        elif i < 2 * months:
+            rows.append({"date": f"{year:04d}-{mon:02d}-10", "amount": 40000.0, "category": "advance"})
+        else:
+            day = rnd.randint(1, 28)
+            rows.append({"date": f"{year:04d}-{mon:02d}-{day:02d}", "amount": round(rnd.uniform(100, 5000), 2), "category": "other"})
+    with db.engine.begin() as conn:
+        conn.execute(insert(FinancialRecord), rows)
+
+
+def legacy_monthly_summary(db: Database):
+    """Прежний алгоритм get_monthly_summary — для сравнения скорости и результата."""
+    all_records = db.get_all_records()
+    monthly_total = defaultdict(float)
+    monthly_advance = defaultdict(float)
+    monthly_salary = defaultdict(float)
+    for _, date_str, amount, category in all_records:
+        try:
+            month_key = datetime.strptime(date_str, "%Y-%m-%d").strftime("%Y-%m")
+        except ValueError:
+            continue
+        monthly_total[month_key] += amount
+        if category == "advance":
+            monthly_advance[month_key] += amount
+        elif category == "salary":
+            monthly_salary[month_key] += amount
+    all_months = sorted(monthly_total)
+    result = []
+    for i, month_key in enumerate(all_months):
+        next_salary = monthly_salary[all_months[i + 1]] if i + 1 < len(all_months) else 0.0
+        result.append((month_key, monthly_total[month_key], monthly_advance[month_key] + next_salary))
+    return result
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def same_summary(left, right) -> bool:
+    return len(left) == len(right) and all(
+        a[0] == b[0] and abs(a[1] - b[1]) < 0.005 and abs(a[2] - b[2]) < 0.005
+        for a, b in zip(left, right)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--skip-legacy-above", type=int, default=1_000_000,
+                        help="не запускать старый алгоритм для журналов больше этого размера")
+    args = parser.parse_args()
+
+    print(f"{'записей':>10} {'SQL, с':>10} {'мкс/запись':>11} {'Python, с':>10} {'ускорение':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            db = Database(Path(tmp) / f"bench_{size}.db")
+            fill_ledger(db, size)
+            sql_time, sql_result = timed(db.get_monthly_summary)
+            per_row = sql_time / size * 1e6
+            if size <= args.skip_legacy_above:
+                py_time, py_result = timed(legacy_monthly_summary, db)
+                assert same_summary(sql_result, py_result), f"результаты расходятся на {size} записях"
+                print(f"{size:>10} {sql_time:>10.3f} {per_row:>11.2f} {py_time:>10.3f} {py_time / sql_time:>9.1f}x")
+            else:
+                print(f"{size:>10} {sql_time:>10.3f} {per_row:>11.2f} {'—':>10} {'—':>10}")
+            db.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Чтение записей: прежний путь через Session/ORM и компактный слой Database
+(скомпилированные один раз Core-запросы, Record прямо из строк курсора sqlite3).
+
+Для каждого метода печатаются время на строку (лучший из нескольких повторов)
+и пик памяти, выделенной за один вызов, в байтах на строку (tracemalloc).
+Прежние реализации повторены здесь, как в bench_monthly_summary; результаты
+обеих сверяются. Около 3 мкс на строку — работа самой SQLite (индекс, чтение
+строки таблицы, сортировка), её не сократить ни одним из путей.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_record_reads --size 200000
+"""
+import argparse
+import gc
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import select
+
+from benchmarks.synthetic import build_ledger
+from database import Database, FinancialRecord, parse_year_month
+from validation import ONCE_PER_MONTH
+
+REPEATS = 3
+
+
+def legacy_all_records(db: Database):
+    with db.SessionLocal() as session:
+        stmt = select(FinancialRecord).where(FinancialRecord.org_id == db.org_id).order_by(FinancialRecord.id)
+        return [(r.id, r.date, r.amount, r.category) for r in session.execute(stmt).scalars().all()]
+
+
+def legacy_iter_records(db: Database, batch_size: int = 5000):
+    stmt = (
+        select(FinancialRecord.id, FinancialRecord.date, FinancialRecord.amount, FinancialRecord.category)
+        .where(FinancialRecord.org_id == db.org_id)
+        .order_by(FinancialRecord.id)
+    )
+    with db.engine.connect() as connection:
+        for row in connection.execution_options(yield_per=batch_size).execute(stmt):
+            yield tuple(row)
+
+
+def legacy_records_by_month(db: Database, year_month: str):
+    with db.SessionLocal() as session:
+        stmt = (
+            select(FinancialRecord.id, FinancialRecord.date, FinancialRecord.amount, FinancialRecord.category)
+            .where(FinancialRecord.org_id == db.org_id, FinancialRecord.month == parse_year_month(year_month))
+            .order_by(FinancialRecord.id)
+        )
+        return [tuple(row) for row in session.execute(stmt)]
+
+
+def legacy_record_by_id(db: Database, record_id: int):
+    with db.SessionLocal() as session:
+        rec = session.get(FinancialRecord, record_id)
+        if rec is not None and rec.org_id == db.org_id:
+            return (rec.id, rec.date, rec.amount, rec.category)
+        return None
+
+
+def legacy_month_status(db: Database, year_month: str):
+    with db.SessionLocal() as session:
+        stmt = select(FinancialRecord.category).where(
+            FinancialRecord.org_id == db.org_id,
+            FinancialRecord.month == parse_year_month(year_month),
+            FinancialRecord.category.in_(ONCE_PER_MONTH),
+        )
+        return frozenset(session.scalars(stmt))
+
+
+def stream_total(records) -> float:
+    """Агрегирующий потребитель iter_records: сумма без списка в памяти."""
+    return sum(record[2] for record in records)
+
+
+def best_time(run: Callable[[], object]) -> float:
+    run()
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_bytes(run: Callable[[], object]) -> int:
+    """Пик памяти, выделенной за вызов (включая сам результат)."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=200_000, help="записей в журнале")
+    parser.add_argument("--calls", type=int, default=500, help="вызовов для помесячных и точечных чтений")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = build_ledger(Path(tmp) / "reads.db", args.size)
+        try:
+            months = [row[0] for row in db.get_monthly_summary()]
+            ids = [record.id for record in db.get_records_by_month(months[len(months) // 2])]
+            month_args = [months[i % len(months)] for i in range(args.calls)]
+            id_args = [ids[i % len(ids)] for i in range(args.calls)]
+            month_rows = [len(db.get_records_by_month(month)) for month in month_args]
+
+            # (метод, аргументы вызовов, строк в каждом вызове, прежняя реализация, новая)
+            cases = [
+                ("get_all_records", [()], [args.size], legacy_all_records, lambda db: db.get_all_records()),
+                ("iter_records", [()], [args.size],
+                 lambda db: stream_total(legacy_iter_records(db)), lambda db: stream_total(db.iter_records())),
+                ("get_records_by_month", [(m,) for m in month_args], month_rows,
+                 legacy_records_by_month, lambda db, m: db.get_records_by_month(m)),
+                ("get_record_by_id", [(i,) for i in id_args], [1] * len(id_args),
+                 legacy_record_by_id, lambda db, i: db.get_record_by_id(i)),
+                ("get_month_status", [(m,) for m in month_args], [1] * len(month_args),
+                 legacy_month_status, lambda db, m: db.get_month_status(m)),
+            ]
+            print(f"{'метод':<22} {'строк':>8} {'мкс/стр ORM':>12} {'мкс/стр':>9} {'быстрее':>8}"
+                  f" {'Б/стр ORM':>10} {'Б/стр':>7} {'меньше':>7}")
+            for name, call_args, rows, legacy, lean in cases:
+                assert [legacy(db, *a) for a in call_args] == [lean(db, *a) for a in call_args], \
+                    f"{name}: результаты расходятся"
+                total = sum(rows)
+                old_time = best_time(lambda: [legacy(db, *a) for a in call_args]) / total * 1e6
+                new_time = best_time(lambda: [lean(db, *a) for a in call_args]) / total * 1e6
+                # память — за один (первый) вызов, на его строки
+                old_bytes = peak_bytes(lambda: legacy(db, *call_args[0])) / rows[0]
+                new_bytes = peak_bytes(lambda: lean(db, *call_args[0])) / rows[0]
+                print(f"{name:<22} {total:>8} {old_time:>12.2f} {new_time:>9.2f} {old_time / new_time:>7.1f}x"
+                      f" {old_bytes:>10.0f} {new_bytes:>7.0f} {old_bytes / max(new_bytes, 1):>6.1f}x")
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Задержка одного вызова Database.add_record и Database.get_records_by_month
+для профилей хранения из storage.PROFILES (durable, fast, read-only).
+
+Каждый вызов измеряется отдельно; печатаются медиана и 95-й перцентиль.
+Кэш чтения выключен, чтобы каждое чтение доходило до SQLite. Профиль
+read-only не пишет, для него измеряется только чтение.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_storage_profiles --size 100000 --calls 500
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_monthly_summary import fill_ledger
+from database import Database
+from storage import PROFILES
+
+
+def latencies(func, calls: int) -> tuple[float, float]:
+    """(медиана, p95) времени вызова func(i) в микросекундах."""
+    samples = []
+    for i in range(calls):
+        start = time.perf_counter()
+        func(i)
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100_000, help="записей в базе перед замером")
+    parser.add_argument("--calls", type=int, default=500, help="вызовов каждого метода")
+    args = parser.parse_args()
+
+    print(f"{'профиль':<10} {'операция':<22} {'медиана, мкс':>13} {'p95, мкс':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, profile in PROFILES.items():
+            path = Path(tmp) / f"bench_{name.replace('-', '_')}.db"
+            seed_db = Database(path)
+            fill_ledger(seed_db, args.size)
+            months = [month for month, _, _ in seed_db.get_monthly_summary()]
+            seed_db.close()
+
+            db = Database(path, storage_profile=profile)
+            if not profile.read_only:
+                median, p95 = latencies(
+                    lambda i: db.add_record(f"{months[i % len(months)]}-15", 100.0 + i, "other"), args.calls
+                )
+                print(f"{name:<10} {'add_record':<22} {median:>13.0f} {p95:>10.0f}")
+            median, p95 = latencies(lambda i: db.get_records_by_month(months[i % len(months)]), args.calls)
+            print(f"{name:<10} {'get_records_by_month':<22} {median:>13.0f} {p95:>10.0f}")
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+Набор бенчмарков слоя данных: каждый публичный метод Database на синтетических
+журналах разного размера (benchmarks.synthetic) во временной базе — рабочая
+salary_test.db не используется.
+
+Каждый метод вызывается повторно, пока не наберётся --repeat запусков или
+--budget секунд (но хотя бы один раз); подготовка аргументов в замер не входит.
+Кэш чтения выключен. Результаты печатаются таблицей и, с --json, сохраняются
+в машиночитаемом виде. С --compare результаты сравниваются с сохранённым
+базовым файлом по лучшему времени (оно меньше всего зависит от шума): если
+метод из путей сводки, чтения месяца, проверки дубликата или периодов стал медленнее
+больше чем в --threshold раз, код выхода — 1.
+
+Запуск из корня репозитория:
+    python -m benchmarks.suite --sizes 1000 10000 100000 --json baseline.json
+    python -m benchmarks.suite --sizes 1000 10000 100000 --compare baseline.json
+    python -m benchmarks.suite --sizes 10000000 --data-dir ~/bench-ledgers   # 10^7, журнал переиспользуется
+"""
+import argparse
+import collections
+import inspect
+import json
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.synthetic import build_ledger, month_label, months_for
+from database import Database, OrgSettings, parse_year_month
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+# методы, регрессия которых роняет --compare: сводка, чтение месяца, проверка дубликата, периоды
+GATED_METHODS = {
+    "get_monthly_summary",
+    "get_monthly_summary_page",
+    "get_monthly_breakdown",
+    "get_records_by_month",
+    "get_records_page",
+    "has_salary_or_advance_in_month",
+    "get_month_status",
+    "get_period_totals",
+}
+# разница меньше этой не считается регрессией: шум таймера на микросекундных вызовах
+MIN_REGRESSION_MS = 0.05
+# не бенчмаркаются: close закрывает базу, которую использует весь набор,
+# transaction() лишь открывает блок — пакетные записи измеряются своими методами,
+# а repair_duplicates — разовая команда, на открытой базе она ничего не делает
+UNTIMED_METHODS = {"close", "transaction", "repair_duplicates"}
+# записей в одном вызове add_records/update_records/delete_records
+BATCH_SIZE = 100
+# месяц вне синтетического журнала, куда пишут изменяющие методы
+SCRATCH_MONTH = "2099-01"
+
+
+@dataclass
+class Context:
+    """Данные журнала, из которых собираются аргументы вызовов."""
+    db: Database
+    tmp: Path
+    month: str
+    month_ids: list[int]
+    first_month: str
+    rnd: random.Random = field(default_factory=lambda: random.Random(0))
+
+    def scratch_id(self) -> int:
+        """Новая запись в SCRATCH_MONTH, которую можно изменить или удалить."""
+        return self.db.add_record(f"{SCRATCH_MONTH}-15", 1.0, "other").inserted[0][0]
+
+    def scratch_ids(self, count: int = BATCH_SIZE) -> list[int]:
+        changes = self.db.add_records([(f"{SCRATCH_MONTH}-15", 1.0, "other")] * count)
+        return [record[0] for record in changes.inserted]
+
+
+@dataclass
+class Case:
+    method: str
+    args: Callable[[Context], tuple] = lambda ctx: ()
+    consume: bool = False               # результат — итератор, который нужно дочитать
+    max_size: int | None = None         # на больших журналах метод не вызывается
+
+
+def _fill_scratch_month(ctx: Context) -> tuple:
+    for day in range(1, 21):
+        ctx.db.add_record(f"{SCRATCH_MONTH}-{day:02d}", float(day), "other")
+    return (SCRATCH_MONTH,)
+
+
+def _snapshot_target(ctx: Context) -> tuple:
+    target = ctx.tmp / "snapshot.db"
+    target.unlink(missing_ok=True)
+    return (target,)
+
+
+# порядок важен: сначала чтение, потом методы, пишущие в SCRATCH_MONTH
+CASES = [
+    Case("cache_stats"),
+    Case("get_settings"),
+    Case("get_organization_name"),
+    Case("get_start_date"),
+    Case("get_end_date"),
+    Case("get_monthly_summary"),
+    Case("get_monthly_summary_page", lambda ctx: (ctx.month, 100)),
+    Case("get_monthly_breakdown", lambda ctx: (ctx.month,)),
+    Case("get_grand_total"),
+    Case("get_period_totals", lambda ctx: (ctx.first_month, ctx.month)),
+    Case("get_month_range"),
+    Case("count_records"),
+    Case("get_records_by_month", lambda ctx: (ctx.month,)),
+    Case("get_records_page", lambda ctx: (ctx.month, None, 100)),
+    Case("get_record_by_id", lambda ctx: (ctx.rnd.choice(ctx.month_ids),)),
+    Case("has_salary_or_advance_in_month", lambda ctx: (ctx.month, "salary")),
+    Case("get_month_status", lambda ctx: (ctx.month,)),
+    Case("get_once_per_month_taken"),
+    Case("list_organizations"),
+    Case("poll_changes"),
+    Case("rebuild_rollups", lambda ctx: (False,)),
+    Case("get_all_records", max_size=1_000_000),
+    Case("iter_records", consume=True),
+    Case("snapshot", _snapshot_target),
+    Case("save_settings", lambda ctx: (OrgSettings("Бенчмарк", "01.01.2020", None),)),
+    Case("set_organization_name", lambda ctx: ("Бенчмарк",)),
+    Case("set_start_date", lambda ctx: ("01.01.2020",)),
+    Case("set_end_date", lambda ctx: (None,)),
+    Case("add_record", lambda ctx: (f"{SCRATCH_MONTH}-{ctx.rnd.randint(1, 28):02d}", 1.0, "other")),
+    Case("update_record", lambda ctx: (ctx.scratch_id(), f"{SCRATCH_MONTH}-20", 2.0, "other")),
+    Case("delete_record_by_id", lambda ctx: (ctx.scratch_id(),)),
+    Case("add_records", lambda ctx: ([(f"{SCRATCH_MONTH}-{day % 28 + 1:02d}", 1.0, "other") for day in range(BATCH_SIZE)],)),
+    Case("update_records", lambda ctx: ([(id_, f"{SCRATCH_MONTH}-20", 2.0, "other") for id_ in ctx.scratch_ids()],)),
+    Case("delete_records", lambda ctx: (ctx.scratch_ids(),)),
+    Case("insert_batches", lambda ctx: ([[(f"{SCRATCH_MONTH}-05", 1.0, "other", parse_year_month(SCRATCH_MONTH))] * 1000],)),
+    Case("delete_records_by_month", _fill_scratch_month),
+    Case("create_organization", lambda ctx: ("Бенчмарк",)),
+    # переключение на ту же организацию: набор продолжает работать с журналом
+    Case("switch_organization", lambda ctx: (ctx.db.org_id,)),
+]
+
+
+def public_methods() -> set[str]:
+    return {
+        name for name, member in inspect.getmembers(Database, inspect.isfunction)
+        if not name.startswith("_")
+    } - UNTIMED_METHODS
+
+
+def run_case(case: Case, ctx: Context, repeat: int, budget: float) -> list[float]:
+    """Времена вызовов в миллисекундах."""
+    method = getattr(ctx.db, case.method)
+    samples: list[float] = []
+    spent = 0.0
+    while len(samples) < repeat and (not samples or spent < budget):
+        args = case.args(ctx)
+        start = time.perf_counter()
+        result = method(*args)
+        if case.consume:
+            collections.deque(result, maxlen=0)
+        elapsed = time.perf_counter() - start
+        samples.append(elapsed * 1000)
+        spent += elapsed
+    return samples
+
+
+def run_size(size: int, data_dir: Path, repeat: int, budget: float) -> list[dict[str, Any]]:
+    # журнал копируется, чтобы изменяющие методы не портили переиспользуемый файл
+    source = build_ledger(data_dir / f"ledger_{size}.db", size)
+    with tempfile.TemporaryDirectory() as tmp:
+        work_path = Path(tmp) / "bench.db"
+        source.snapshot(work_path)
+        source.close()
+        db = Database(work_path)
+
+        month = month_label(months_for(size) // 2)
+        ctx = Context(db, Path(tmp), month, [record[0] for record in db.get_records_by_month(month)], month_label(0))
+        results = []
+        for case in CASES:
+            if case.max_size is not None and size > case.max_size:
+                continue
+            samples = run_case(case, ctx, repeat, budget)
+            results.append({
+                "size": size,
+                "method": case.method,
+                "runs": len(samples),
+                "min_ms": min(samples),
+                "median_ms": statistics.median(samples),
+                "mean_ms": statistics.fmean(samples),
+            })
+        db.close()
+    return results
+
+
+def compare(results: list[dict[str, Any]], baseline: dict[str, Any], threshold: float) -> list[str]:
+    """Печатает сравнение лучших времён и возвращает регрессии в GATED_METHODS."""
+    before = {(row["size"], row["method"]): row["min_ms"] for row in baseline["results"]}
+    regressions = []
+    print(f"\n{'записей':>10} {'метод':<32} {'база, мс':>10} {'сейчас, мс':>11} {'×':>6}")
+    for row in results:
+        key = (row["size"], row["method"])
+        if key not in before:
+            continue
+        old, new = before[key], row["min_ms"]
+        ratio = new / old if old > 0 else float("inf")
+        regressed = ratio > threshold and new - old > MIN_REGRESSION_MS
+        mark = ""
+        if regressed:
+            mark = "  РЕГРЕССИЯ" if row["method"] in GATED_METHODS else "  медленнее"
+            if row["method"] in GATED_METHODS:
+                regressions.append(f"{row['method']} на {row['size']} записях: {old:.3f} → {new:.3f} мс")
+        print(f"{row['size']:>10} {row['method']:<32} {old:>10.3f} {new:>11.3f} {ratio:>6.2f}{mark}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=20, help="максимум вызовов каждого метода")
+    parser.add_argument("--budget", type=float, default=2.0, help="секунд на метод, после которых повторы прекращаются")
+    parser.add_argument("--data-dir", type=Path, help="каталог для переиспользования сгенерированных журналов")
+    parser.add_argument("--json", type=Path, help="сохранить результаты в JSON")
+    parser.add_argument("--compare", type=Path, help="базовый JSON для сравнения")
+    parser.add_argument("--threshold", type=float, default=1.25, help="допустимый рост лучшего времени, раз")
+    args = parser.parse_args()
+
+    missing = public_methods() - {case.method for case in CASES}
+    if missing:
+        sys.exit(f"Нет бенчмарка для методов Database: {', '.join(sorted(missing))}")
+
+    results: list[dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data_dir.expanduser() if args.data_dir else Path(tmp)
+        data_dir.mkdir(parents=True, exist_ok=True)
+        print(f"{'записей':>10} {'метод':<32} {'мин, мс':>10} {'медиана, мс':>12} {'вызовов':>8}")
+        for size in args.sizes:
+            for row in run_size(size, data_dir, args.repeat, args.budget):
+                print(f"{size:>10} {row['method']:<32} {row['min_ms']:>10.3f} {row['median_ms']:>12.3f} {row['runs']:>8}")
+                results.append(row)
+
+    report = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "budget_s": args.budget,
+        },
+        "results": results,
+    }
+    if args.json:
+        args.json.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    if args.compare:
+        regressions = compare(results, json.loads(args.compare.read_text(encoding="utf-8")), args.threshold)
+        if regressions:
+            print("\nРегрессии производительности:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Синтетические журналы для бенчмарков.
+
+Записи распределены по многим годам и всем трём категориям: по одной
+зарплате и одному авансу в месяц, остальное — "other". Небольшая доля строк
+получает некорректную дату (как те, что get_monthly_summary молча
+пропускает): несуществующий день, 13-й месяц, другой формат, пустая строка.
+
+База заполняется через Database.insert_batches, поэтому 10^7 записей
+вставляются за минуты, а не часы.
+"""
+import random
+from pathlib import Path
+from typing import Iterator
+
+from database import Database, month_number
+
+BATCH_SIZE = 50_000
+FIRST_YEAR = 1990
+MALFORMED_RATIO = 0.001
+MALFORMED_DATES = ("2023-02-30", "2023-13-05", "31.12.2023", "", "2023/04/01", "0000-00-00")
+
+
+def months_for(size: int) -> int:
+    """Сколько месяцев занимает журнал: ~20 записей в месяц, не больше 40 лет."""
+    return max(1, min(size // 20, 40 * 12))
+
+
+def month_label(index: int) -> str:
+    """Порядковый номер месяца журнала -> "YYYY-MM"."""
+    return f"{FIRST_YEAR + index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def generate_records(
+    size: int, seed: int = 0, malformed_ratio: float = MALFORMED_RATIO
+) -> Iterator[tuple[str, float, str, int | None]]:
+    """Записи (date, amount, category, month) в формате Database.insert_batches."""
+    rnd = random.Random(seed)
+    months = months_for(size)
+    for i in range(size):
+        label = month_label(i % months)
+        if i < months:
+            date, amount, category = f"{label}-25", 60000.0, "salary"
+        elif i < 2 * months:
+            date, amount, category = f"{label}-10", 40000.0, "advance"
+        else:
+            category = "other"
+            amount = round(rnd.uniform(100, 5000), 2)
+            if rnd.random() < malformed_ratio:
+                date = rnd.choice(MALFORMED_DATES)
+            else:
+                date = f"{label}-{rnd.randint(1, 28):02d}"
+        yield date, amount, category, month_number(date)
+
+
+def build_ledger(path: Path, size: int, seed: int = 0, **database_options) -> Database:
+    """Создаёт (или открывает уже заполненную) базу path с size синтетическими записями."""
+    db = Database(path, **database_options)
+    if db.count_records() == size:
+        return db
+    if db.count_records():
+        raise ValueError(f"{path} уже содержит другой журнал")
+
+    def batches() -> Iterator[list[tuple]]:
+        batch = []
+        for record in generate_records(size, seed):
+            batch.append(record)
+            if len(batch) >= BATCH_SIZE:
+                yield batch
+                batch = []
+        yield batch
+
+    db.insert_batches(batches())
+    return db
@@ -0,0 +1,54 @@
+"""
+Кэш чтения для Database: ограниченный LRU со счётчиком поколений.
+
+Любая запись в базу увеличивает поколение и сбрасывает кэш. Результат
+запроса сохраняется, только если за время его выполнения поколение не
+изменилось, поэтому устаревшие данные в кэш не попадают.
+"""
+import copy
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class ReadCache:
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_load(self, key: Hashable, load: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.copy(self._entries[key])
+            self.misses += 1
+            generation = self.generation
+
+        value = load()
+
+        with self._lock:
+            if generation == self.generation:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return copy.copy(value)
+
+    def invalidate(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "generation": self.generation,
+            }
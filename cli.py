@@ -0,0 +1,262 @@
+"""
+Консольный режим без интерфейса: отчёты, импорт и экспорт для скриптов и cron.
+
+    SalaryTracker summary [--json]
+    SalaryTracker month 2025-03 [--json]        записи месяца
+    SalaryTracker breakdown 2025-03 [--json]    суммы месяца по категориям
+    SalaryTracker total [--json]
+    SalaryTracker period 2024-01 2024-12 [--json] суммы за диапазон месяцев
+    SalaryTracker orgs [--json]
+    SalaryTracker import ФАЙЛ [--json]
+    SalaryTracker export ФАЙЛ [--format csv|jsonl|sqlite] [--overwrite] [--json]
+    SalaryTracker serve [--port 8765]            локальный JSON API (api_server)
+    SalaryTracker backup [--json]                онлайн-копия базы в backups (maintenance)
+    SalaryTracker compact [--json]               ANALYZE и возврат свободного места
+    SalaryTracker restore [ФАЙЛ] [--json]        восстановить базу из копии (по умолчанию последней)
+    SalaryTracker repair-duplicates [--json]     исправить повторы зарплаты/аванса, мешающие миграции
+
+Общие флаги: --storage ПРОФИЛЬ, --org ID (организация только на этот вызов,
+выбор в интерфейсе не меняется).
+
+Модуль не импортирует Textual, а database и SQLAlchemy подгружаются только при
+выполнении команды, поэтому main.py может проверить COMMANDS без лишних
+импортов. Код возврата: 0 — успех, 1 — ошибка данных или файла, 2 — ошибка
+аргументов (argparse).
+"""
+import argparse
+import json
+import sys
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+from storage import PROFILE_ENV, PROFILES
+
+if TYPE_CHECKING:
+    from database import Database
+
+COMMANDS = (
+    "summary", "month", "breakdown", "total", "period", "orgs", "import", "export", "serve",
+    "backup", "compact", "restore", "repair-duplicates",
+)
+# кэш чтения нужен только долгоживущему серверу: разовые команды читают один раз
+SERVE_CACHE_SIZE = 256
+EXPORT_FORMATS = ("csv", "jsonl", "sqlite")
+
+
+def _year_month(value: str) -> str:
+    try:
+        datetime.strptime(value, "%Y-%m")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"ожидается месяц ГГГГ-ММ, получено {value!r}") from None
+    return value
+
+
+def build_parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--storage", choices=list(PROFILES), default=None,
+                        help=f"профиль хранения SQLite (по умолчанию ${PROFILE_ENV} или durable)")
+    common.add_argument("--org", type=int, default=None, metavar="ID",
+                        help="id организации (по умолчанию текущая)")
+    common.add_argument("--json", action="store_true", help="вывести результат в JSON")
+
+    parser = argparse.ArgumentParser(prog="SalaryTracker", description="Консольный режим SalaryTracker")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("summary", parents=[common], help="сводка по месяцам")
+    month = commands.add_parser("month", parents=[common], help="записи месяца")
+    month.add_argument("year_month", type=_year_month, metavar="ГГГГ-ММ")
+    breakdown = commands.add_parser("breakdown", parents=[common], help="суммы месяца по категориям")
+    breakdown.add_argument("year_month", type=_year_month, metavar="ГГГГ-ММ")
+    commands.add_parser("total", parents=[common], help="сумма всех записей")
+    period = commands.add_parser("period", parents=[common], help="суммы по категориям за диапазон месяцев")
+    period.add_argument("first_month", type=_year_month, metavar="С_ГГГГ-ММ")
+    period.add_argument("last_month", type=_year_month, metavar="ПО_ГГГГ-ММ")
+    commands.add_parser("orgs", parents=[common], help="список организаций")
+    import_ = commands.add_parser("import", parents=[common], help="импорт из CSV/JSON Lines")
+    import_.add_argument("path", metavar="ФАЙЛ")
+    export = commands.add_parser("export", parents=[common], help="экспорт в CSV, JSON Lines или снимок SQLite")
+    export.add_argument("path", metavar="ФАЙЛ")
+    export.add_argument("--format", choices=EXPORT_FORMATS, default=None,
+                        help="по умолчанию — по расширению файла, иначе csv")
+    export.add_argument("--overwrite", action="store_true", help="перезаписать существующие файлы")
+    serve = commands.add_parser("serve", parents=[common], help="локальный JSON API на 127.0.0.1")
+    serve.add_argument("--port", type=int, default=None, help="порт (по умолчанию 8765)")
+    commands.add_parser("backup", parents=[common], help="резервная копия базы")
+    commands.add_parser("compact", parents=[common], help="ANALYZE и возврат свободного места (старой базе — разовый полный VACUUM)")
+    restore = commands.add_parser("restore", parents=[common], help="восстановить базу из резервной копии")
+    restore.add_argument("path", nargs="?", default=None, metavar="ФАЙЛ",
+                         help="копия (по умолчанию последняя); приложение должно быть закрыто")
+    commands.add_parser("repair-duplicates", parents=[common],
+                        help="лишние зарплаты/авансы месяца перевести в other и обновить схему")
+    return parser
+
+
+def _export_format(path: str, fmt: str | None) -> str:
+    if fmt:
+        return fmt
+    suffix = path.rsplit(".", 1)[-1].lower() if "." in path else ""
+    if suffix in ("jsonl", "ndjson"):
+        return "jsonl"
+    if suffix in ("db", "sqlite", "sqlite3"):
+        return "sqlite"
+    return "csv"
+
+
+def _summary(db: "Database", args) -> tuple[Any, list[str]]:
+    rows = db.get_monthly_summary()
+    data = [{"month": month, "total": total, "total_for_display": shown} for month, total, shown in rows]
+    lines = [f"{month}\t{total:.2f}\t{shown:.2f}" for month, total, shown in rows]
+    return data, lines
+
+
+def _month(db: "Database", args) -> tuple[Any, list[str]]:
+    records = db.get_records_by_month(args.year_month)
+    data = [{"id": id_, "date": date, "amount": amount, "category": category}
+            for id_, date, amount, category in records]
+    lines = [f"{id_}\t{date}\t{amount:.2f}\t{category}" for id_, date, amount, category in records]
+    return data, lines
+
+
+def _breakdown(db: "Database", args) -> tuple[Any, list[str]]:
+    data = db.get_monthly_breakdown(args.year_month)
+    return data, [f"{category}\t{amount:.2f}" for category, amount in data.items()]
+
+
+def _total(db: "Database", args) -> tuple[Any, list[str]]:
+    total = db.get_grand_total()
+    return {"total": total}, [f"{total:.2f}"]
+
+
+def _period(db: "Database", args) -> tuple[Any, list[str]]:
+    from dataclasses import asdict
+
+    data = asdict(db.get_period_totals(args.first_month, args.last_month))
+    return data, [f"{name}\t{value:.2f}" if isinstance(value, float) else f"{name}\t{value}" for name, value in data.items()]
+
+
+def _orgs(db: "Database", args) -> tuple[Any, list[str]]:
+    active = db.org_id
+    orgs = db.list_organizations()
+    data = [{"id": org.id, "name": org.name, "start_date": org.start_date, "end_date": org.end_date,
+             "active": org.id == active} for org in orgs]
+    lines = [f"{'*' if org.id == active else ' '} {org.id}\t{org.name or ''}\t{org.start_date or ''}\t{org.end_date or ''}"
+             for org in orgs]
+    return data, lines
+
+
+def _import(db: "Database", args) -> tuple[Any, list[str]]:
+    from importer import import_records
+
+    report = import_records(db, args.path)
+    data = {
+        "imported": report.imported,
+        "rejected": report.rejected,
+        "errors": [{"line": line_no, "reason": reason} for line_no, reason in report.errors],
+    }
+    lines = [f"Импортировано: {report.imported}, отклонено: {report.rejected}"]
+    lines += [f"  строка {line_no}: {reason}" for line_no, reason in report.errors]
+    return data, lines
+
+
+def _export(db: "Database", args) -> tuple[Any, list[str]]:
+    from exporter import export_ledger
+
+    fmt = _export_format(args.path, args.format)
+    written = export_ledger(db, args.path, fmt, overwrite=args.overwrite)
+    return {"path": args.path, "format": fmt, "records": written}, [f"Выгружено записей: {written} → {args.path}"]
+
+
+def _serve(db: "Database", args) -> tuple[Any, list[str]]:
+    import asyncio
+
+    from api_server import DEFAULT_PORT, serve
+
+    try:
+        asyncio.run(serve(db, args.port if args.port is not None else DEFAULT_PORT))
+    except KeyboardInterrupt:
+        pass
+    return None, []
+
+
+def _backup(db: "Database", args) -> tuple[Any, list[str]]:
+    from maintenance import backup
+
+    report = backup(db, pause=0)
+    data = {"path": str(report.path), "bytes": report.size, "seconds": report.seconds,
+            "removed": [str(path) for path in report.removed]}
+    return data, [report.describe()]
+
+
+def _compact(db: "Database", args) -> tuple[Any, list[str]]:
+    from maintenance import compact
+
+    # явная команда: старую базу можно перевести в auto_vacuum=INCREMENTAL полным VACUUM
+    report = compact(db, pause=0, convert=True)
+    data = {"bytes_before": report.size_before, "bytes_after": report.size_after, "reclaimed": report.reclaimed,
+            "pages_freed": report.pages_freed, "seconds": report.seconds, "full_vacuum": report.full_vacuum}
+    return data, [report.describe()]
+
+
+def _restore(db: "Database", args) -> tuple[Any, list[str]]:
+    from maintenance import restore
+
+    report = restore(db, args.path)
+    data = {"source": str(report.source), "safety_copy": str(report.safety_copy) if report.safety_copy else None,
+            "seconds": report.seconds}
+    return data, [report.describe()]
+
+
+def _repair_duplicates(db: "Database", args) -> tuple[Any, list[str]]:
+    duplicates = db.repair_duplicates()
+    data = [{"org_id": d.org_id, "month": d.year_month, "category": d.category,
+             "kept": d.ids[0], "recategorized": list(d.ids[1:])} for d in duplicates]
+    lines = [f"{d.describe()} — оставлена {d.ids[0]}, остальные переведены в other" for d in duplicates]
+    return data, lines or ["Повторов нет"]
+
+
+HANDLERS = {
+    "summary": _summary,
+    "month": _month,
+    "breakdown": _breakdown,
+    "total": _total,
+    "period": _period,
+    "orgs": _orgs,
+    "import": _import,
+    "export": _export,
+    "serve": _serve,
+    "backup": _backup,
+    "compact": _compact,
+    "restore": _restore,
+    "repair-duplicates": _repair_duplicates,
+}
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    from database import Database
+
+    try:
+        cache_size = SERVE_CACHE_SIZE if args.command == "serve" else 0
+        db = Database(cache_size=cache_size, storage_profile=args.storage, org_id=args.org)
+        try:
+            # repair-duplicates открывает базу сам: до исправления миграция её не откроет
+            check_org = args.org is not None and args.command != "repair-duplicates"
+            if check_org and args.org not in {org.id for org in db.list_organizations()}:
+                raise ValueError(f"Организация {args.org} не найдена")
+            data, lines = HANDLERS[args.command](db, args)
+        finally:
+            db.close()
+    except (OSError, ValueError) as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        return 1
+    if data is None:
+        return 0
+    if args.json:
+        json.dump(data, sys.stdout, ensure_ascii=False)
+        sys.stdout.write("\n")
+    elif lines:
+        print("\n".join(lines))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
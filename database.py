@@ -1,32 +1,117 @@
 from platformdirs import user_data_dir
 from pathlib import Path
-from sqlalchemy import create_engine, select, delete
+from sqlalchemy import Engine, bindparam, event, select, delete, func, text, tuple_
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
-from sqlalchemy import Integer, String, Float
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import ForeignKey, Integer, String, Float, Index, update
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
 
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from datetime import datetime
+from functools import partial, wraps
+from typing import TYPE_CHECKING, Iterable, Iterator, NamedTuple
+
+import migrations
+from cache import ReadCache
+from periods import PeriodTotals, PrefixSumIndex
+from storage import StorageProfile, create_storage_engine, resolve_profile
+from validation import ONCE_PER_MONTH, DuplicateRecordError, parse_date
+
+if TYPE_CHECKING:
+    import sqlite3
+
+    from sqlalchemy import Connection, Select
+
+    from ledger import ColumnarLedger
 
 APP_NAME = "SalaryTracker"
 APP_AUTHOR = "SalaryAuthor"
 
+# каталог создаётся при первом подключении, а не при импорте модуля
 data_dir = Path(user_data_dir(APP_NAME, APP_AUTHOR))
-data_dir.mkdir(parents=True, exist_ok=True)
 DATABASE_PATH = data_dir / "salary_test.db"
 
-engine = create_engine(f"sqlite:///{DATABASE_PATH}", echo=False)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def month_number(date_str: str | None) -> int | None:
+    """Месяц даты "YYYY-MM-DD" в виде YYYYMM или None, если дата некорректна."""
+    try:
+        dt = parse_date(date_str)
+    except (TypeError, ValueError):
+        return None
+    return dt.year * 100 + dt.month
+
+
+def parse_year_month(year_month: str) -> int | None:
+    """"YYYY-MM" -> YYYYMM или None, если строка некорректна."""
+    try:
+        dt = datetime.strptime(year_month, "%Y-%m")
+    except (TypeError, ValueError):
+        return None
+    return dt.year * 100 + dt.month
+
+
+def format_month(month: int) -> str:
+    """YYYYMM -> "YYYY-MM"."""
+    return f"{month // 100:04d}-{month % 100:02d}"
+
+
+def _month_default(context) -> int | None:
+    return month_number(context.get_current_parameters().get("date"))
+
 
 class Base(DeclarativeBase):
     pass
 
+class Organization(Base):
+    """Организация (работодатель, человек), которой принадлежат записи."""
+    __tablename__ = "organizations"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # None у организации, созданной миграцией до первоначальной настройки
+    name: Mapped[str | None] = mapped_column(String)
+    start_date: Mapped[str | None] = mapped_column(String)
+    end_date: Mapped[str | None] = mapped_column(String)
+
 class FinancialRecord(Base):
     __tablename__ = "financial_records"
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # server_default нужен миграциям, которые вставляют записи без org_id
+    org_id: Mapped[int] = mapped_column(Integer, ForeignKey("organizations.id"), nullable=False, server_default="1")
     date: Mapped[str] = mapped_column(String, nullable=False)
     amount: Mapped[float] = mapped_column(Float, nullable=False)
     category: Mapped[str] = mapped_column(String, nullable=False)
+    # YYYYMM, вычисляется из date при записи; None для некорректных дат
+    month: Mapped[int | None] = mapped_column(Integer, default=_month_default)
+
+    __table_args__ = (
+        # все запросы идут внутри организации, поэтому org_id — ведущая колонка индексов
+        Index("ix_financial_records_org_month_category", "org_id", "month", "category"),
+        Index("ix_financial_records_org_month_date", "org_id", "month", "date"),
+        # правило "одна зарплата и один аванс в месяц" держит сама база
+        Index(
+            "ux_financial_records_once_per_month", "org_id", "month", "category",
+            unique=True, sqlite_where=text("category IN ('salary', 'advance')"),
+        ),
+    )
+
+class MonthlyRollup(Base):
+    """Суммы по месяцам организации; обновляется триггерами из migrations.REVISION_ROLLUP_TRIGGERS."""
+    __tablename__ = "monthly_rollup"
+
+    org_id: Mapped[int] = mapped_column(Integer, primary_key=True, server_default="1")
+    month: Mapped[int] = mapped_column(Integer, primary_key=True)
+    salary: Mapped[float] = mapped_column(Float, nullable=False)
+    advance: Mapped[float] = mapped_column(Float, nullable=False)
+    other: Mapped[float] = mapped_column(Float, nullable=False)
+    total: Mapped[float] = mapped_column(Float, nullable=False)
+    records: Mapped[int] = mapped_column(Integer, nullable=False)
+    # растёт при каждом изменении месяца: по нему poll_changes видит чужие записи
+    revision: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
 
 class Setting(Base):
     __tablename__ = "settings"
@@ -35,203 +120,1003 @@ class Setting(Base):
     value: Mapped[str | None] = mapped_column(String)
 
 
-Base.metadata.create_all(bind=engine)
+ACTIVE_ORG_KEY = "active_org_id"
+
+
+class Record(NamedTuple):
+    """Запись журнала: кортеж (id, date, amount, category) без __dict__, строится прямо из строки курсора."""
+    id: int
+    date: str
+    amount: float
+    category: str
+
+
+# Record из строки курсора одним вызовом C, без Python-кадра Record._make на строку
+_record = partial(tuple.__new__, Record)
+
+SummaryRow = tuple[str, float, float]         # (месяц, total, total_for_display)
+
+
+@dataclass
+class ChangeSet:
+    """Что изменила операция записи — чтобы экраны обновили только затронутые строки."""
+    inserted: list[Record] = field(default_factory=list)
+    updated: list[Record] = field(default_factory=list)
+    removed: list[int] = field(default_factory=list)
+    # строки сводки, которые нужно добавить или обновить, и месяцы, исчезнувшие из сводки
+    summary_updated: list[SummaryRow] = field(default_factory=list)
+    summary_removed: list[str] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class ExternalChange:
+    """Месяцы, которые с прошлой проверки poll_changes изменили другие соединения."""
+    months: frozenset[str]      # "YYYY-MM"
+    changes: ChangeSet          # строки сводки этих месяцев и их предшественников
+
+
+@dataclass(frozen=True)
+class OrgSettings:
+    """Снимок настроек текущей организации."""
+    org_name: str | None = None
+    start_date: str | None = None
+    end_date: str | None = None
+
+
+@dataclass(frozen=True)
+class OrgInfo:
+    """Организация в списке для переключателя."""
+    id: int
+    name: str | None
+    start_date: str | None = None
+    end_date: str | None = None
+
+
+MONTHLY_SUMMARY_SQL = """
+SELECT
+    printf('%04d-%02d', month / 100, month % 100) AS month,
+    total,
+    advance + COALESCE(LEAD(salary) OVER (ORDER BY month), 0.0) AS total_for_display
+FROM monthly_rollup
+WHERE org_id = :org_id
+ORDER BY monthly_rollup.month
+"""
+
+# Страница сводки после месяца :after. Берётся на строку больше, чтобы LEAD
+# для последнего месяца страницы видел зарплату следующего.
+MONTHLY_SUMMARY_PAGE_SQL = """
+SELECT
+    printf('%04d-%02d', month / 100, month % 100) AS month,
+    total,
+    advance + COALESCE(LEAD(salary) OVER (ORDER BY month), 0.0) AS total_for_display
+FROM (
+    SELECT month, total, advance, salary
+    FROM monthly_rollup
+    WHERE org_id = :org_id AND month > :after
+    ORDER BY month
+    LIMIT :limit + 1
+) AS page
+ORDER BY page.month
+"""
+
+# Строки сводки для отдельных месяцев; зарплата следующего месяца — по первичному ключу
+SUMMARY_ROWS_SQL = text("""
+SELECT
+    printf('%04d-%02d', r.month / 100, r.month % 100) AS month,
+    r.total,
+    r.advance + COALESCE(
+        (
+            SELECT n.salary FROM monthly_rollup AS n
+            WHERE n.org_id = r.org_id AND n.month > r.month
+            ORDER BY n.month LIMIT 1
+        ),
+        0.0
+    ) AS total_for_display
+FROM monthly_rollup AS r
+WHERE r.org_id = :org_id AND r.month IN :months
+ORDER BY r.month
+""").bindparams(bindparam("months", expanding=True))
+
+# Эталонный пересчёт monthly_rollup из financial_records (для rebuild_rollups)
+ROLLUP_AGGREGATE_SQL = """
+SELECT
+    month,
+    SUM(CASE WHEN category = 'salary' THEN amount ELSE 0.0 END) AS salary,
+    SUM(CASE WHEN category = 'advance' THEN amount ELSE 0.0 END) AS advance,
+    SUM(CASE WHEN category NOT IN ('salary', 'advance') THEN amount ELSE 0.0 END) AS other,
+    SUM(amount) AS total,
+    COUNT(*) AS records
+FROM financial_records
+WHERE org_id = :org_id AND month IS NOT NULL
+GROUP BY month
+"""
+
+ROLLUP_TOLERANCE = 1e-6
+
+# Сколько id или пар (месяц, категория) подставлять в один IN: предел переменных SQLite
+IN_CHUNK_SIZE = 500
+
+# org_id подставляется как целое в insert_batches: так executemany получает готовые кортежи импорта
+INSERT_RECORD_SQL = "INSERT INTO financial_records (date, amount, category, month, org_id) VALUES (?, ?, ?, ?, {org_id:d})"
+
+
+class _CompiledQuery:
+    """
+    Core-запрос, один раз скомпилированный в SQL драйвера (при первом вызове).
+    Выполняется через exec_driver_sql — события курсора для профилировщика и
+    проверки планов срабатывают, — а строки читаются прямо из курсора sqlite3,
+    без Row, Session и identity map.
+    """
+    __slots__ = ("_stmt", "_sql", "_names", "_defaults")
+
+    def __init__(self, stmt: "Select"):
+        self._stmt = stmt
+        self._sql: str | None = None
+
+    def _compile(self):
+        compiled = self._stmt.compile(dialect=sqlite.dialect())
+        self._names = tuple(compiled.positiontup or ())
+        # значения, заданные в самом запросе (категории IN, OFFSET)
+        self._defaults = {name: bind.value for name, bind in compiled.binds.items()}
+        self._sql = str(compiled)
+
+    def cursor(self, connection: "Connection", **params) -> "sqlite3.Cursor":
+        if self._sql is None:
+            self._compile()
+        values = tuple(params[name] if name in params else self._defaults[name] for name in self._names)
+        return connection.exec_driver_sql(self._sql, values).cursor
+
+
+_RECORD_COLUMNS = (FinancialRecord.id, FinancialRecord.date, FinancialRecord.amount, FinancialRecord.category)
+_OWN_RECORDS = select(*_RECORD_COLUMNS).where(FinancialRecord.org_id == bindparam("org_id"))
+_MONTH_RECORDS = _OWN_RECORDS.where(FinancialRecord.month == bindparam("month"))
+
+RECORDS_QUERY = _CompiledQuery(_OWN_RECORDS.order_by(FinancialRecord.id))
+MONTH_RECORDS_QUERY = _CompiledQuery(_MONTH_RECORDS.order_by(FinancialRecord.id))
+# страница месяца по ключу (date, id): первая и следующие
+MONTH_PAGE_QUERY = _CompiledQuery(
+    _MONTH_RECORDS.order_by(FinancialRecord.date, FinancialRecord.id).limit(bindparam("limit"))
+)
+MONTH_PAGE_AFTER_QUERY = _CompiledQuery(
+    _MONTH_RECORDS
+    .where(tuple_(FinancialRecord.date, FinancialRecord.id) > tuple_(bindparam("after_date"), bindparam("after_id")))
+    .order_by(FinancialRecord.date, FinancialRecord.id)
+    .limit(bindparam("limit"))
+)
+RECORD_BY_ID_QUERY = _CompiledQuery(_OWN_RECORDS.where(FinancialRecord.id == bindparam("id")))
+MONTH_STATUS_QUERY = _CompiledQuery(
+    select(FinancialRecord.category).where(
+        FinancialRecord.org_id == bindparam("org_id"),
+        FinancialRecord.month == bindparam("month"),
+        FinancialRecord.category.in_([bindparam(f"once_{category}", category) for category in ONCE_PER_MONTH]),
+    )
+)
+
+
+def _chunks(values: list, size: int = IN_CHUNK_SIZE) -> Iterator[list]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _register_sql_functions(dbapi_connection, connection_record):
+    dbapi_connection.create_function("month_number", 1, month_number, deterministic=True)
+
+
+def _cached(method):
+    """Чтение через кэш Database (если он включён)."""
+    @wraps(method)
+    def wrapper(self: "Database", *args, **kwargs):
+        if self.cache is None:
+            return method(self, *args, **kwargs)
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        return self.cache.get_or_load(key, lambda: method(self, *args, **kwargs))
+    return wrapper
+
+
+def _invalidates(method):
+    """Запись: после неё растёт data_version и сбрасывается кэш Database."""
+    @wraps(method)
+    def wrapper(self: "Database", *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._changed()
+    return wrapper
 
 
 class Database:
 
+    def __init__(
+        self,
+        database_path: Path | str = DATABASE_PATH,
+        cache_size: int = 0,
+        columnar: bool = False,
+        storage_profile: StorageProfile | str | None = None,
+        org_id: int | None = None,
+    ):
+        """
+        cache_size > 0 включает LRU-кэш чтения на указанное число результатов.
+        columnar=True считает сводки по колоночному журналу в памяти (нужен numpy).
+        storage_profile — профиль хранения из storage.PROFILES; по умолчанию берётся
+        из переменной окружения SALARY_STORAGE_PROFILE или "durable".
+        org_id — организация, к которой относятся все запросы; по умолчанию —
+        выбранная в прошлый раз (settings.active_org_id).
+
+        Конструктор не подключается к базе: движок создаётся, а схема создаётся и
+        мигрируется при первом запросе (см. свойство engine).
+        """
+        self.database_path = Path(database_path)
+        self.storage_profile = resolve_profile(storage_profile)
+        self.cache = ReadCache(cache_size) if cache_size > 0 else None
+        if columnar:
+            # numpy импортируется, только если журнал в памяти действительно нужен
+            from ledger import ColumnarLedger
+
+            self.ledger: ColumnarLedger | None = ColumnarLedger()
+        else:
+            self.ledger = None
+        # журнал в памяти не потокобезопасен, а Database вызывается и из пула AsyncDatabase
+        self._ledger_lock = threading.RLock()
+        self._engine: Engine | None = None
+        self._session_factory: sessionmaker | None = None
+        self._engine_lock = threading.Lock()
+        self._org_id = org_id
+        # индекс префиксных сумм для get_period_totals; строится при первом запросе периода
+        self._periods: PrefixSumIndex | None = None
+        self._periods_lock = threading.Lock()
+        self._data_version = 0
+        self._version_lock = threading.Lock()
+        # сессия открытой transaction() — своя у каждого потока
+        self._local = threading.local()
+        # poll_changes: своё соединение для PRAGMA data_version и снимок месяцев
+        # {месяц: (revision, records, total)}; None — снимок ещё не снят
+        self._watch = None
+        self._watch_version: int | None = None
+        self._watch_snapshot: dict[int, tuple[int, int, float]] | None = None
+        self._watch_lock = threading.RLock()
+
+    @property
+    def data_version(self) -> int:
+        """
+        Счётчик изменений, сделанных через этот Database (включая смену организации)
+        или найденных poll_changes.
+        Значение, прочитанное до запроса, можно использовать как версию его результата.
+        """
+        return self._data_version
+
+    def _changed(self):
+        with self._version_lock:
+            self._data_version += 1
+        if self.cache is not None:
+            self.cache.invalidate()
+
+    @property
+    def engine(self) -> Engine:
+        """Движок SQLite; при первом обращении подключается к базе и готовит схему."""
+        if self._engine is None:
+            with self._engine_lock:
+                if self._engine is None:
+                    self._engine = self._open_engine()
+        return self._engine
+
+    @property
+    def SessionLocal(self) -> sessionmaker:
+        self.engine
+        assert self._session_factory is not None
+        return self._session_factory
+
+    def _open_engine(self, repair: bool = False) -> Engine:
+        if not self.storage_profile.read_only:
+            self.database_path.parent.mkdir(parents=True, exist_ok=True)
+        engine = create_storage_engine(self.database_path, self.storage_profile)
+        event.listen(engine, "connect", _register_sql_functions)
+        try:
+            with engine.begin() as connection:
+                if self.storage_profile.read_only:
+                    # в режиме только чтения схему нельзя ни создать, ни обновить
+                    if migrations.get_schema_version(connection) < migrations.LATEST_VERSION:
+                        raise RuntimeError(
+                            f"Схема базы {self.database_path} устарела; откройте её один раз без профиля read-only"
+                        )
+                else:
+                    Base.metadata.create_all(bind=connection)
+                    # миграция, отказавшаяся от данных (DuplicateRecordsError), откатывает всё обновление
+                    migrations.upgrade(connection, repair=repair)
+                if self._org_id is None:
+                    self._org_id = self._stored_org_id(connection)
+        except Exception:
+            engine.dispose()
+            raise
+        self._session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        return engine
+
+    @staticmethod
+    def _stored_org_id(connection) -> int:
+        """Последняя выбранная организация; если её удалили — первая по id."""
+        value = connection.execute(select(Setting.value).where(Setting.key == ACTIVE_ORG_KEY)).scalar()
+        if value is not None and value.isdigit():
+            if connection.execute(select(Organization.id).where(Organization.id == int(value))).scalar() is not None:
+                return int(value)
+        first = connection.execute(select(func.min(Organization.id))).scalar()
+        assert first is not None, "миграция 0004 всегда создаёт организацию"
+        return first
+
+    @property
+    def org_id(self) -> int:
+        """Текущая организация: все чтения и записи Database ограничены ею."""
+        if self._org_id is None:
+            self.engine
+        assert self._org_id is not None
+        return self._org_id
+
+    def _loaded_ledger(self) -> "ColumnarLedger":
+        """Журнал в памяти, загруженный при необходимости. Вызывать под self._ledger_lock."""
+        assert self.ledger is not None
+        if not self.ledger.loaded:
+            self.ledger.load(self.engine, self.org_id)
+        return self.ledger
+
+    def _ledger_stale(self):
+        if self.ledger is not None:
+            with self._ledger_lock:
+                self.ledger.invalidate()
+
+    def _periods_stale(self):
+        """Массовое изменение: индекс периодов пересоберётся при следующем запросе."""
+        with self._periods_lock:
+            self._periods = None
+
+    def _period_index(self) -> PrefixSumIndex:
+        """Вызывается под _periods_lock."""
+        if self._periods is None:
+            with self.SessionLocal() as session:
+                rows = session.execute(
+                    select(
+                        MonthlyRollup.month, MonthlyRollup.salary, MonthlyRollup.advance,
+                        MonthlyRollup.other, MonthlyRollup.total, MonthlyRollup.records,
+                    ).where(MonthlyRollup.org_id == self.org_id)
+                )
+                self._periods = PrefixSumIndex(tuple(row) for row in rows)
+        return self._periods
+
+    def _refresh_periods(self, session, months: set[int]):
+        """Переносит в индекс периодов новые итоги months из monthly_rollup."""
+        with self._periods_lock:
+            if self._periods is None:
+                return
+            # чтение под блокировкой: индекс получает итоги в том порядке, в каком их видит база
+            rows = {
+                row.month: (row.salary, row.advance, row.other, row.total, row.records)
+                for row in session.execute(
+                    select(MonthlyRollup).where(MonthlyRollup.org_id == self.org_id, MonthlyRollup.month.in_(months))
+                ).scalars()
+            }
+            for month in months:
+                self._periods.set_month(month, rows.get(month))
+
+    def _rollup_states(self, session, months: Iterable[int] | None = None) -> dict[int, tuple[int, int, float]]:
+        """{месяц: (revision, records, total)} из monthly_rollup текущей организации."""
+        stmt = select(
+            MonthlyRollup.month, MonthlyRollup.revision, MonthlyRollup.records, MonthlyRollup.total
+        ).where(MonthlyRollup.org_id == self.org_id)
+        if months is not None:
+            stmt = stmt.where(MonthlyRollup.month.in_(months))
+        return {month: (revision, records, total) for month, revision, records, total in session.execute(stmt)}
+
+    def _watch_seen(self, states: dict[int, tuple[int, int, float]], months: Iterable[int]):
+        """Вносит в снимок poll_changes свои изменения months, чтобы не вернуть их как чужие."""
+        with self._watch_lock:
+            if self._watch_snapshot is None:
+                return
+            for month in months:
+                if month in states:
+                    self._watch_snapshot[month] = states[month]
+                else:
+                    self._watch_snapshot.pop(month, None)
+
+    def _watch_reset(self):
+        """Массовое изменение или смена организации: poll_changes снимет снимок заново."""
+        with self._watch_lock:
+            self._watch_snapshot = None
+
+    def poll_changes(self) -> ExternalChange | None:
+        """
+        Месяцы текущей организации, изменённые с прошлого вызова другими
+        процессами (или другим Database над тем же файлом), или None.
+
+        Пока база не менялась, вызов — один PRAGMA data_version на отдельном
+        соединении, без чтения таблиц. Когда версия сдвинулась, (revision,
+        records, total) месяцев из monthly_rollup сравниваются с прошлым снимком;
+        свои изменения в снимок уже внесены и не возвращаются. Для чужих
+        изменений сбрасываются кэш и журнал в памяти, растёт data_version.
+        Первый вызов только снимает снимок.
+        """
+        with self._watch_lock:
+            if self._watch is None:
+                self._watch = self.engine.raw_connection()
+            version = self._watch.driver_connection.execute("PRAGMA data_version").fetchone()[0]
+            if version == self._watch_version and self._watch_snapshot is not None:
+                return None
+            self._watch_version = version
+            with self.SessionLocal() as session:
+                current = self._rollup_states(session)
+                previous, self._watch_snapshot = self._watch_snapshot, current
+                if previous is None:
+                    return None
+                months = {month for month in current.keys() | previous.keys() if current.get(month) != previous.get(month)}
+                if not months:
+                    return None
+                changes = self._summary_changes(session, ChangeSet(), months)
+        self._ledger_stale()
+        self._changed()
+        return ExternalChange(frozenset(format_month(month) for month in months), changes)
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Единица работы: add_records/update_records/delete_records (и однострочные
+        методы записи) внутри блока идут одной транзакцией и фиксируются одним
+        commit на выходе; исключение из блока откатывает всё. Вложенный
+        transaction() присоединяется к внешнему.
+
+        Транзакция привязана к потоку, поэтому через AsyncDatabase её не открыть:
+        там каждая пакетная операция и так выполняется одним commit.
+        """
+        if getattr(self._local, "session", None) is not None:
+            yield
+            return
+        session = self.SessionLocal()
+        self._local.session = session
+        committed = False
+        try:
+            yield
+            session.commit()
+            committed = True
+        finally:
+            self._local.session = None
+            session.close()
+            if not committed:
+                # журнал и индекс периодов в памяти уже видели откатанные изменения
+                self._ledger_stale()
+                self._periods_stale()
+                self._watch_reset()
+            # чтения, сделанные до commit, могли попасть в кэш
+            self._changed()
+
+    @contextmanager
+    def _write_session(self) -> Iterator[Session]:
+        """Сессия открытой transaction() или новая транзакция с commit на выходе."""
+        session = getattr(self._local, "session", None)
+        if session is not None:
+            yield session
+            return
+        with self.transaction():
+            yield self._local.session
+
+    def close(self):
+        """Закрывает соединения пула; при WAL последнее соединение сбрасывает журнал в файл базы."""
+        with self._watch_lock:
+            if self._watch is not None:
+                self._watch.close()
+                self._watch = None
+                self._watch_version = None
+        if self._engine is not None:
+            self._engine.dispose()
+
+    def cache_stats(self) -> dict[str, int] | None:
+        """Счётчики попаданий/промахов кэша или None, если кэш выключен."""
+        return self.cache.stats() if self.cache is not None else None
+
+    @_cached
+    def get_settings(self) -> OrgSettings:
+        """Все настройки текущей организации одним запросом."""
+        with self.SessionLocal() as session:
+            org = session.get(Organization, self.org_id)
+            if org is None:
+                return OrgSettings()
+            return OrgSettings(org.name, org.start_date, org.end_date)
+
+    @_invalidates
+    def save_settings(self, settings: OrgSettings):
+        """Сохраняет все настройки текущей организации одной транзакцией."""
+        self._update_organization({
+            "name": settings.org_name.strip() if settings.org_name else settings.org_name,
+            "start_date": settings.start_date.strip() if settings.start_date else None,
+            "end_date": settings.end_date.strip() if settings.end_date else None,
+        })
+
+    def _update_organization(self, values: dict[str, str | None]):
+        with self.SessionLocal() as session:
+            session.execute(update(Organization).where(Organization.id == self.org_id).values(values))
+            session.commit()
+
+    def _upsert_settings(self, values: dict[str, str | None]):
+        stmt = sqlite_insert(Setting)
+        stmt = stmt.on_conflict_do_update(index_elements=[Setting.key], set_={"value": stmt.excluded.value})
+        with self.SessionLocal() as session:
+            session.execute(stmt, [{"key": key, "value": value} for key, value in values.items()])
+            session.commit()
+
     def get_organization_name(self) -> str | None:
-        with SessionLocal() as session:
-            stmt = select(Setting.value).where(Setting.key == "org_name")
-            return session.execute(stmt).scalar()
+        return self.get_settings().org_name
 
+    @_invalidates
     def set_organization_name(self, name: str):
-        name = name.strip()
-        with SessionLocal() as session:
-            setting = session.execute(
-                select(Setting).where(Setting.key == "org_name")
-            ).scalar_one_or_none()
-            if setting:
-                setting.value = name
-            else:
-                session.add(Setting(key="org_name", value=name))
-            session.commit()
+        self._update_organization({"name": name.strip()})
 
     def get_start_date(self) -> str | None:
-        with SessionLocal() as session:
-            stmt = select(Setting.value).where(Setting.key == "start_date")
-            return session.execute(stmt).scalar()
+        return self.get_settings().start_date
 
+    @_invalidates
     def set_start_date(self, date: str | None):
-        date = date.strip() if date else None
-        with SessionLocal() as session:
-            setting = session.execute(
-                select(Setting).where(Setting.key == "start_date")
-            ).scalar_one_or_none()
-            if setting:
-                setting.value = date
-            else:
-                session.add(Setting(key="start_date", value=date))
-            session.commit()
+        self._update_organization({"start_date": date.strip() if date else None})
 
     def get_end_date(self) -> str | None:
-        with SessionLocal() as session:
-            stmt = select(Setting.value).where(Setting.key == "end_date")
-            return session.execute(stmt).scalar()
+        return self.get_settings().end_date
 
+    @_invalidates
     def set_end_date(self, date: str | None):
-        date = date.strip() if date else None
-        with SessionLocal() as session:
-            setting = session.execute(
-                select(Setting).where(Setting.key == "end_date")
-            ).scalar_one_or_none()
-            if setting:
-                setting.value = date
-            else:
-                session.add(Setting(key="end_date", value=date))
+        self._update_organization({"end_date": date.strip() if date else None})
+
+    @_cached
+    def list_organizations(self) -> list[OrgInfo]:
+        """Все организации по порядку создания."""
+        with self.SessionLocal() as session:
+            orgs = session.execute(select(Organization).order_by(Organization.id)).scalars()
+            return [OrgInfo(org.id, org.name, org.start_date, org.end_date) for org in orgs]
+
+    @_invalidates
+    def create_organization(self, name: str, start_date: str | None = None, end_date: str | None = None) -> int:
+        """Создаёт организацию и возвращает её id; текущая организация не меняется."""
+        with self.SessionLocal() as session:
+            org = Organization(
+                name=name.strip(),
+                start_date=start_date.strip() if start_date else None,
+                end_date=end_date.strip() if end_date else None,
+            )
+            session.add(org)
             session.commit()
+            return org.id
+
+    @_invalidates
+    def switch_organization(self, org_id: int):
+        """Делает org_id текущей организацией и запоминает выбор для следующего запуска."""
+        with self.SessionLocal() as session:
+            if session.get(Organization, org_id) is None:
+                raise ValueError(f"Организация {org_id} не найдена")
+        self._upsert_settings({ACTIVE_ORG_KEY: str(org_id)})
+        self._org_id = org_id
+        self._ledger_stale()
+        self._periods_stale()
+        self._watch_reset()
 
+    @_cached
     def get_monthly_summary(self):
         """
         Возвращает сводку по месяцам, включая общую сумму и "итоговую сумму за месяц" (аванс текущего + зарплата следующего).
         Формат: [(месяц_str, total_sum_current_month, total_for_display), ...]
+
+        Читается из monthly_rollup: стоимость пропорциональна числу месяцев организации, а не записей.
         """
-        from collections import defaultdict
-        
-        all_records = self.get_all_records()
-        
-        monthly_total = defaultdict(float)
-        monthly_advance = defaultdict(float)
-        monthly_salary = defaultdict(float)
+        if self.ledger is not None:
+            with self._ledger_lock:
+                return self._loaded_ledger().monthly_summary()
+        with self.SessionLocal() as session:
+            rows = session.execute(text(MONTHLY_SUMMARY_SQL), {"org_id": self.org_id}).all()
+            return [(month, total, total_for_display) for month, total, total_for_display in rows]
 
-        for _, date_str, amount, category in all_records:
+    @_cached
+    def get_monthly_summary_page(self, after_month: str | None = None, limit: int = 100):
+        """
+        Страница сводки (формат как у get_monthly_summary) для месяцев после after_month.
+        Ключ следующей страницы — месяц последней строки.
+        """
+        after = (parse_year_month(after_month) or 0) if after_month else 0
+        with self.SessionLocal() as session:
+            rows = session.execute(
+                text(MONTHLY_SUMMARY_PAGE_SQL), {"org_id": self.org_id, "after": after, "limit": limit}
+            ).all()
+            return [(month, total, total_for_display) for month, total, total_for_display in rows[:limit]]
+
+    def repair_duplicates(self) -> list[migrations.Duplicate]:
+        """
+        Явное исправление повторов зарплаты/аванса, из-за которых миграция 5
+        не создаёт уникальный индекс: в каждой группе самая ранняя запись
+        остаётся, остальные получают категорию "other", затем схема обновляется.
+        Возвращает исправленные группы; на обновлённой базе повторов быть не может.
+        """
+        with self._engine_lock:
+            if self._engine is not None:
+                return []
             try:
-                dt = datetime.strptime(date_str, "%Y-%m-%d")
-                month_key = dt.strftime("%Y-%m") # YYYY-MM
-                
-                monthly_total[month_key] += amount
-                if category == "advance":
-                    monthly_advance[month_key] += amount
-                elif category == "salary":
-                    monthly_salary[month_key] += amount
-            except ValueError:
-                continue
-
-        all_months = sorted(list(set(monthly_total.keys()) | set(monthly_advance.keys()) | set(monthly_salary.keys())))
-        
-        result_summary = []
-        for i, month_key in enumerate(all_months):
-            current_month_total = monthly_total[month_key]
-            current_month_advance = monthly_advance[month_key]
-            
-            next_month_salary = 0.0
-            if i + 1 < len(all_months):
-                next_month_key = all_months[i+1]
-                next_month_salary = monthly_salary[next_month_key]
-            elif (dt_current_month := datetime.strptime(month_key, "%Y-%m")).month == datetime.now().month and dt_current_month.year == datetime.now().year: #If it is current month, check one more month. Otherwise, we don't care
-                next_month_year = dt_current_month.year
-                next_month_month = dt_current_month.month + 1
-                if next_month_month > 12:
-                    next_month_month = 1
-                    next_month_year += 1
-                
-                for _, other_date_str, other_amount, other_category in all_records:
-                    try:
-                        other_dt = datetime.strptime(other_date_str, "%Y-%m-%d")
-                        if other_dt.year == next_month_year and other_dt.month == next_month_month and other_category == "salary":
-                            next_month_salary += other_amount
-                    except ValueError:
-                        continue
+                self._engine = self._open_engine()
+                return []
+            except migrations.DuplicateRecordsError as e:
+                duplicates = e.duplicates
+            self._engine = self._open_engine(repair=True)
+        self._changed()
+        return duplicates
+
+    @_invalidates
+    def rebuild_rollups(self, repair: bool = True) -> list[str]:
+        """
+        Сверяет monthly_rollup текущей организации с financial_records.
+        Возвращает месяцы (YYYY-MM), где данные разошлись; при repair=True пересобирает строки организации.
+        """
+        org_id = self.org_id
+        with self.SessionLocal() as session:
+            expected = {row.month: row for row in session.execute(text(ROLLUP_AGGREGATE_SQL), {"org_id": org_id})}
+            actual = {
+                row.month: row
+                for row in session.execute(select(MonthlyRollup).where(MonthlyRollup.org_id == org_id)).scalars()
+            }
 
+            mismatched = []
+            for month in sorted(expected.keys() | actual.keys()):
+                want, have = expected.get(month), actual.get(month)
+                if want is None or have is None or want.records != have.records or any(
+                    abs(getattr(want, column) - getattr(have, column)) > ROLLUP_TOLERANCE
+                    for column in ("salary", "advance", "other", "total")
+                ):
+                    mismatched.append(format_month(month))
 
-            total_for_display = current_month_advance + next_month_salary
-            result_summary.append((month_key, current_month_total, total_for_display))
-            
-        return result_summary
+            if mismatched and repair:
+                session.execute(delete(MonthlyRollup).where(MonthlyRollup.org_id == org_id))
+                session.execute(text(
+                    "INSERT INTO monthly_rollup (org_id, month, salary, advance, other, total, records) "
+                    "SELECT :org_id, * FROM (" + ROLLUP_AGGREGATE_SQL + ")"
+                ), {"org_id": org_id})
+                session.commit()
+                self._periods_stale()
+                self._watch_reset()
+            return mismatched
 
+    @_cached
     def get_monthly_breakdown(self, year_month: str):
         """Возвращает словарь: {'salary': X, 'advance': Y, 'other': Z}"""
-        records = self.get_all_records()
         breakdown = {"salary": 0.0, "advance": 0.0, "other": 0.0}
-        for _, date_str, amount, category in records:
-            try:
-                dt = datetime.strptime(date_str, "%Y-%m-%d")
-                if dt.strftime("%Y-%m") == year_month:
-                    breakdown[category] += amount
-            except ValueError:
-                continue
+        month = parse_year_month(year_month)
+        if month is None:
+            return breakdown
+        if self.ledger is not None:
+            with self._ledger_lock:
+                return self._loaded_ledger().monthly_breakdown(month)
+        with self.SessionLocal() as session:
+            stmt = (
+                select(FinancialRecord.category, func.sum(FinancialRecord.amount))
+                .where(FinancialRecord.org_id == self.org_id, FinancialRecord.month == month)
+                .group_by(FinancialRecord.category)
+            )
+            for category, amount in session.execute(stmt):
+                breakdown[category] += amount
         return breakdown
 
-    def get_all_records(self):
-        with SessionLocal() as session:
-            stmt = select(FinancialRecord)
-            result = session.execute(stmt).scalars().all()
-            return [(r.id, r.date, r.amount, r.category) for r in result]
-    
-    def get_records_by_month(self, year_month: str):
+    @_cached
+    def get_grand_total(self) -> float:
+        """Сумма всех записей, включая записи с некорректной датой."""
+        if self.ledger is not None:
+            with self._ledger_lock:
+                return self._loaded_ledger().grand_total()
+        with self.SessionLocal() as session:
+            stmt = select(func.sum(FinancialRecord.amount)).where(FinancialRecord.org_id == self.org_id)
+            return session.execute(stmt).scalar() or 0.0
+
+    def get_all_records(self) -> list[Record]:
+        """Все записи организации по порядку id."""
+        with self.engine.connect() as connection:
+            return list(map(_record, RECORDS_QUERY.cursor(connection, org_id=self.org_id)))
+
+    def count_records(self) -> int:
+        with self.SessionLocal() as session:
+            stmt = select(func.count()).select_from(FinancialRecord).where(FinancialRecord.org_id == self.org_id)
+            return session.execute(stmt).scalar_one()
+
+    def iter_records(self, batch_size: int = 5000) -> Iterator[Record]:
+        """Все записи организации по порядку id, потоково: в памяти не больше batch_size строк."""
+        with self.engine.connect() as connection:
+            cursor = RECORDS_QUERY.cursor(connection, org_id=self.org_id)
+            while rows := cursor.fetchmany(batch_size):
+                yield from map(_record, rows)
+
+    def snapshot(self, target: Path | str):
+        """Компактная копия всей базы (всех организаций) в отдельный файл через VACUUM INTO."""
+        with self.engine.connect() as connection:
+            connection.exec_driver_sql("VACUUM INTO ?", (str(target),))
+
+
+    def get_period_totals(self, first_month: str, last_month: str) -> PeriodTotals:
+        """
+        Суммы по категориям за месяцы first_month..last_month ("YYYY-MM", включительно)
+        по индексу префиксных сумм: O(log n) от числа месяцев.
+        """
+        first, last = parse_year_month(first_month), parse_year_month(last_month)
+        if first is None or last is None:
+            raise ValueError(f"Некорректный период: {first_month} — {last_month} (нужно ГГГГ-ММ)")
+        with self._periods_lock:
+            return self._period_index().totals(first, last)
+
+    def get_month_range(self) -> tuple[str, str] | None:
+        """Первый и последний месяц журнала ("YYYY-MM") или None, если записей нет."""
+        with self._periods_lock:
+            bounds = self._period_index().bounds()
+        return (format_month(bounds[0]), format_month(bounds[1])) if bounds else None
+
+    @_cached
+    def get_records_by_month(self, year_month: str) -> list[Record]:
         """Возвращает записи за указанный месяц в формате YYYY-MM"""
-        with SessionLocal() as session:
-            all_records = session.execute(select(FinancialRecord)).scalars().all()
-            result = []
-            for r in all_records:
-                try:
-                    rec_date = datetime.strptime(r.date, "%Y-%m-%d")
-                    if rec_date.strftime("%Y-%m") == year_month:
-                        result.append((r.id, r.date, r.amount, r.category))
-                except ValueError:
-                    continue
-            return result
-    def get_record_by_id(self, record_id: int):
-        with SessionLocal() as session:
-            rec = session.get(FinancialRecord, record_id)
-            if rec:
-                return (rec.id, rec.date, rec.amount, rec.category)
-            return None
+        month = parse_year_month(year_month)
+        if month is None:
+            return []
+        with self.engine.connect() as connection:
+            return list(map(_record, MONTH_RECORDS_QUERY.cursor(connection, org_id=self.org_id, month=month)))
+
+    @_cached
+    def get_records_page(self, year_month: str, after: tuple[str, int] | None = None, limit: int = 100) -> list[Record]:
+        """
+        Страница записей месяца в порядке (date, id), начиная после ключа after.
+        Ключ следующей страницы — (date, id) последней строки.
+        """
+        month = parse_year_month(year_month)
+        if month is None:
+            return []
+        with self.engine.connect() as connection:
+            if after is None:
+                cursor = MONTH_PAGE_QUERY.cursor(connection, org_id=self.org_id, month=month, limit=limit)
+            else:
+                cursor = MONTH_PAGE_AFTER_QUERY.cursor(
+                    connection, org_id=self.org_id, month=month, after_date=after[0], after_id=after[1], limit=limit
+                )
+            return list(map(_record, cursor))
+
+    @_cached
+    def get_record_by_id(self, record_id: int) -> Record | None:
+        """Запись по id, если она принадлежит текущей организации."""
+        with self.engine.connect() as connection:
+            row = RECORD_BY_ID_QUERY.cursor(connection, org_id=self.org_id, id=record_id).fetchone()
+        return _record(row) if row is not None else None
         
 
-    def delete_record_by_id(self, record_id: int):
-        with SessionLocal() as session:
-            record = session.get(FinancialRecord, record_id)
-            if record:
-                session.delete(record)
-                session.commit()
+    def _summary_changes(self, session, changes: ChangeSet, months: Iterable[int | None]) -> ChangeSet:
+        """Дополняет changes строками сводки для затронутых месяцев и их предшественников."""
+        months = {month for month in months if month is not None}
+        if not months:
+            return changes
+        org_id = self.org_id
+        states = self._rollup_states(session, months)
+        existing = set(states)
+        targets = set(existing)
+        for month in months:
+            # "Итого" предыдущего месяца зависит от зарплаты в этом
+            previous = session.scalar(
+                select(func.max(MonthlyRollup.month)).where(MonthlyRollup.org_id == org_id, MonthlyRollup.month < month)
+            )
+            if previous is not None:
+                targets.add(previous)
+        if targets:
+            changes.summary_updated = [
+                tuple(row) for row in session.execute(SUMMARY_ROWS_SQL, {"org_id": org_id, "months": sorted(targets)})
+            ]
+        changes.summary_removed = [format_month(month) for month in sorted(months - existing)]
+        self._refresh_periods(session, months)
+        self._watch_seen(states, months)
+        return changes
 
-    def add_record(self, date: str, amount: float, category: str):
-        with SessionLocal() as session:
-            new_rec = FinancialRecord(date=date, amount=amount, category=category)
-            session.add(new_rec)
-            session.commit()
+    def _once_per_month_conflict(self, session, rows: list[dict], replaced: Iterable[int] = ()) -> str | None:
+        """
+        Категория из ONCE_PER_MONTH, которую пачка rows повторила бы в каком-то
+        месяце — внутри себя или с записями организации, кроме replaced; иначе None.
+        """
+        keys: set[tuple[int, str]] = set()
+        for row in rows:
+            if row["category"] in ONCE_PER_MONTH and row["month"] is not None:
+                key = (row["month"], row["category"])
+                if key in keys:
+                    return row["category"]
+                keys.add(key)
+        replaced = set(replaced)
+        for chunk in _chunks(sorted(keys)):
+            stmt = select(FinancialRecord.id, FinancialRecord.category).where(
+                FinancialRecord.org_id == self.org_id,
+                tuple_(FinancialRecord.month, FinancialRecord.category).in_(chunk),
+            )
+            for id_, category in session.execute(stmt):
+                if id_ not in replaced:
+                    return category
+        return None
 
-    def delete_records_by_month(self, year_month: str):
-        with SessionLocal() as session:
-            stmt = delete(FinancialRecord).where(FinancialRecord.date.like(f"{year_month}-%"))
-            session.execute(stmt)
-            session.commit()
+    @_invalidates
+    def add_records(self, records: Iterable[tuple[str, float, str]]) -> ChangeSet:
+        """
+        Вставляет записи (date, amount, category) одним INSERT ... ON CONFLICT DO
+        NOTHING RETURNING. Если уникальный индекс отсёк хоть одну — повтор
+        зарплаты/аванса в месяце, в самой пачке или с уже внесённой записью, —
+        пачка не вставляется целиком и бросается DuplicateRecordError.
+        """
+        changes = ChangeSet()
+        org_id = self.org_id
+        rows = [
+            {"org_id": org_id, "date": date, "amount": amount, "category": category, "month": month_number(date)}
+            for date, amount, category in records
+        ]
+        if not rows:
+            return changes
+        table = FinancialRecord.__table__
+        stmt = (
+            sqlite_insert(table)
+            .on_conflict_do_nothing()
+            .returning(table.c.id, table.c.date, table.c.amount, table.c.category, table.c.month)
+        )
+        with self._write_session() as session:
+            inserted = session.execute(stmt, rows).all()
+            if len(inserted) < len(rows):
+                # своя вставка откатывается и внутри внешней transaction()
+                ids = [row.id for row in inserted]
+                for chunk in _chunks(ids):
+                    session.execute(delete(FinancialRecord).where(FinancialRecord.id.in_(chunk)))
+                raise DuplicateRecordError(self._once_per_month_conflict(session, rows) or rows[0]["category"])
+            changes.inserted = [Record(row.id, row.date, float(row.amount), row.category) for row in inserted]
+            self._summary_changes(session, changes, {row.month for row in inserted})
+        if self.ledger is not None:
+            with self._ledger_lock:
+                if self.ledger.loaded:
+                    for row in inserted:
+                        self.ledger.append(row.id, row.date, row.amount, row.category, row.month)
+        return changes
 
-    def update_record(self, id_: int, date: str, amount: float, category: str):
-        with SessionLocal() as session:
-            rec = session.get(FinancialRecord, id_)
-            if rec:
-                rec.date = date
-                rec.amount = amount
-                rec.category = category
-                session.commit()
-    
+    @_invalidates
+    def update_records(self, records: Iterable[Record]) -> ChangeSet:
+        """
+        Обновляет записи (id, date, amount, category) одним executemany UPDATE по
+        первичному ключу; id чужих организаций и несуществующие пропускаются.
+        Повтор зарплаты/аванса в месяце отменяет всю пачку с DuplicateRecordError.
+        """
+        changes = ChangeSet()
+        by_id = {
+            id_: {"id": id_, "date": date, "amount": amount, "category": category, "month": month_number(date)}
+            for id_, date, amount, category in records
+        }
+        if not by_id:
+            return changes
+        with self._write_session() as session:
+            old_months: dict[int, int | None] = {}
+            for chunk in _chunks(list(by_id)):
+                old_months.update(dict(session.execute(
+                    select(FinancialRecord.id, FinancialRecord.month)
+                    .where(FinancialRecord.org_id == self.org_id, FinancialRecord.id.in_(chunk))
+                ).all()))
+            rows = [row for id_, row in by_id.items() if id_ in old_months]
+            if rows:
+                duplicate = self._once_per_month_conflict(session, rows, replaced=old_months)
+                if duplicate is not None:
+                    raise DuplicateRecordError(duplicate)
+                # уникальность проверяется построчно: чтобы зарплаты двух месяцев можно
+                # было поменять местами, такие записи сперва снимаются с индекса
+                parked = [row["id"] for row in rows if row["category"] in ONCE_PER_MONTH]
+                try:
+                    if len(parked) > 1:
+                        for chunk in _chunks(parked):
+                            session.execute(
+                                update(FinancialRecord).where(FinancialRecord.id.in_(chunk)).values(month=None)
+                            )
+                    session.execute(update(FinancialRecord), rows)
+                except IntegrityError:
+                    # запись из другого процесса между проверкой и UPDATE
+                    raise DuplicateRecordError(rows[0]["category"]) from None
+                changes.updated = [Record(row["id"], row["date"], float(row["amount"]), row["category"]) for row in rows]
+                self._summary_changes(session, changes, [*old_months.values(), *(row["month"] for row in rows)])
+        self._ledger_stale()
+        return changes
+
+    @_invalidates
+    def delete_records(self, record_ids: Iterable[int]) -> ChangeSet:
+        """Удаляет записи текущей организации по id; чужие и несуществующие id пропускаются."""
+        changes = ChangeSet()
+        ids = list(dict.fromkeys(record_ids))
+        if not ids:
+            return changes
+        months: set[int | None] = set()
+        with self._write_session() as session:
+            for chunk in _chunks(ids):
+                stmt = (
+                    delete(FinancialRecord)
+                    .where(FinancialRecord.org_id == self.org_id, FinancialRecord.id.in_(chunk))
+                    .returning(FinancialRecord.id, FinancialRecord.month)
+                )
+                for id_, month in session.execute(stmt):
+                    changes.removed.append(id_)
+                    months.add(month)
+            self._summary_changes(session, changes, months)
+        self._ledger_stale()
+        return changes
+
+    def delete_record_by_id(self, record_id: int) -> ChangeSet:
+        return self.delete_records([record_id])
+
+    def add_record(self, date: str, amount: float, category: str) -> ChangeSet:
+        """Повтор зарплаты/аванса в месяце отсекает уникальный индекс — DuplicateRecordError."""
+        return self.add_records([(date, amount, category)])
+
+    @_invalidates
+    def insert_batches(self, batches: Iterable[list[tuple[str, float, str, int | None]]]) -> int:
+        """
+        Вставляет в текущую организацию пачки записей (date, amount, category, month)
+        через executemany драйвера одной транзакцией — своей или открытой
+        transaction(). Пачки могут вычисляться лениво. Возвращает число строк.
+        Повтор зарплаты/аванса в месяце отменяет всю вставку с DuplicateRecordError.
+        """
+        inserted = 0
+        months: set[int] = set()
+        sql = INSERT_RECORD_SQL.format(org_id=self.org_id)
+        with self._write_session() as session:
+            connection = session.connection()
+            for batch in batches:
+                if batch:
+                    try:
+                        connection.exec_driver_sql(sql, batch)
+                    except IntegrityError:
+                        # зарплату/аванс месяца внёс другой процесс после проверки вызывающего
+                        rows = [{"month": row[3], "category": row[2]} for row in batch]
+                        category = self._once_per_month_conflict(session, rows)
+                        raise DuplicateRecordError(category or ONCE_PER_MONTH[0]) from None
+                    inserted += len(batch)
+                    months.update(row[3] for row in batch if row[3] is not None)
+            # свой импорт poll_changes не вернёт как чужое изменение
+            for chunk in _chunks(sorted(months)):
+                self._watch_seen(self._rollup_states(session, chunk), chunk)
+        self._ledger_stale()
+        self._periods_stale()
+        return inserted
+
+    def get_once_per_month_taken(self) -> set[tuple[int, str]]:
+        """Пары (месяц YYYYMM, категория), где зарплата или аванс уже внесены в текущей организации."""
+        with self.SessionLocal() as session:
+            stmt = (
+                select(FinancialRecord.month, FinancialRecord.category)
+                .where(
+                    FinancialRecord.org_id == self.org_id,
+                    FinancialRecord.month.is_not(None),
+                    FinancialRecord.category.in_(ONCE_PER_MONTH),
+                )
+                .distinct()
+            )
+            return {(month, category) for month, category in session.execute(stmt)}
+
+    @_invalidates
+    def delete_records_by_month(self, year_month: str) -> ChangeSet:
+        changes = ChangeSet()
+        month = parse_year_month(year_month)
+        if month is None:
+            return changes
+        with self._write_session() as session:
+            stmt = (
+                delete(FinancialRecord)
+                .where(FinancialRecord.org_id == self.org_id, FinancialRecord.month == month)
+                .returning(FinancialRecord.id)
+            )
+            changes.removed = list(session.scalars(stmt))
+            self._summary_changes(session, changes, [month])
+        self._ledger_stale()
+        return changes
+
+    def update_record(self, id_: int, date: str, amount: float, category: str) -> ChangeSet:
+        return self.update_records([(id_, date, amount, category)])
+
+    @_cached
     def has_salary_or_advance_in_month(self, year_month: str, category: str) -> bool:
         """
         Проверяет, существует ли уже запись с категорией 'salary' или 'advance'
         в указанном месяце (формат 'YYYY-MM').
         """
-        if category not in ("salary", "advance"):
-            return False
+        return category in self.get_month_status(year_month)
 
-        with SessionLocal() as session:
-            records = session.execute(select(FinancialRecord)).scalars().all()
-            for r in records:
-                try:
-                    rec_date = datetime.strptime(r.date, "%Y-%m-%d")
-                    if rec_date.strftime("%Y-%m") == year_month and r.category == category:
-                        return True
-                except ValueError:
-                    continue
-            return False
\ No newline at end of file
+    @_cached
+    def get_month_status(self, year_month: str) -> frozenset[str]:
+        """
+        Какие из категорий ONCE_PER_MONTH уже заняты в месяце 'YYYY-MM' —
+        один поиск по уникальному индексу (org_id, month, category).
+        """
+        month = parse_year_month(year_month)
+        if month is None:
+            return frozenset()
+        with self.engine.connect() as connection:
+            return frozenset(row[0] for row in MONTH_STATUS_QUERY.cursor(connection, org_id=self.org_id, month=month))
@@ -0,0 +1,93 @@
+"""
+Потоковый экспорт журнала в CSV, JSON Lines и снимок SQLite.
+
+Записи читаются из базы порциями (Database.iter_records: заранее
+скомпилированный Core-запрос, fetchmany курсора sqlite3, кортежи Record) и сразу
+пишутся в файл, поэтому память не растёт с числом строк. Для CSV и JSON Lines
+рядом с файлом записей кладётся сводка по месяцам: <имя>.summary.<расширение>.
+CSV и JSON Lines содержат записи текущей организации; снимок SQLite делается
+через VACUUM INTO и содержит всю базу — все организации и monthly_rollup.
+
+Формат записей совместим с importer: date, amount, category (+ id).
+"""
+import csv
+import json
+from pathlib import Path
+from typing import Callable
+
+from database import Database
+
+FORMATS = ("csv", "jsonl", "sqlite")
+PROGRESS_EVERY = 10_000
+
+ProgressCallback = Callable[[int, int], None]  # (выгружено записей, всего записей)
+
+
+def summary_path(path: Path) -> Path:
+    return path.with_name(f"{path.stem}.summary{path.suffix}")
+
+
+def _write_csv(db: Database, path: Path, progress: ProgressCallback | None, total: int) -> int:
+    written = 0
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(("id", "date", "amount", "category"))
+        for written, record in enumerate(db.iter_records(), start=1):
+            writer.writerow(record)
+            if progress is not None and written % PROGRESS_EVERY == 0:
+                progress(written, total)
+
+    with open(summary_path(path), "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(("month", "total", "total_for_display"))
+        writer.writerows(db.get_monthly_summary())
+    return written
+
+
+def _write_jsonl(db: Database, path: Path, progress: ProgressCallback | None, total: int) -> int:
+    written = 0
+    with open(path, "w", encoding="utf-8") as file:
+        for written, (id_, date, amount, category) in enumerate(db.iter_records(), start=1):
+            file.write(json.dumps(
+                {"id": id_, "date": date, "amount": amount, "category": category}, ensure_ascii=False
+            ))
+            file.write("\n")
+            if progress is not None and written % PROGRESS_EVERY == 0:
+                progress(written, total)
+
+    with open(summary_path(path), "w", encoding="utf-8") as file:
+        for month, month_total, total_for_display in db.get_monthly_summary():
+            file.write(json.dumps({"month": month, "total": month_total, "total_for_display": total_for_display}))
+            file.write("\n")
+    return written
+
+
+def export_ledger(
+    db: Database,
+    path: Path | str,
+    fmt: str,
+    progress: ProgressCallback | None = None,
+    overwrite: bool = False,
+) -> int:
+    """Экспортирует журнал в формате fmt ("csv", "jsonl" или "sqlite"). Возвращает число записей."""
+    path = Path(path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Неизвестный формат: {fmt}")
+    targets = [path] if fmt == "sqlite" else [path, summary_path(path)]
+    for target in targets:
+        if target.exists():
+            if not overwrite:
+                raise FileExistsError(f"Файл уже существует: {target}")
+            target.unlink()
+
+    total = db.count_records()
+    if fmt == "csv":
+        written = _write_csv(db, path, progress, total)
+    elif fmt == "jsonl":
+        written = _write_jsonl(db, path, progress, total)
+    else:
+        db.snapshot(path)
+        written = total
+    if progress is not None:
+        progress(written, total)
+    return written
@@ -0,0 +1,149 @@
+"""
+Потоковый импорт записей из CSV и JSON Lines.
+
+Файл читается построчно, каждая строка проверяется по тем же правилам, что и
+в AddRecordDialog (validation.validate_record + одна зарплата/один аванс в
+месяц), и попадает в базу пачками через Database.insert_batches в одной
+транзакции. Память не зависит от размера файла: в ней держится только текущая
+пачка и множество занятых (месяц, категория). Если зарплату или аванс того
+же месяца во время импорта внёс другой процесс, уникальный индекс отменяет всю
+транзакцию и import_records бросает DuplicateRecordError.
+
+CSV: колонки date, amount, category (заголовок необязателен).
+JSON Lines: по объекту {"date": ..., "amount": ..., "category": ...} на строку.
+"""
+import csv
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterator
+
+from database import Database
+from validation import ONCE_PER_MONTH, RecordValidationError, duplicate_message, validate_record
+
+BATCH_SIZE = 10_000
+MAX_REPORTED_ERRORS = 1_000
+FIELDS = ("date", "amount", "category")
+JSON_SUFFIXES = (".jsonl", ".ndjson", ".json")
+
+ProgressCallback = Callable[[int, int], None]  # (прочитано байт, всего байт)
+
+
+@dataclass
+class ImportReport:
+    imported: int = 0
+    rejected: int = 0
+    # (номер строки, причина) — не больше MAX_REPORTED_ERRORS первых ошибок
+    errors: list[tuple[int, str]] = field(default_factory=list)
+
+    def reject(self, line_no: int, reason: str):
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line_no, reason))
+
+
+class _ByteCounter:
+    """Итератор по строкам файла, считающий прочитанные байты для прогресса."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.total = path.stat().st_size
+        self.read = 0
+
+    def __iter__(self) -> Iterator[str]:
+        with open(self.path, "rb") as file:
+            for raw in file:
+                self.read += len(raw)
+                yield raw.decode("utf-8-sig" if self.read == len(raw) else "utf-8")
+
+
+def _csv_rows(lines: Iterator[str]) -> Iterator[tuple[int, dict | None, str | None]]:
+    reader = csv.reader(lines)
+    header = None
+    for row in reader:
+        if not row or not any(cell.strip() for cell in row):
+            continue
+        if header is None:
+            names = [cell.strip().lower() for cell in row]
+            header = names if "date" in names else list(FIELDS)
+            if header is names:
+                continue
+        yield reader.line_num, dict(zip(header, row)), None
+
+
+def _json_rows(lines: Iterator[str]) -> Iterator[tuple[int, dict | None, str | None]]:
+    for line_no, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError:
+            yield line_no, None, "Некорректный JSON"
+            continue
+        if not isinstance(item, dict):
+            yield line_no, None, "Ожидался объект JSON"
+            continue
+        yield line_no, item, None
+
+
+def read_rows(path: Path, lines: Iterator[str]) -> Iterator[tuple[int, dict | None, str | None]]:
+    """(номер строки, поля или None, ошибка разбора или None) по формату файла."""
+    if path.suffix.lower() in JSON_SUFFIXES:
+        return _json_rows(lines)
+    return _csv_rows(lines)
+
+
+def import_records(
+    db: Database,
+    path: Path | str,
+    progress: ProgressCallback | None = None,
+    batch_size: int = BATCH_SIZE,
+) -> ImportReport:
+    """Импортирует файл в базу. Отклонённые строки не прерывают импорт и попадают в отчёт."""
+    path = Path(path)
+    report = ImportReport()
+    taken = db.get_once_per_month_taken()
+    source = _ByteCounter(path)
+
+    def batches() -> Iterator[list[tuple]]:
+        batch = []
+        for line_no, item, error in read_rows(path, iter(source)):
+            if error is not None:
+                report.reject(line_no, error)
+                continue
+            try:
+                date, amount, category, month = validate_record(
+                    item.get("date"), item.get("amount"), item.get("category") or "other"
+                )
+            except RecordValidationError as e:
+                report.reject(line_no, str(e))
+                continue
+            if category in ONCE_PER_MONTH:
+                if (month, category) in taken:
+                    report.reject(line_no, duplicate_message(category))
+                    continue
+                taken.add((month, category))
+
+            batch.append((date, amount, category, month))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+                if progress is not None:
+                    progress(source.read, source.total)
+        yield batch
+
+    report.imported = db.insert_batches(batches())
+    if progress is not None:
+        progress(source.total, source.total)
+    return report
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 2:
+        sys.exit("Использование: python importer.py ФАЙЛ.csv|ФАЙЛ.jsonl")
+    result = import_records(Database(), sys.argv[1])
+    print(f"Импортировано: {result.imported}, отклонено: {result.rejected}")
+    for line_no, reason in result.errors:
+        print(f"  строка {line_no}: {reason}")
@@ -0,0 +1,163 @@
+"""
+Колоночный журнал в памяти для аналитики по большим историям.
+
+Записи financial_records хранятся непрерывными массивами numpy:
+эпохальный день (int32), месяц YYYYMM (int32), сумма (float64) и код
+категории (uint8). Сводки считаются групповыми редукциями (bincount)
+без перебора строк в Python.
+
+numpy — необязательная зависимость (extra "analytics"); без неё модуль
+импортируется, но ColumnarLedger() бросает ImportError.
+"""
+from datetime import date, datetime
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - зависит от окружения
+    np = None
+
+CATEGORY_CODES = {"salary": 0, "advance": 1, "other": 2}
+CATEGORY_NAMES = {code: name for name, code in CATEGORY_CODES.items()}
+
+NO_DAY = -(2**31)  # день для записей с некорректной датой
+NO_MONTH = 0       # месяц для записей с некорректной датой
+
+EPOCH = date(1970, 1, 1)
+LOAD_CHUNK = 50_000
+
+LOAD_SQL = """
+SELECT
+    id,
+    CAST(julianday(date) - 2440587.5 AS INTEGER) AS day,
+    date,
+    COALESCE(month, 0) AS month,
+    amount,
+    category
+FROM financial_records
+WHERE org_id = :org_id
+ORDER BY id
+"""
+
+
+def epoch_day(date_str: str) -> int:
+    try:
+        return (datetime.strptime(date_str, "%Y-%m-%d").date() - EPOCH).days
+    except (TypeError, ValueError):
+        return NO_DAY
+
+
+class ColumnarLedger:
+    def __init__(self):
+        if np is None:
+            raise ImportError("Для колоночного журнала нужен numpy: pip install salary-tracker[analytics]")
+        self.ids = np.empty(0, dtype=np.int64)
+        self.days = np.empty(0, dtype=np.int32)
+        self.months = np.empty(0, dtype=np.int32)
+        self.amounts = np.empty(0, dtype=np.float64)
+        self.categories = np.empty(0, dtype=np.uint8)
+        self.size = 0
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _reserve(self, capacity: int):
+        if capacity <= len(self.ids):
+            return
+        capacity = max(capacity, 2 * len(self.ids), 1024)
+        for name in ("ids", "days", "months", "amounts", "categories"):
+            column = getattr(self, name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            setattr(self, name, grown)
+
+    def load(self, engine: Engine, org_id: int):
+        """Полная загрузка записей организации из financial_records порциями по LOAD_CHUNK строк."""
+        self.size = 0
+        with engine.connect() as connection:
+            total = connection.execute(
+                text("SELECT COUNT(*) FROM financial_records WHERE org_id = :org_id"), {"org_id": org_id}
+            ).scalar_one()
+            self._reserve(total)
+            result = connection.execute(text(LOAD_SQL), {"org_id": org_id})
+            while rows := result.fetchmany(LOAD_CHUNK):
+                self._extend(rows)
+        self.loaded = True
+
+    def _extend(self, rows):
+        start, count = self.size, len(rows)
+        self._reserve(start + count)
+        ids, days, date_strs, months, amounts, categories = zip(*rows)
+        end = start + count
+        self.ids[start:end] = ids
+        # julianday() не понимает даты вида "2025-3-5", их досчитываем в Python
+        self.days[start:end] = [
+            NO_DAY if not month else day if day is not None else epoch_day(date_str)
+            for day, date_str, month in zip(days, date_strs, months)
+        ]
+        self.months[start:end] = months
+        self.amounts[start:end] = amounts
+        self.categories[start:end] = [CATEGORY_CODES.get(category, CATEGORY_CODES["other"]) for category in categories]
+        self.size = end
+
+    def append(self, id_: int, date_str: str, amount: float, category: str, month: int | None):
+        """Добавление одной записи без перезагрузки журнала."""
+        day = epoch_day(date_str) if month else NO_DAY
+        self._extend([(id_, day, date_str, month or NO_MONTH, amount, category)])
+
+    def invalidate(self):
+        self.loaded = False
+
+    def _month_groups(self):
+        """Индексы месяцев и суммы по ним: (months, total, salary, advance, other)."""
+        valid = self.months[:self.size] != NO_MONTH
+        months = self.months[:self.size][valid]
+        amounts = self.amounts[:self.size][valid]
+        categories = self.categories[:self.size][valid]
+        if months.size == 0:
+            empty = np.empty(0, dtype=np.float64)
+            return np.empty(0, dtype=np.int32), empty, empty, empty, empty
+
+        # Порядковый номер месяца от самого раннего: bincount без сортировки
+        ordinal = (months // 100) * 12 + months % 100 - 1
+        first = int(ordinal.min())
+        index = ordinal - first
+        span = int(index.max()) + 1
+        present = np.bincount(index, minlength=span) > 0
+
+        per_category = np.zeros((len(CATEGORY_CODES), span), dtype=np.float64)
+        for code in CATEGORY_NAMES:
+            mask = categories == code
+            per_category[code] = np.bincount(index[mask], weights=amounts[mask], minlength=span)
+        total = np.bincount(index, weights=amounts, minlength=span)[present]
+        per_category = per_category[:, present]
+        present_ordinals = np.flatnonzero(present) + first
+        unique_months = (present_ordinals // 12) * 100 + present_ordinals % 12 + 1
+        return unique_months, total, per_category[0], per_category[1], per_category[2]
+
+    def monthly_summary(self):
+        """То же, что Database.get_monthly_summary: [(YYYY-MM, total, advance + зарплата след. месяца)]."""
+        months, total, salary, advance, _other = self._month_groups()
+        next_salary = np.zeros_like(salary)
+        next_salary[:-1] = salary[1:]
+        display = advance + next_salary
+        return [
+            (f"{month // 100:04d}-{month % 100:02d}", float(month_total), float(month_display))
+            for month, month_total, month_display in zip(months.tolist(), total.tolist(), display.tolist())
+        ]
+
+    def monthly_breakdown(self, month: int):
+        """Суммы по категориям за месяц YYYYMM."""
+        mask = self.months[:self.size] == month
+        sums = np.bincount(
+            self.categories[:self.size][mask],
+            weights=self.amounts[:self.size][mask],
+            minlength=len(CATEGORY_CODES),
+        )
+        return {CATEGORY_NAMES[code]: float(sums[code]) for code in CATEGORY_NAMES}
+
+    def grand_total(self) -> float:
+        return float(self.amounts[:self.size].sum())
@@ -1,6 +1,76 @@
-from database import Database
-from app.salary_app import SalaryApp
+import time
+
+STARTED = time.perf_counter()
+
+import argparse
+from functools import partial
+from typing import TYPE_CHECKING
+
+from storage import PROFILE_ENV, PROFILES
+
+if TYPE_CHECKING:
+    from database import Database
+    from startup import StartupReport
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        prog="SalaryTracker",
+        epilog="Консольный режим без интерфейса: SalaryTracker {summary,month,breakdown,total,period,orgs,import,export,serve,backup,compact,restore,repair-duplicates} --help",
+    )
+    parser.add_argument("--import", dest="import_path", metavar="ФАЙЛ",
+                        help="импортировать записи из CSV/JSON Lines и выйти")
+    parser.add_argument("--storage", choices=list(PROFILES), default=None,
+                        help=f"профиль хранения SQLite (по умолчанию ${PROFILE_ENV} или durable)")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="запустить интерфейс до первой страницы сводки и вывести замер холодного старта")
+    parser.add_argument("--profile", action="store_true",
+                        help="собирать статистику запросов и экранов с запуска (экран F9)")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="вместе с --profile отслеживать пик памяти через tracemalloc")
+    return parser.parse_args()
+
+
+def open_database(args, startup: "StartupReport | None" = None) -> "Database":
+    # database тянет за собой SQLAlchemy; интерфейс вызывает фабрику уже после первого кадра
+    from database import Database
+
+    db = Database(cache_size=256, storage_profile=args.storage)
+    if startup is not None:
+        startup.mark("импорт database")
+    return db
+
 
 if __name__ == "__main__":
-    db = Database()
-    SalaryApp(db).run()
\ No newline at end of file
+    import sys
+
+    from cli import COMMANDS
+
+    # команда первым аргументом — консольный режим: Textual не импортируется вовсе
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        from cli import main
+
+        sys.exit(main(sys.argv[1:]))
+    args = parse_args()
+    if args.import_path:
+        # прежний флаг --import — то же, что команда import
+        from cli import main
+
+        sys.exit(main(["import", args.import_path] + (["--storage", args.storage] if args.storage else [])))
+    else:
+        startup = None
+        if args.startup_report:
+            from startup import StartupReport
+
+            startup = StartupReport(STARTED)
+        if args.profile or args.profile_memory:
+            from profiler import PROFILER
+
+            PROFILER.enable(trace_memory=args.profile_memory)
+        from app.salary_app import SalaryApp
+
+        if startup is not None:
+            startup.mark("импорт интерфейса")
+        SalaryApp(partial(open_database, args, startup), startup=startup).run()
+        if startup is not None:
+            print(startup.format())
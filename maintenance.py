@@ -0,0 +1,316 @@
+"""
+Обслуживание базы: резервные копии по ротации, ANALYZE и постепенный VACUUM.
+
+Резервная копия снимается онлайн через backup API SQLite небольшими шагами
+(BACKUP_PAGES_PER_STEP страниц) с паузой между ними, так что приложение и
+другие соединения продолжают читать и писать. Источник держит одну читающую
+транзакцию на всё время копии: в WAL она закрепляет снимок базы, и запись из
+приложения не заставляет backup начинать заново. Копия пишется во временный
+файл и переименовывается, только когда готова; храним BACKUP_KEEP последних
+в каталоге backups рядом с базой.
+
+compact() обновляет статистику планировщика (ANALYZE с analysis_limit) и
+возвращает свободные страницы файловой системе через PRAGMA incremental_vacuum
+короткими транзакциями. Базе, созданной до auto_vacuum=INCREMENTAL
+(см. storage), один раз нужен полный VACUUM: он держит блокировку записи всё
+время перезаписи файла, поэтому выполняется только по явной команде
+`SalaryTracker compact` (compact(convert=True)), а фоновое обслуживание
+такую базу лишь анализирует и подсказывает команду.
+
+Интерфейс запускает run_due() в фоне, когда пользователь давно ничего не
+нажимал; из консоли — `SalaryTracker backup`, `compact` и `restore [ФАЙЛ]`
+(по умолчанию последняя копия). Восстанавливать нужно при закрытом приложении.
+"""
+import json
+import sqlite3
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    from database import Database
+
+BACKUP_DIR_NAME = "backups"
+STATE_FILE_NAME = "maintenance.json"
+BACKUP_KEEP = 7
+# копия базы, снятая restore() перед заменой; её не трогают ни ротация, ни выбор копии по умолчанию
+SAFETY_COPY_SUFFIX = "-before-restore"
+BACKUP_INTERVAL = 24 * 60 * 60
+COMPACT_INTERVAL = 7 * 24 * 60 * 60
+# 256 страниц по 4 КиБ — около мегабайта за шаг; между шагами соединения свободны
+BACKUP_PAGES_PER_STEP = 256
+VACUUM_PAGES_PER_STEP = 256
+STEP_PAUSE = 0.005
+# строк на индекс, которые читает ANALYZE: приблизительная статистика за миллисекунды
+ANALYSIS_LIMIT = 1000
+AUTO_VACUUM_INCREMENTAL = 2
+
+Cancelled = Callable[[], bool]
+
+
+class MaintenanceCancelled(Exception):
+    """Операцию прервали (например, приложение закрывается)."""
+
+
+def _megabytes(size: int) -> str:
+    return f"{size / (1024 * 1024):.1f} МБ"
+
+
+@dataclass(frozen=True)
+class BackupReport:
+    path: Path
+    size: int               # байт в копии
+    seconds: float
+    removed: list[Path]     # старые копии, удалённые ротацией
+
+    def describe(self) -> str:
+        return f"Резервная копия {self.path.name}: {_megabytes(self.size)} за {self.seconds:.1f} с"
+
+
+@dataclass(frozen=True)
+class CompactReport:
+    size_before: int        # база и WAL, байт
+    size_after: int
+    pages_freed: int
+    seconds: float
+    full_vacuum: bool       # первая компактизация старой базы
+    needs_conversion: bool = False  # старой базе нужен полный VACUUM, а convert не разрешён
+
+    @property
+    def reclaimed(self) -> int:
+        return max(self.size_before - self.size_after, 0)
+
+    def describe(self) -> str:
+        if self.needs_conversion:
+            return ("Обслуживание базы: статистика обновлена; чтобы возвращать свободное место, "
+                    "один раз выполните `SalaryTracker compact`")
+        kind = "VACUUM" if self.full_vacuum else "Обслуживание базы"
+        return f"{kind}: освобождено {_megabytes(self.reclaimed)} за {self.seconds:.1f} с"
+
+
+@dataclass(frozen=True)
+class RestoreReport:
+    source: Path
+    safety_copy: Path | None    # копия базы перед восстановлением
+    seconds: float
+
+    def describe(self) -> str:
+        text = f"База восстановлена из {self.source.name} за {self.seconds:.1f} с"
+        if self.safety_copy is not None:
+            text += f"; прежняя база сохранена в {self.safety_copy.name}"
+        return text
+
+
+def backup_dir(db: "Database") -> Path:
+    return db.database_path.parent / BACKUP_DIR_NAME
+
+
+def list_backups(db: "Database", safety_copies: bool = False) -> list[Path]:
+    """Готовые резервные копии базы, новые первыми; safety_copies — копии перед restore() вместо обычных."""
+    directory = backup_dir(db)
+    if not directory.is_dir():
+        return []
+    prefix = f"{db.database_path.stem}-"
+    paths = [
+        path for path in directory.glob(f"{prefix}*.db")
+        if (SAFETY_COPY_SUFFIX in path.stem[len(prefix):]) == safety_copies
+    ]
+    return sorted(paths, key=lambda path: path.stat().st_mtime, reverse=True)
+
+
+def _database_size(path: Path) -> int:
+    return sum(p.stat().st_size for p in (path, path.with_name(path.name + "-wal")) if p.exists())
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    # autocommit драйвера: транзакции открываются явно
+    return sqlite3.connect(path, timeout=30, isolation_level=None)
+
+
+def _copy(source: sqlite3.Connection, target: sqlite3.Connection, pause: float, cancelled: Cancelled | None):
+    def progress(status, remaining, total):
+        if cancelled is not None and cancelled():
+            raise MaintenanceCancelled
+        if remaining and pause:
+            time.sleep(pause)
+
+    source.backup(target, pages=BACKUP_PAGES_PER_STEP, progress=progress)
+
+
+def _backup_path(db: "Database", suffix: str = "") -> Path:
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    base = f"{db.database_path.stem}-{stamp}{suffix}"
+    path = backup_dir(db) / f"{base}.db"
+    counter = 1
+    while path.exists():
+        path = backup_dir(db) / f"{base}-{counter}.db"
+        counter += 1
+    return path
+
+
+def backup(
+    db: "Database",
+    keep: int | None = BACKUP_KEEP,
+    pause: float = STEP_PAUSE,
+    cancelled: Cancelled | None = None,
+    suffix: str = "",
+) -> BackupReport:
+    """
+    Онлайн-копия всей базы в каталог backups; оставляет keep последних обычных
+    копий (None — все). Копии перед restore() ротация не удаляет.
+    """
+    if not db.database_path.exists():
+        raise FileNotFoundError(f"База не найдена: {db.database_path}")
+    started = time.perf_counter()
+    target = _backup_path(db, suffix)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    partial = target.with_name(target.name + ".part")
+    try:
+        with closing(_connect(db.database_path)) as source, closing(sqlite3.connect(partial)) as copy:
+            # читающая транзакция закрепляет снимок: запись в базу не перезапускает копирование
+            source.execute("BEGIN")
+            source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+            _copy(source, copy, pause, cancelled)
+            source.execute("COMMIT")
+        partial.replace(target)
+    finally:
+        partial.unlink(missing_ok=True)
+
+    removed = []
+    for old in list_backups(db)[keep:] if keep is not None else []:
+        if old == target:
+            continue  # часы отстают от mtime старых копий — новую копию не удаляем
+        old.unlink(missing_ok=True)
+        removed.append(old)
+    return BackupReport(target, target.stat().st_size, time.perf_counter() - started, removed)
+
+
+def compact(
+    db: "Database",
+    pause: float = STEP_PAUSE,
+    cancelled: Cancelled | None = None,
+    convert: bool = False,
+) -> CompactReport:
+    """
+    ANALYZE и incremental_vacuum по шагам. Старую базу без auto_vacuum=INCREMENTAL
+    переводит разовым полным VACUUM только при convert=True, иначе лишь анализирует.
+    """
+    if db.storage_profile.read_only:
+        raise ValueError("База открыта только для чтения")
+    db.engine  # схема создаётся и мигрируется до обслуживания
+    started = time.perf_counter()
+    size_before = _database_size(db.database_path)
+    pages_freed = 0
+    full_vacuum = needs_conversion = False
+    with closing(_connect(db.database_path)) as connection:
+        connection.execute(f"PRAGMA analysis_limit={ANALYSIS_LIMIT}")
+        connection.execute("ANALYZE")
+        if connection.execute("PRAGMA auto_vacuum").fetchone()[0] == AUTO_VACUUM_INCREMENTAL:
+            while True:
+                if cancelled is not None and cancelled():
+                    raise MaintenanceCancelled
+                free = connection.execute("PRAGMA freelist_count").fetchone()[0]
+                if not free:
+                    break
+                # каждый шаг — своя короткая транзакция записи
+                connection.execute(f"PRAGMA incremental_vacuum({VACUUM_PAGES_PER_STEP})").fetchall()
+                pages_freed += free - connection.execute("PRAGMA freelist_count").fetchone()[0]
+                if pause:
+                    time.sleep(pause)
+        elif convert:
+            # режим auto_vacuum меняется только полным VACUUM; дальше хватит инкрементального
+            pages_freed = connection.execute("PRAGMA freelist_count").fetchone()[0]
+            connection.execute(f"PRAGMA auto_vacuum={AUTO_VACUUM_INCREMENTAL}")
+            connection.execute("VACUUM")
+            full_vacuum = True
+        else:
+            # полный VACUUM держал бы блокировку записи всё время перезаписи файла
+            needs_conversion = True
+        connection.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+    _save_state(db, compacted_at=time.time())
+    return CompactReport(
+        size_before, _database_size(db.database_path), pages_freed, time.perf_counter() - started,
+        full_vacuum, needs_conversion,
+    )
+
+
+def restore(db: "Database", source: Path | str | None = None) -> RestoreReport:
+    """
+    Заменяет базу копией source (по умолчанию — последней обычной, не копией
+    перед прошлым restore). Перед этим текущая база сохраняется отдельной копией
+    с суффиксом SAFETY_COPY_SUFFIX; такие копии не ротируются и удаляются только
+    вручную. Приложение должно быть закрыто.
+    """
+    if source is None:
+        backups = list_backups(db)
+        if not backups:
+            raise FileNotFoundError(f"Резервных копий нет в {backup_dir(db)}")
+        source = backups[0]
+    source = Path(source)
+    if not source.is_file():
+        raise FileNotFoundError(f"Файл не найден: {source}")
+    with closing(sqlite3.connect(f"file:{source.as_posix()}?mode=ro", uri=True)) as connection:
+        result = connection.execute("PRAGMA quick_check").fetchone()[0]
+    if result != "ok":
+        raise ValueError(f"Копия {source.name} повреждена: {result}")
+
+    started = time.perf_counter()
+    db.close()
+    safety_copy = None
+    if db.database_path.exists():
+        # без ротации: она могла бы удалить и восстанавливаемую копию
+        safety_copy = backup(db, keep=None, pause=0, suffix=SAFETY_COPY_SUFFIX).path
+    with closing(sqlite3.connect(source)) as copy, closing(_connect(db.database_path)) as target:
+        _copy(copy, target, 0, None)
+    return RestoreReport(source, safety_copy, time.perf_counter() - started)
+
+
+def _state_path(db: "Database") -> Path:
+    return backup_dir(db) / STATE_FILE_NAME
+
+
+def _load_state(db: "Database") -> dict:
+    try:
+        return json.loads(_state_path(db).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_state(db: "Database", **values):
+    state = _load_state(db) | values
+    try:
+        _state_path(db).parent.mkdir(parents=True, exist_ok=True)
+        _state_path(db).write_text(json.dumps(state), encoding="utf-8")
+    except OSError:
+        pass  # без состояния обслуживание просто повторится раньше срока
+
+
+def due_tasks(db: "Database", now: float | None = None) -> list[str]:
+    """Что пора сделать: "backup" и/или "compact"."""
+    if db.storage_profile.read_only or not db.database_path.exists():
+        return []
+    now = time.time() if now is None else now
+    tasks = []
+    backups = list_backups(db)
+    if not backups or now - backups[0].stat().st_mtime >= BACKUP_INTERVAL:
+        tasks.append("backup")
+    if now - _load_state(db).get("compacted_at", 0.0) >= COMPACT_INTERVAL:
+        tasks.append("compact")
+    return tasks
+
+
+def run_due(db: "Database", cancelled: Cancelled | None = None) -> list[BackupReport | CompactReport]:
+    """
+    Выполняет просроченные задачи: сначала копию, потом компактизацию — без
+    разового полного VACUUM старой базы, он только по команде compact.
+    """
+    reports: list[BackupReport | CompactReport] = []
+    for task in due_tasks(db):
+        if task == "backup":
+            reports.append(backup(db, cancelled=cancelled))
+        else:
+            reports.append(compact(db, cancelled=cancelled))
+    return reports
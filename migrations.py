@@ -0,0 +1,432 @@
+"""
+Версионные миграции схемы базы.
+
+Текущая версия схемы хранится в таблице settings под ключом "schema_version".
+Каждая миграция — функция, получающая открытое соединение внутри транзакции.
+При первом подключении Database сначала создаёт недостающие таблицы через
+Base.metadata.create_all, затем вызывает upgrade(), поэтому миграции обязаны быть идемпотентными: на новой
+базе они выполняются поверх уже актуальных таблиц.
+
+Миграции пишутся на чистом SQL и не импортируют модели: они описывают схему
+на момент своей версии, а не текущую.
+"""
+from typing import Callable, NamedTuple
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.engine import Connection
+
+SCHEMA_VERSION_KEY = "schema_version"
+
+
+def _0001_month_column(connection: Connection):
+    """Целочисленный месяц записи (YYYYMM) и составной индекс (month, category).
+
+    Заполнение идёт через SQL-функцию month_number(), которую Database
+    регистрирует на каждом соединении.
+    """
+    columns = {row[1] for row in connection.execute(text("PRAGMA table_info(financial_records)"))}
+    if "month" not in columns:
+        connection.execute(text("ALTER TABLE financial_records ADD COLUMN month INTEGER"))
+    connection.execute(text("UPDATE financial_records SET month = month_number(date)"))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_financial_records_month_category "
+        "ON financial_records (month, category)"
+    ))
+
+
+def _0002_monthly_rollup(connection: Connection):
+    """Таблица monthly_rollup с суммами по месяцам, поддерживаемая триггерами."""
+    connection.execute(text(
+        "CREATE TABLE IF NOT EXISTS monthly_rollup ("
+        " month INTEGER NOT NULL PRIMARY KEY,"
+        " salary FLOAT NOT NULL,"
+        " advance FLOAT NOT NULL,"
+        " other FLOAT NOT NULL,"
+        " total FLOAT NOT NULL,"
+        " records INTEGER NOT NULL)"
+    ))
+    for trigger in ROLLUP_TRIGGERS:
+        connection.execute(text(trigger))
+    connection.execute(text("DELETE FROM monthly_rollup"))
+    connection.execute(text(
+        "INSERT INTO monthly_rollup (month, salary, advance, other, total, records) "
+        "SELECT month,"
+        " SUM(CASE WHEN category = 'salary' THEN amount ELSE 0.0 END),"
+        " SUM(CASE WHEN category = 'advance' THEN amount ELSE 0.0 END),"
+        " SUM(CASE WHEN category NOT IN ('salary', 'advance') THEN amount ELSE 0.0 END),"
+        " SUM(amount), COUNT(*) "
+        "FROM financial_records WHERE month IS NOT NULL GROUP BY month"
+    ))
+
+
+_ROLLUP_ADD = """
+    INSERT INTO monthly_rollup (month, salary, advance, other, total, records)
+    VALUES (
+        NEW.month,
+        CASE WHEN NEW.category = 'salary' THEN NEW.amount ELSE 0.0 END,
+        CASE WHEN NEW.category = 'advance' THEN NEW.amount ELSE 0.0 END,
+        CASE WHEN NEW.category NOT IN ('salary', 'advance') THEN NEW.amount ELSE 0.0 END,
+        NEW.amount,
+        1
+    )
+    ON CONFLICT (month) DO UPDATE SET
+        salary = salary + excluded.salary,
+        advance = advance + excluded.advance,
+        other = other + excluded.other,
+        total = total + excluded.total,
+        records = records + 1;
+"""
+
+_ROLLUP_SUBTRACT = """
+    UPDATE monthly_rollup SET
+        salary = salary - CASE WHEN OLD.category = 'salary' THEN OLD.amount ELSE 0.0 END,
+        advance = advance - CASE WHEN OLD.category = 'advance' THEN OLD.amount ELSE 0.0 END,
+        other = other - CASE WHEN OLD.category NOT IN ('salary', 'advance') THEN OLD.amount ELSE 0.0 END,
+        total = total - OLD.amount,
+        records = records - 1
+    WHERE month = OLD.month;
+    DELETE FROM monthly_rollup WHERE month = OLD.month AND records <= 0;
+"""
+
+# Триггеры обновляют monthly_rollup в той же транзакции, что и запись в
+# financial_records, независимо от того, ORM это или пакетный Core-запрос.
+ROLLUP_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS trg_financial_records_rollup_insert "
+    "AFTER INSERT ON financial_records WHEN NEW.month IS NOT NULL "
+    f"BEGIN {_ROLLUP_ADD} END",
+    "CREATE TRIGGER IF NOT EXISTS trg_financial_records_rollup_delete "
+    "AFTER DELETE ON financial_records WHEN OLD.month IS NOT NULL "
+    f"BEGIN {_ROLLUP_SUBTRACT} END",
+    "CREATE TRIGGER IF NOT EXISTS trg_financial_records_rollup_update_old "
+    "AFTER UPDATE OF date, amount, category, month ON financial_records WHEN OLD.month IS NOT NULL "
+    f"BEGIN {_ROLLUP_SUBTRACT} END",
+    "CREATE TRIGGER IF NOT EXISTS trg_financial_records_rollup_update_new "
+    "AFTER UPDATE OF date, amount, category, month ON financial_records WHEN NEW.month IS NOT NULL "
+    f"BEGIN {_ROLLUP_ADD} END",
+]
+
+
+def _0003_month_date_index(connection: Connection):
+    """Индекс (month, date) для постраничного чтения месяца по ключу (date, id)."""
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_financial_records_month_date "
+        "ON financial_records (month, date)"
+    ))
+
+
+_ORG_ROLLUP_ADD = """
+    INSERT INTO monthly_rollup (org_id, month, salary, advance, other, total, records)
+    VALUES (
+        NEW.org_id,
+        NEW.month,
+        CASE WHEN NEW.category = 'salary' THEN NEW.amount ELSE 0.0 END,
+        CASE WHEN NEW.category = 'advance' THEN NEW.amount ELSE 0.0 END,
+        CASE WHEN NEW.category NOT IN ('salary', 'advance') THEN NEW.amount ELSE 0.0 END,
+        NEW.amount,
+        1
+    )
+    ON CONFLICT (org_id, month) DO UPDATE SET
+        salary = salary + excluded.salary,
+        advance = advance + excluded.advance,
+        other = other + excluded.other,
+        total = total + excluded.total,
+        records = records + 1;
+"""
+
+_ORG_ROLLUP_SUBTRACT = """
+    UPDATE monthly_rollup SET
+        salary = salary - CASE WHEN OLD.category = 'salary' THEN OLD.amount ELSE 0.0 END,
+        advance = advance - CASE WHEN OLD.category = 'advance' THEN OLD.amount ELSE 0.0 END,
+        other = other - CASE WHEN OLD.category NOT IN ('salary', 'advance') THEN OLD.amount ELSE 0.0 END,
+        total = total - OLD.amount,
+        records = records - 1
+    WHERE org_id = OLD.org_id AND month = OLD.month;
+    DELETE FROM monthly_rollup WHERE org_id = OLD.org_id AND month = OLD.month AND records <= 0;
+"""
+
+# Те же триггеры, что ROLLUP_TRIGGERS, но monthly_rollup ведётся по (org_id, month)
+ORG_ROLLUP_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS trg_financial_records_rollup_insert "
+    "AFTER INSERT ON financial_records WHEN NEW.month IS NOT NULL "
+    f"BEGIN {_ORG_ROLLUP_ADD} END",
+    "CREATE TRIGGER IF NOT EXISTS trg_financial_records_rollup_delete "
+    "AFTER DELETE ON financial_records WHEN OLD.month IS NOT NULL "
+    f"BEGIN {_ORG_ROLLUP_SUBTRACT} END",
+    "CREATE TRIGGER IF NOT EXISTS trg_financial_records_rollup_update_old "
+    "AFTER UPDATE OF date, amount, category, month, org_id ON financial_records WHEN OLD.month IS NOT NULL "
+    f"BEGIN {_ORG_ROLLUP_SUBTRACT} END",
+    "CREATE TRIGGER IF NOT EXISTS trg_financial_records_rollup_update_new "
+    "AFTER UPDATE OF date, amount, category, month, org_id ON financial_records WHEN NEW.month IS NOT NULL "
+    f"BEGIN {_ORG_ROLLUP_ADD} END",
+]
+
+ROLLUP_TRIGGER_NAMES = (
+    "trg_financial_records_rollup_insert",
+    "trg_financial_records_rollup_delete",
+    "trg_financial_records_rollup_update_old",
+    "trg_financial_records_rollup_update_new",
+)
+
+
+def _0004_organizations(connection: Connection):
+    """Несколько организаций: таблица organizations, org_id в записях, monthly_rollup по (org_id, month).
+
+    Настройки единственной организации из settings переезжают в organizations(id=1),
+    ей же принадлежат все существующие записи. Помесячные индексы заменяются
+    индексами с ведущим org_id, чтобы запросы организации читали только её диапазон.
+    """
+    connection.execute(text(
+        "CREATE TABLE IF NOT EXISTS organizations ("
+        " id INTEGER NOT NULL PRIMARY KEY,"
+        " name VARCHAR,"
+        " start_date VARCHAR,"
+        " end_date VARCHAR)"
+    ))
+    connection.execute(text(
+        "INSERT INTO organizations (id, name, start_date, end_date) SELECT 1,"
+        " (SELECT value FROM settings WHERE key = 'org_name'),"
+        " (SELECT value FROM settings WHERE key = 'start_date'),"
+        " (SELECT value FROM settings WHERE key = 'end_date') "
+        "WHERE NOT EXISTS (SELECT 1 FROM organizations)"
+    ))
+    connection.execute(text("DELETE FROM settings WHERE key IN ('org_name', 'start_date', 'end_date')"))
+    connection.execute(text(
+        "INSERT INTO settings (key, value) SELECT 'active_org_id', MIN(id) FROM organizations "
+        "WHERE true ON CONFLICT (key) DO NOTHING"
+    ))
+
+    columns = {row[1] for row in connection.execute(text("PRAGMA table_info(financial_records)"))}
+    if "org_id" not in columns:
+        connection.execute(text("ALTER TABLE financial_records ADD COLUMN org_id INTEGER NOT NULL DEFAULT 1"))
+    connection.execute(text("DROP INDEX IF EXISTS ix_financial_records_month_category"))
+    connection.execute(text("DROP INDEX IF EXISTS ix_financial_records_month_date"))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_financial_records_org_month_category "
+        "ON financial_records (org_id, month, category)"
+    ))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_financial_records_org_month_date "
+        "ON financial_records (org_id, month, date)"
+    ))
+
+    for name in ROLLUP_TRIGGER_NAMES:
+        connection.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+    connection.execute(text("DROP TABLE IF EXISTS monthly_rollup"))
+    connection.execute(text(
+        "CREATE TABLE monthly_rollup ("
+        " org_id INTEGER DEFAULT '1' NOT NULL,"
+        " month INTEGER NOT NULL,"
+        " salary FLOAT NOT NULL,"
+        " advance FLOAT NOT NULL,"
+        " other FLOAT NOT NULL,"
+        " total FLOAT NOT NULL,"
+        " records INTEGER NOT NULL,"
+        " PRIMARY KEY (org_id, month))"
+    ))
+    for trigger in ORG_ROLLUP_TRIGGERS:
+        connection.execute(text(trigger))
+    connection.execute(text(
+        "INSERT INTO monthly_rollup (org_id, month, salary, advance, other, total, records) "
+        "SELECT org_id, month,"
+        " SUM(CASE WHEN category = 'salary' THEN amount ELSE 0.0 END),"
+        " SUM(CASE WHEN category = 'advance' THEN amount ELSE 0.0 END),"
+        " SUM(CASE WHEN category NOT IN ('salary', 'advance') THEN amount ELSE 0.0 END),"
+        " SUM(amount), COUNT(*) "
+        "FROM financial_records WHERE month IS NOT NULL GROUP BY org_id, month"
+    ))
+
+
+class Duplicate(NamedTuple):
+    """Повтор зарплаты или аванса: несколько записей одной категории в месяце организации."""
+    org_id: int
+    month: int              # YYYYMM
+    category: str
+    ids: tuple[int, ...]    # по возрастанию; первая — самая ранняя запись
+
+    @property
+    def year_month(self) -> str:
+        return f"{self.month // 100:04d}-{self.month % 100:02d}"
+
+    def describe(self) -> str:
+        ids = ", ".join(map(str, self.ids))
+        return f"организация {self.org_id}, {self.year_month}, {self.category}: записи {ids}"
+
+
+class DuplicateRecordsError(ValueError):
+    """Миграцию нельзя применить: в базе есть повторы, которые она запрещает."""
+
+    def __init__(self, version: int, duplicates: list[Duplicate]):
+        self.version = version
+        self.duplicates = duplicates
+        report = "; ".join(duplicate.describe() for duplicate in duplicates)
+        super().__init__(
+            f"Миграция {version} остановлена: зарплата или аванс повторяются в месяце ({report}). "
+            "Исправьте или удалите лишние записи либо выполните `SalaryTracker repair-duplicates` — "
+            "в каждой группе самая ранняя запись останется, остальные получат категорию other"
+        )
+
+
+def find_once_per_month_duplicates(connection: Connection) -> list[Duplicate]:
+    """Группы, где зарплата или аванс записаны больше одного раза за месяц организации."""
+    rows = connection.execute(text(
+        "SELECT org_id, month, category, group_concat(id) FROM ("
+        " SELECT org_id, month, category, id FROM financial_records"
+        " WHERE category IN ('salary', 'advance') AND month IS NOT NULL ORDER BY id) "
+        "GROUP BY org_id, month, category HAVING COUNT(*) > 1 "
+        "ORDER BY org_id, month, category"
+    ))
+    return [
+        Duplicate(org_id, month, category, tuple(sorted(int(id_) for id_ in ids.split(","))))
+        for org_id, month, category, ids in rows
+    ]
+
+
+def _0005_once_per_month_index(connection: Connection):
+    """Частичный уникальный индекс: одна зарплата и один аванс в месяц на организацию.
+
+    Правило раньше проверялось только в приложении, поэтому в старых базах могли
+    остаться повторы. Миграция их не трогает: она останавливается с
+    DuplicateRecordsError и списком повторов, транзакция обновления откатывается.
+    Повторы исправляет пользователь или явная команда repair-duplicates.
+    """
+    duplicates = find_once_per_month_duplicates(connection)
+    if duplicates:
+        raise DuplicateRecordsError(5, duplicates)
+    connection.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_financial_records_once_per_month "
+        "ON financial_records (org_id, month, category) WHERE category IN ('salary', 'advance')"
+    ))
+
+
+def _repair_once_per_month(connection: Connection):
+    """Из повторов зарплатой/авансом остаётся самая ранняя запись, остальные становятся "other"."""
+    for duplicate in find_once_per_month_duplicates(connection):
+        connection.execute(
+            text("UPDATE financial_records SET category = 'other' WHERE id IN :ids").bindparams(
+                bindparam("ids", expanding=True)
+            ),
+            {"ids": list(duplicate.ids[1:])},
+        )
+
+
+_REVISION_ROLLUP_ADD = """
+    INSERT INTO monthly_rollup (org_id, month, salary, advance, other, total, records, revision)
+    VALUES (
+        NEW.org_id,
+        NEW.month,
+        CASE WHEN NEW.category = 'salary' THEN NEW.amount ELSE 0.0 END,
+        CASE WHEN NEW.category = 'advance' THEN NEW.amount ELSE 0.0 END,
+        CASE WHEN NEW.category NOT IN ('salary', 'advance') THEN NEW.amount ELSE 0.0 END,
+        NEW.amount,
+        1,
+        1
+    )
+    ON CONFLICT (org_id, month) DO UPDATE SET
+        salary = salary + excluded.salary,
+        advance = advance + excluded.advance,
+        other = other + excluded.other,
+        total = total + excluded.total,
+        records = records + 1,
+        revision = revision + 1;
+"""
+
+_REVISION_ROLLUP_SUBTRACT = """
+    UPDATE monthly_rollup SET
+        salary = salary - CASE WHEN OLD.category = 'salary' THEN OLD.amount ELSE 0.0 END,
+        advance = advance - CASE WHEN OLD.category = 'advance' THEN OLD.amount ELSE 0.0 END,
+        other = other - CASE WHEN OLD.category NOT IN ('salary', 'advance') THEN OLD.amount ELSE 0.0 END,
+        total = total - OLD.amount,
+        records = records - 1,
+        revision = revision + 1
+    WHERE org_id = OLD.org_id AND month = OLD.month;
+    DELETE FROM monthly_rollup WHERE org_id = OLD.org_id AND month = OLD.month AND records <= 0;
+"""
+
+# Те же триггеры, что ORG_ROLLUP_TRIGGERS, но каждое изменение месяца увеличивает revision
+REVISION_ROLLUP_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS trg_financial_records_rollup_insert "
+    "AFTER INSERT ON financial_records WHEN NEW.month IS NOT NULL "
+    f"BEGIN {_REVISION_ROLLUP_ADD} END",
+    "CREATE TRIGGER IF NOT EXISTS trg_financial_records_rollup_delete "
+    "AFTER DELETE ON financial_records WHEN OLD.month IS NOT NULL "
+    f"BEGIN {_REVISION_ROLLUP_SUBTRACT} END",
+    "CREATE TRIGGER IF NOT EXISTS trg_financial_records_rollup_update_old "
+    "AFTER UPDATE OF date, amount, category, month, org_id ON financial_records WHEN OLD.month IS NOT NULL "
+    f"BEGIN {_REVISION_ROLLUP_SUBTRACT} END",
+    "CREATE TRIGGER IF NOT EXISTS trg_financial_records_rollup_update_new "
+    "AFTER UPDATE OF date, amount, category, month, org_id ON financial_records WHEN NEW.month IS NOT NULL "
+    f"BEGIN {_REVISION_ROLLUP_ADD} END",
+]
+
+
+def _0006_rollup_revision(connection: Connection):
+    """Счётчик изменений месяца monthly_rollup.revision.
+
+    Его растят те же триггеры, что ведут суммы, — в том же UPDATE, без лишних
+    операторов. По нему Database.poll_changes находит месяцы, изменённые другим
+    процессом, даже если суммы месяца не изменились (например, сдвинули дату).
+    """
+    columns = {row[1] for row in connection.execute(text("PRAGMA table_info(monthly_rollup)"))}
+    if "revision" not in columns:
+        connection.execute(text("ALTER TABLE monthly_rollup ADD COLUMN revision INTEGER NOT NULL DEFAULT 0"))
+    for name in ROLLUP_TRIGGER_NAMES:
+        connection.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+    for trigger in REVISION_ROLLUP_TRIGGERS:
+        connection.execute(text(trigger))
+
+
+# (версия, описание, функция) — строго по возрастанию версии
+MIGRATIONS = [
+    (1, "month INTEGER + индекс (month, category)", _0001_month_column),
+    (2, "monthly_rollup + триггеры", _0002_monthly_rollup),
+    (3, "индекс (month, date)", _0003_month_date_index),
+    (4, "organizations + org_id в записях и monthly_rollup", _0004_organizations),
+    (5, "уникальный индекс зарплаты/аванса в месяце", _0005_once_per_month_index),
+    (6, "monthly_rollup.revision — счётчик изменений месяца", _0006_rollup_revision),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+# явные исправления данных, без которых миграция версии не применяется;
+# выполняются только по команде пользователя (upgrade(repair=True))
+REPAIRS: dict[int, Callable[[Connection], None]] = {
+    5: _repair_once_per_month,
+}
+
+
+def get_schema_version(connection: Connection) -> int:
+    value = connection.execute(
+        text("SELECT value FROM settings WHERE key = :key"), {"key": SCHEMA_VERSION_KEY}
+    ).scalar()
+    return int(value) if value else 0
+
+
+def stamp(connection: Connection, version: int = LATEST_VERSION):
+    """Записывает версию схемы без выполнения миграций."""
+    connection.execute(
+        text(
+            "INSERT INTO settings (key, value) VALUES (:key, :value) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value"
+        ),
+        {"key": SCHEMA_VERSION_KEY, "value": str(version)},
+    )
+
+
+def upgrade(connection: Connection, repair: bool = False) -> list[int]:
+    """
+    Применяет недостающие миграции по порядку. Возвращает номера применённых версий.
+
+    Миграция, встретившая повторы, останавливает обновление DuplicateRecordsError;
+    с repair=True их сначала исправляет REPAIRS той же версии.
+    """
+    current = get_schema_version(connection)
+    applied = []
+    for version, _description, migrate in MIGRATIONS:
+        if version <= current:
+            continue
+        if repair and version in REPAIRS:
+            REPAIRS[version](connection)
+        migrate(connection)
+        stamp(connection, version)
+        applied.append(version)
+    return applied
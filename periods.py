@@ -0,0 +1,178 @@
+"""
+Суммы за произвольные периоды по префиксным суммам помесячных итогов.
+
+PrefixSumIndex строится один раз из monthly_rollup организации: для каждой
+колонки (зарплата, аванс, другое, итого, число записей) — дерево Фенвика по
+плотной оси месяцев. Сумма за любой диапазон месяцев — разность двух
+префиксов, O(log n); изменение месяца после записи — тоже O(log n), без
+пересборки. Месяц выходит за подготовленную ось (с запасом PADDING_MONTHS
+с обеих сторон) — индекс пересобирается, это O(n) по числу месяцев.
+
+Границы периодов — целые месяцы: записи с некорректной датой в monthly_rollup
+не попадают и в суммы периодов не входят (в отличие от get_grand_total).
+"""
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Iterable
+
+FIELDS = ("salary", "advance", "other", "total", "records")
+PADDING_MONTHS = 24
+ROLLING_MONTHS = 12
+
+
+@dataclass(frozen=True)
+class PeriodTotals:
+    salary: float = 0.0
+    advance: float = 0.0
+    other: float = 0.0
+    total: float = 0.0
+    records: int = 0
+
+
+@dataclass(frozen=True)
+class Period:
+    label: str
+    first_month: str   # "YYYY-MM", включительно
+    last_month: str    # "YYYY-MM", включительно
+
+
+def month_index(month: int) -> int:
+    """YYYYMM -> номер месяца на сплошной оси."""
+    return (month // 100) * 12 + month % 100 - 1
+
+
+def index_month(index: int) -> int:
+    """Номер месяца на оси -> YYYYMM."""
+    return (index // 12) * 100 + index % 12 + 1
+
+
+def _label(month: int) -> str:
+    return f"{month // 100:04d}-{month % 100:02d}"
+
+
+class PrefixSumIndex:
+    def __init__(self, rows: Iterable[tuple[int, float, float, float, float, int]] = ()):
+        """rows — (month YYYYMM, salary, advance, other, total, records) из monthly_rollup."""
+        self._values: dict[int, tuple[float, ...]] = {}
+        for month, *values in rows:
+            self._values[month] = tuple(float(value) for value in values)
+        self._months = sorted(self._values)
+        self._build()
+
+    def _build(self):
+        if self._months:
+            self._base = month_index(self._months[0]) - PADDING_MONTHS
+            size = month_index(self._months[-1]) + PADDING_MONTHS - self._base + 1
+        else:
+            self._base, size = 0, 0
+        self._size = size
+        self._trees = [[0.0] * (size + 1) for _ in FIELDS]
+        # построение за O(n): каждый узел передаёт накопленное родителю
+        for month, values in self._values.items():
+            position = month_index(month) - self._base + 1
+            for tree, value in zip(self._trees, values):
+                tree[position] += value
+        for position in range(1, size + 1):
+            parent = position + (position & -position)
+            if parent <= size:
+                for tree in self._trees:
+                    tree[parent] += tree[position]
+
+    def _add(self, position: int, deltas: list[float]):
+        while position <= self._size:
+            for tree, delta in zip(self._trees, deltas):
+                tree[position] += delta
+            position += position & -position
+
+    def _prefix(self, position: int) -> list[float]:
+        """Суммы колонок по позициям 1..position."""
+        sums = [0.0] * len(FIELDS)
+        position = min(position, self._size)
+        while position > 0:
+            for i, tree in enumerate(self._trees):
+                sums[i] += tree[position]
+            position -= position & -position
+        return sums
+
+    def set_month(self, month: int, values: tuple[float, ...] | None):
+        """Новые итоги месяца (None — месяц пропал из monthly_rollup)."""
+        old = self._values.get(month)
+        if values is None:
+            if old is None:
+                return
+            del self._values[month]
+            self._months.pop(bisect_left(self._months, month))
+            new = (0.0,) * len(FIELDS)
+        else:
+            new = tuple(float(value) for value in values)
+            self._values[month] = new
+            if old is None:
+                insort(self._months, month)
+        position = month_index(month) - self._base + 1
+        if not 1 <= position <= self._size:
+            self._build()
+            return
+        self._add(position, [n - o for n, o in zip(new, old or (0.0,) * len(FIELDS))])
+
+    def totals(self, first_month: int, last_month: int) -> PeriodTotals:
+        """Суммы за месяцы first_month..last_month (YYYYMM, включительно)."""
+        if first_month > last_month or not self._size:
+            return PeriodTotals()
+        first = max(month_index(first_month) - self._base + 1, 1)
+        last = month_index(last_month) - self._base + 1
+        if last < 1:
+            return PeriodTotals()
+        upper, lower = self._prefix(last), self._prefix(first - 1)
+        salary, advance, other, total, records = (u - l for u, l in zip(upper, lower))
+        return PeriodTotals(salary, advance, other, total, round(records))
+
+    def bounds(self) -> tuple[int, int] | None:
+        """Первый и последний месяц с записями (YYYYMM)."""
+        return (self._months[0], self._months[-1]) if self._months else None
+
+
+def _parse_org_date(value: str | None) -> date | None:
+    """Дата из настроек организации (ДД.ММ.ГГГГ) или None."""
+    try:
+        return datetime.strptime(value, "%d.%m.%Y").date() if value else None
+    except ValueError:
+        return None
+
+
+def standard_periods(
+    bounds: tuple[str, str] | None,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    today: date | None = None,
+) -> list[Period]:
+    """
+    Периоды для экрана "Периоды": последние 12 месяцев, период работы из
+    настроек организации, затем каждый год журнала (новые сверху) с кварталами.
+    """
+    today = today or date.today()
+    current = today.year * 100 + today.month
+    periods = [Period(
+        f"Последние {ROLLING_MONTHS} мес.",
+        _label(index_month(month_index(current) - ROLLING_MONTHS + 1)),
+        _label(current),
+    )]
+    start = _parse_org_date(start_date)
+    if start is not None:
+        end = _parse_org_date(end_date) or today
+        periods.append(Period(
+            "Период работы",
+            _label(start.year * 100 + start.month),
+            _label(end.year * 100 + end.month),
+        ))
+    if bounds is not None:
+        first_year, last_year = int(bounds[0][:4]), int(bounds[1][:4])
+        for year in range(last_year, first_year - 1, -1):
+            periods.append(Period(f"{year} год", f"{year}-01", f"{year}-12"))
+            for quarter in range(4, 0, -1):
+                periods.append(Period(
+                    f"{year}, {quarter} кв.",
+                    f"{year}-{quarter * 3 - 2:02d}",
+                    f"{year}-{quarter * 3:02d}",
+                ))
+    return periods
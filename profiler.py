@@ -0,0 +1,261 @@
+"""
+Инструментирование горячих путей: методы Database, SQL-запросы и загрузка
+таблиц интерфейса.
+
+PROFILER.enable() оборачивает публичные методы Database таймерами (кроме
+генераторов и контекстных менеджеров) и подписывается на before/after_cursor_execute SQLAlchemy. Методы интерфейса
+помечаются декоратором @profiled("ui....") и измеряются, только пока
+профилировщик включён. Для каждой операции копятся гистограмма задержек,
+число вызовов и число SQL-запросов, выполненных внутри неё; с trace_memory=True
+ещё и пик памяти по tracemalloc (при параллельных операциях в разных потоках
+пик приблизительный).
+
+Статистику показывает ProfilerScreen (скрытая клавиша F9) и сохраняет
+PROFILER.dump(path) в JSON.
+"""
+import functools
+import inspect
+import json
+import re
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+# верхние границы корзин гистограммы, мс; последняя корзина — всё, что дольше
+BUCKET_BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+SQL_LABEL_LENGTH = 80
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class OperationStats:
+    calls: int = 0
+    queries: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    peak_kib: float = 0.0
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(BUCKET_BOUNDS_MS) + 1))
+
+    def add(self, elapsed_ms: float, queries: int, peak_kib: float):
+        self.calls += 1
+        self.queries += queries
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.peak_kib = max(self.peak_kib, peak_kib)
+        for index, bound in enumerate(BUCKET_BOUNDS_MS):
+            if elapsed_ms <= bound:
+                self.buckets[index] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.calls if self.calls else 0.0
+
+    def percentile_ms(self, fraction: float) -> float:
+        """Верхняя граница корзины, в которую попадает перцентиль (для последней — максимум)."""
+        target = fraction * self.calls
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= target:
+                return BUCKET_BOUNDS_MS[index] if index < len(BUCKET_BOUNDS_MS) else self.max_ms
+        return 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "queries": self.queries,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.mean_ms, 3),
+            "p50_ms": self.percentile_ms(0.5),
+            "p95_ms": self.percentile_ms(0.95),
+            "max_ms": round(self.max_ms, 3),
+            "peak_kib": round(self.peak_kib, 1),
+            "histogram": dict(zip([f"<={bound}" for bound in BUCKET_BOUNDS_MS] + ["more"], self.buckets)),
+        }
+
+
+class _Frame:
+    __slots__ = ("name", "start", "queries", "memory_start")
+
+    def __init__(self, name: str, memory_start: int):
+        self.name = name
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.memory_start = memory_start
+
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.trace_memory = False
+        self.started: datetime | None = None
+        self._stats: dict[str, OperationStats] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._originals: dict[str, Callable] = {}
+
+    # --- включение ---
+
+    def enable(self, trace_memory: bool = False):
+        """Включает сбор: оборачивает методы Database и подписывается на события SQLAlchemy."""
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.trace_memory = trace_memory
+        if self.enabled:
+            return
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+
+        from database import Database
+
+        for name, member in inspect.getmembers(Database, inspect.isfunction):
+            if not name.startswith("_") and not _is_generator(member):
+                self._originals[name] = member
+                setattr(Database, name, _wrap(f"db.{name}", member))
+        event.listen(Engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", self._after_cursor_execute)
+        self.started = datetime.now(timezone.utc)
+        self.enabled = True
+
+    def disable(self):
+        if not self.enabled:
+            return
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+
+        from database import Database
+
+        for name, original in self._originals.items():
+            setattr(Database, name, original)
+        self._originals.clear()
+        event.remove(Engine, "before_cursor_execute", self._before_cursor_execute)
+        event.remove(Engine, "after_cursor_execute", self._after_cursor_execute)
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.trace_memory = False
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+        self.started = datetime.now(timezone.utc)
+
+    # --- замеры ---
+
+    def _stack(self) -> list[_Frame]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def begin(self, name: str) -> _Frame:
+        stack = self._stack()
+        memory_start = 0
+        if self.trace_memory and tracemalloc.is_tracing():
+            if not stack:
+                tracemalloc.reset_peak()
+            memory_start = tracemalloc.get_traced_memory()[0]
+        frame = _Frame(name, memory_start)
+        stack.append(frame)
+        return frame
+
+    def end(self, frame: _Frame):
+        elapsed_ms = (time.perf_counter() - frame.start) * 1000
+        stack = self._stack()
+        # корутины на одном потоке могут завершаться не в порядке начала
+        if frame in stack:
+            stack.remove(frame)
+        peak_kib = 0.0
+        if self.trace_memory and tracemalloc.is_tracing():
+            peak_kib = max(0, tracemalloc.get_traced_memory()[1] - frame.memory_start) / 1024
+        self.record(frame.name, elapsed_ms, frame.queries, peak_kib)
+
+    def record(self, name: str, elapsed_ms: float, queries: int = 0, peak_kib: float = 0.0):
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = OperationStats()
+            stats.add(elapsed_ms, queries, peak_kib)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("profiler_query_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("profiler_query_start")
+        if not starts:
+            return
+        elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+        for frame in self._stack():
+            frame.queries += 1
+        label = _WHITESPACE.sub(" ", statement).strip()[:SQL_LABEL_LENGTH]
+        self.record(f"sql {label}", elapsed_ms, 1)
+
+    # --- результаты ---
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """Статистика по операциям, отсортированная по суммарному времени."""
+        with self._lock:
+            items = sorted(self._stats.items(), key=lambda item: item[1].total_ms, reverse=True)
+            return {name: stats.to_dict() for name, stats in items}
+
+    def dump(self, path: Path | str) -> Path:
+        path = Path(path)
+        report = {
+            "started": self.started.isoformat(timespec="seconds") if self.started else None,
+            "dumped": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "trace_memory": self.trace_memory,
+            "bucket_bounds_ms": list(BUCKET_BOUNDS_MS),
+            "operations": self.snapshot(),
+        }
+        path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        return path
+
+
+PROFILER = Profiler()
+
+
+def _is_generator(func: Callable) -> bool:
+    """
+    Генератор или @contextmanager: вызов только создаёт объект, а работа идёт
+    при итерации или внутри with, и таймер вызова показал бы ~0 мс. Их запросы
+    всё равно попадают в статистику как отдельные SQL-операции.
+    """
+    return inspect.isgeneratorfunction(inspect.unwrap(func))
+
+
+def _wrap(name: str, func: Callable) -> Callable:
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            if not PROFILER.enabled:
+                return await func(*args, **kwargs)
+            frame = PROFILER.begin(name)
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                PROFILER.end(frame)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not PROFILER.enabled:
+            return func(*args, **kwargs)
+        frame = PROFILER.begin(name)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            PROFILER.end(frame)
+    return wrapper
+
+
+def profiled(name: str):
+    """Декоратор: время вызова попадает в статистику под именем name, когда профилировщик включён."""
+    return functools.partial(_wrap, name)
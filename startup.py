@@ -0,0 +1,67 @@
+"""
+Отчёт о холодном старте: `python main.py --startup-report`.
+
+Приложение запускается как обычно и закрывается, как только отрисован первый
+кадр и загружена первая страница сводки. После выхода печатается:
+
+- время этапов от запуска main.py (импорт интерфейса, первый кадр, открытие
+  базы, первая страница);
+- собственное время импорта по пакетам верхнего уровня из `python -X importtime`
+  (в собранном PyInstaller-файле недоступно и пропускается).
+"""
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+# модули, которые main.py импортирует до первого кадра, и database, который грузится сразу после
+STARTUP_IMPORTS = "import main, app.salary_app, database"
+TOP_PACKAGES = 12
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+\d+\s+\|\s+(\S.*)$")
+
+
+class StartupReport:
+    def __init__(self, started: float | None = None):
+        self.started = time.perf_counter() if started is None else started
+        self.marks: list[tuple[str, float]] = []
+
+    def mark(self, stage: str):
+        """Отмечает этап один раз; повторные отметки того же этапа игнорируются."""
+        if all(name != stage for name, _ in self.marks):
+            self.marks.append((stage, time.perf_counter() - self.started))
+
+    def format(self) -> str:
+        lines = ["Холодный старт, мс от запуска:"]
+        for stage, elapsed in sorted(self.marks, key=lambda mark: mark[1]):
+            lines.append(f"  {stage:<28} {elapsed * 1000:>8.1f}")
+
+        packages = import_breakdown()
+        if packages is None:
+            lines.append("Разбивка импорта недоступна в собранном приложении")
+        else:
+            lines.append("Импорт по пакетам (собственное время, мс):")
+            for package, micros in packages[:TOP_PACKAGES]:
+                lines.append(f"  {package:<28} {micros / 1000:>8.1f}")
+        return "\n".join(lines)
+
+
+def import_breakdown() -> list[tuple[str, int]] | None:
+    """[(пакет, мкс)] по убыванию собственного времени импорта или None, если замер невозможен."""
+    if getattr(sys, "frozen", False):
+        return None
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP_IMPORTS],
+        cwd=Path(__file__).resolve().parent,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    totals: dict[str, int] = defaultdict(int)
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            totals[match.group(2).strip().split(".")[0]] += int(match.group(1))
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
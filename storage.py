@@ -0,0 +1,132 @@
+"""
+Профили хранения SQLite: режим журнала, PRAGMA и параметры пула соединений.
+
+Профиль выбирается аргументом Database(storage_profile=...), флагом
+`--storage` в main.py или переменной окружения SALARY_STORAGE_PROFILE:
+
+    durable   — WAL + synchronous=FULL: запись переживает отключение питания (по умолчанию);
+    fast      — WAL + synchronous=NORMAL, больший кэш страниц и mmap: быстрее
+                запись, при сбое питания можно потерять последние транзакции;
+    read-only — файл открывается только на чтение (mode=ro), схема не создаётся
+                и не мигрируется, любые изменения завершаются ошибкой.
+
+Новая база создаётся с auto_vacuum=INCREMENTAL, чтобы maintenance.compact()
+возвращал место без полного VACUUM; на существующие базы эта PRAGMA не влияет.
+PRAGMA применяются к каждому новому соединению через событие "connect";
+соединения живут в пуле всё время работы приложения и не переоткрываются.
+"""
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from sqlalchemy import Engine
+
+PROFILE_ENV = "SALARY_STORAGE_PROFILE"
+DEFAULT_PROFILE = "durable"
+
+
+@dataclass(frozen=True)
+class StorageProfile:
+    name: str
+    journal_mode: str | None = "WAL"
+    synchronous: str = "FULL"
+    cache_size_kib: int = 2_000     # PRAGMA cache_size = -N (в КиБ)
+    mmap_size: int = 0              # байт, 0 — без отображения в память
+    temp_store: str = "DEFAULT"
+    read_only: bool = False
+    # соединений в пуле; столько же потоков AsyncDatabase работают без ожидания
+    pool_size: int = 5
+
+    def pragmas(self) -> list[tuple[str, object]]:
+        """PRAGMA в порядке применения."""
+        result: list[tuple[str, object]] = []
+        if not self.read_only:
+            # действует, только пока в базе нет ни одной таблицы
+            result.append(("auto_vacuum", "INCREMENTAL"))
+        if self.journal_mode is not None and not self.read_only:
+            result.append(("journal_mode", self.journal_mode))
+        result += [
+            ("synchronous", self.synchronous),
+            ("cache_size", -self.cache_size_kib),
+            ("mmap_size", self.mmap_size),
+            ("temp_store", self.temp_store),
+        ]
+        if self.read_only:
+            result.append(("query_only", "ON"))
+        return result
+
+
+PROFILES: dict[str, StorageProfile] = {
+    "durable": StorageProfile("durable"),
+    "fast": StorageProfile(
+        "fast",
+        synchronous="NORMAL",
+        cache_size_kib=64_000,
+        mmap_size=256 * 1024 * 1024,
+        temp_store="MEMORY",
+    ),
+    "read-only": StorageProfile(
+        "read-only",
+        journal_mode=None,
+        synchronous="OFF",
+        cache_size_kib=64_000,
+        mmap_size=256 * 1024 * 1024,
+        temp_store="MEMORY",
+        read_only=True,
+    ),
+}
+
+
+def resolve_profile(profile: StorageProfile | str | None = None) -> StorageProfile:
+    """Профиль по объекту, имени или переменной окружения SALARY_STORAGE_PROFILE."""
+    if isinstance(profile, StorageProfile):
+        return profile
+    name = profile or os.environ.get(PROFILE_ENV) or DEFAULT_PROFILE
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Неизвестный профиль хранения: {name} (доступны: {', '.join(PROFILES)})") from None
+
+
+def _database_url(path: Path, profile: StorageProfile) -> str:
+    if profile.read_only:
+        return f"sqlite:///file:{path.as_posix()}?mode=ro&uri=true"
+    return f"sqlite:///{path}"
+
+
+def create_storage_engine(path: Path, profile: StorageProfile) -> "Engine":
+    """Движок SQLite с пулом постоянных соединений и PRAGMA профиля."""
+    # SQLAlchemy импортируется здесь, чтобы main.py мог разобрать аргументы без неё
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.pool import QueuePool
+
+    if profile.read_only and not path.exists():
+        raise FileNotFoundError(f"База не найдена: {path}")
+    engine = create_engine(
+        _database_url(path, profile),
+        echo=False,
+        poolclass=QueuePool,
+        pool_size=profile.pool_size,
+        max_overflow=profile.pool_size,
+        pool_recycle=-1,
+        # соединение используется потоками пула AsyncDatabase по очереди
+        connect_args={"check_same_thread": False},
+    )
+    pragmas = profile.pragmas()
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                # auto_vacuum действует только на пустой базе, а на непустой ждал бы
+                # блокировку записи: новое соединение пула не открылось бы во время импорта
+                if name == "auto_vacuum" and cursor.execute("PRAGMA page_count").fetchone()[0]:
+                    continue
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    return engine
@@ -0,0 +1,16 @@
+import pytest
+
+from database import Database
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "ledger.db"
+
+
+@pytest.fixture
+def db(db_path):
+    """Database на временном файле; закрывается после теста."""
+    database = Database(db_path)
+    yield database
+    database.close()
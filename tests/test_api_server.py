@@ -0,0 +1,124 @@
+"""Локальный JSON API: коды ответов записи и проверка ETag/304 для чтения."""
+import asyncio
+from typing import Awaitable, Callable
+
+import httpx
+import pytest
+
+from api_server import ApiServer
+from database import Database
+
+Scenario = Callable[[httpx.AsyncClient], Awaitable[None]]
+
+
+@pytest.fixture
+def run(db: Database) -> Callable[[Scenario], None]:
+    """Выполняет сценарий с клиентом сервера, запущенного на свободном порту."""
+
+    def run_scenario(scenario: Scenario):
+        async def main():
+            server = ApiServer(db, port=0)
+            await server.start()
+            try:
+                async with httpx.AsyncClient(base_url=server.url) as client:
+                    await scenario(client)
+            finally:
+                await server.close()
+
+        asyncio.run(main())
+
+    return run_scenario
+
+
+def test_post_creates_record(run, db: Database):
+    async def scenario(client: httpx.AsyncClient):
+        response = await client.post("/api/records", json={"date": "2024-03-05", "amount": 10})
+        assert response.status_code == 201
+        record = response.json()
+        assert record == {"id": record["id"], "date": "2024-03-05", "amount": 10.0, "category": "other"}
+        assert (await client.get(f"/api/records/{record['id']}")).json() == record
+
+    run(scenario)
+    assert db.get_grand_total() == 10.0
+
+
+@pytest.mark.parametrize("body", [
+    {"date": 20240305, "amount": 10},
+    {"date": "2024-03-05", "amount": True},
+    {"date": "2024-03-05", "amount": [10]},
+    {"date": "2024-03-05", "amount": 10, "category": ["other"]},
+    {"date": "2024-03-05", "amount": -1},
+    {"date": "2024-13-05", "amount": 10},
+    {"amount": 10},
+    ["2024-03-05", 10],
+])
+def test_invalid_record_is_rejected_with_400(run, db: Database, body):
+    async def scenario(client: httpx.AsyncClient):
+        response = await client.post("/api/records", json=body)
+        assert response.status_code == 400
+        assert response.json()["error"]
+
+    run(scenario)
+    assert db.count_records() == 0
+
+
+def test_non_json_body_is_rejected_with_400(run):
+    async def scenario(client: httpx.AsyncClient):
+        response = await client.post("/api/records", content=b"date=2024-03-05")
+        assert response.status_code == 400
+
+    run(scenario)
+
+
+def test_missing_record_and_route_give_404(run):
+    async def scenario(client: httpx.AsyncClient):
+        assert (await client.get("/api/records/999")).status_code == 404
+        assert (await client.put("/api/records/999", json={"date": "2024-03-05", "amount": 1})).status_code == 404
+        assert (await client.delete("/api/records/999")).status_code == 404
+        assert (await client.get("/api/nothing")).status_code == 404
+        response = await client.delete("/api/summary")
+        assert (response.status_code, response.headers["allow"]) == (405, "GET")
+
+    run(scenario)
+
+
+def test_second_salary_in_month_gives_409(run, db: Database):
+    async def scenario(client: httpx.AsyncClient):
+        first = await client.post("/api/records", json={"date": "2024-03-05", "amount": 100, "category": "salary"})
+        assert first.status_code == 201
+        second = await client.post("/api/records", json={"date": "2024-03-25", "amount": 50, "category": "salary"})
+        assert second.status_code == 409
+        other = await client.post("/api/records", json={"date": "2024-03-25", "amount": 50})
+        moved = await client.put(f"/api/records/{other.json()['id']}",
+                                 json={"date": "2024-03-26", "amount": 50, "category": "salary"})
+        assert moved.status_code == 409
+
+    run(scenario)
+    assert db.get_monthly_breakdown("2024-03") == {"salary": 100.0, "advance": 0.0, "other": 50.0}
+
+
+def test_etag_revalidation(run, db_path):
+    async def scenario(client: httpx.AsyncClient):
+        first = await client.get("/api/total")
+        etag = first.headers["etag"]
+        assert first.status_code == 200
+        cached = await client.get("/api/total", headers={"If-None-Match": etag})
+        assert (cached.status_code, cached.content, cached.headers["etag"]) == (304, b"", etag)
+
+        # своя запись через API меняет версию
+        await client.post("/api/records", json={"date": "2024-03-05", "amount": 10})
+        fresh = await client.get("/api/total", headers={"If-None-Match": etag})
+        assert (fresh.status_code, fresh.json()) == (200, {"total": 10.0})
+        assert fresh.headers["etag"] != etag
+
+        # запись другого процесса тоже
+        etag = fresh.headers["etag"]
+        writer = Database(db_path)
+        try:
+            writer.add_record("2024-04-05", 5.0, "other")
+        finally:
+            writer.close()
+        external = await client.get("/api/total", headers={"If-None-Match": etag})
+        assert (external.status_code, external.json()) == (200, {"total": 15.0})
+
+    run(scenario)
@@ -0,0 +1,120 @@
+"""Пакетные записи, insert_batches и единица работы transaction()."""
+import pytest
+
+from database import IN_CHUNK_SIZE, Database, Record
+from validation import DuplicateRecordError
+
+
+def other_records(count: int, month: str = "2024-01") -> list[tuple[str, float, str]]:
+    return [(f"{month}-{i % 28 + 1:02d}", float(i + 1), "other") for i in range(count)]
+
+
+def test_batches_larger_than_in_chunk(db: Database):
+    size = IN_CHUNK_SIZE * 2 + 5
+    inserted = db.add_records(other_records(size)).inserted
+    assert len(inserted) == size == db.count_records()
+
+    changes = db.update_records([Record(r.id, "2024-02-01", r.amount, r.category) for r in inserted])
+    assert len(changes.updated) == size
+    assert db.get_month_range() == ("2024-02", "2024-02")
+
+    changes = db.delete_records([r.id for r in inserted] * 2)
+    assert sorted(changes.removed) == sorted(r.id for r in inserted)
+    assert db.count_records() == 0
+    assert db.rebuild_rollups(repair=False) == []
+
+
+def test_batch_writes_skip_other_organizations_and_missing_ids(db: Database):
+    foreign = db.add_record("2024-01-05", 100.0, "salary").inserted[0]
+    db.switch_organization(db.create_organization("Вторая"))
+    own = db.add_record("2024-01-06", 1.0, "other").inserted[0]
+
+    changes = db.update_records([
+        Record(foreign.id, "2024-01-07", 5.0, "other"),
+        Record(own.id, "2024-01-08", 2.0, "other"),
+        Record(999, "2024-01-09", 3.0, "other"),
+    ])
+    assert changes.updated == [Record(own.id, "2024-01-08", 2.0, "other")]
+    assert db.delete_records([foreign.id, 999]).removed == []
+    assert db.get_grand_total() == 2.0
+
+
+def test_duplicate_in_batch_rejects_whole_batch(db: Database):
+    db.add_record("2024-01-05", 100.0, "salary")
+    with pytest.raises(DuplicateRecordError):
+        db.add_records([("2024-02-05", 1.0, "salary"), ("2024-02-06", 1.0, "salary")])
+    other = db.add_record("2024-01-10", 1.0, "other").inserted[0]
+    with pytest.raises(DuplicateRecordError):
+        db.update_records([Record(other.id, "2024-01-11", 1.0, "salary")])
+    assert db.count_records() == 2
+    assert db.get_monthly_breakdown("2024-01") == {"salary": 100.0, "advance": 0.0, "other": 1.0}
+
+
+def test_transaction_commits_once_at_the_end(db: Database, db_path):
+    reader = Database(db_path)
+    try:
+        assert reader.count_records() == 0  # схема готова до того, как писатель займёт базу
+        with db.transaction():
+            db.add_records(other_records(3))
+            with db.transaction():  # вложенный блок присоединяется к внешнему
+                db.add_record("2024-02-01", 10.0, "other")
+            assert reader.count_records() == 0
+        assert reader.count_records() == 4
+    finally:
+        reader.close()
+
+
+def test_transaction_rollback_undoes_everything(db_path):
+    db = Database(db_path, cache_size=16)
+    try:
+        kept = db.add_record("2024-01-05", 100.0, "salary").inserted[0]
+        assert db.get_period_totals("2024-01", "2024-12").total == 100.0
+        with pytest.raises(RuntimeError):
+            with db.transaction():
+                db.add_records(other_records(5, "2024-02"))
+                db.update_record(kept.id, "2024-03-05", 1.0, "salary")
+                db.insert_batches([[("2024-04-01", 7.0, "other", 202404)]])
+                raise RuntimeError
+        assert db.get_all_records() == [kept]
+        assert db.get_grand_total() == 100.0
+        assert db.get_monthly_summary() == [("2024-01", 100.0, 0.0)]
+        assert db.get_period_totals("2024-01", "2024-12").total == 100.0
+        assert db.rebuild_rollups(repair=False) == []
+    finally:
+        db.close()
+
+
+def test_insert_batches_consumes_lazy_batches(db: Database):
+    def batches():
+        for month in range(1, 7):
+            yield [(f"2024-{month:02d}-{day:02d}", 10.0, "other", 202400 + month) for day in (1, 2, 3)]
+
+    assert db.insert_batches(batches()) == 18
+    assert db.insert_batches([]) == 0
+    assert db.rebuild_rollups(repair=False) == []
+    assert db.get_monthly_breakdown("2024-04")["other"] == 30.0
+    assert db.get_period_totals("2024-01", "2024-06").records == 18
+
+
+def test_insert_batches_duplicate_rolls_back_all_batches(db: Database):
+    db.add_record("2024-03-05", 100.0, "salary")
+    batches = [
+        [("2024-01-01", 1.0, "other", 202401)],
+        [("2024-03-20", 50.0, "salary", 202403)],
+    ]
+    with pytest.raises(DuplicateRecordError):
+        db.insert_batches(batches)
+    assert db.count_records() == 1
+    assert db.rebuild_rollups(repair=False) == []
+
+
+def test_insert_batches_joins_open_transaction(db: Database):
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            db.insert_batches([[("2024-01-01", 1.0, "other", 202401)]])
+            raise RuntimeError
+    assert db.count_records() == 0
+    with db.transaction():
+        db.insert_batches([[("2024-01-01", 1.0, "other", 202401)]])
+        db.add_record("2024-01-02", 2.0, "other")
+    assert db.get_grand_total() == 3.0
@@ -0,0 +1,90 @@
+"""ChangeSet операций записи и poll_changes: изменения другого процесса видны, свои — нет."""
+import pytest
+
+from database import Database, Record
+
+
+@pytest.fixture
+def other(db: Database, db_path):
+    """Второй Database над тем же файлом — как второй экземпляр приложения."""
+    db.get_grand_total()
+    database = Database(db_path)
+    yield database
+    database.close()
+
+
+def test_add_records_reports_inserted_rows_and_summary(db: Database):
+    changes = db.add_records([("2024-01-05", 100.0, "salary"), ("2024-02-10", 40.0, "advance")])
+    assert [(r.date, r.amount, r.category) for r in changes.inserted] == [
+        ("2024-01-05", 100.0, "salary"), ("2024-02-10", 40.0, "advance"),
+    ]
+    assert all(isinstance(record, Record) for record in changes.inserted)
+    assert changes.summary_updated == db.get_monthly_summary()
+    assert changes.updated == changes.removed == changes.summary_removed == []
+
+
+def test_update_moving_record_touches_both_months(db: Database):
+    record = db.add_record("2024-01-05", 100.0, "other").inserted[0]
+    changes = db.update_record(record.id, "2024-02-05", 100.0, "other")
+    assert changes.updated == [Record(record.id, "2024-02-05", 100.0, "other")]
+    assert changes.summary_removed == ["2024-01"]
+    assert [row[0] for row in changes.summary_updated] == ["2024-02"]
+
+
+def test_delete_month_reports_removed_ids(db: Database):
+    ids = [record.id for record in db.add_records([("2024-03-01", 1.0, "other"), ("2024-03-02", 2.0, "other")]).inserted]
+    changes = db.delete_records_by_month("2024-03")
+    assert sorted(changes.removed) == ids
+    assert changes.summary_removed == ["2024-03"]
+
+
+def test_first_poll_only_takes_snapshot(db: Database, other: Database):
+    other.add_record("2024-01-05", 100.0, "salary")
+    assert db.poll_changes() is None
+
+
+def test_own_writes_are_not_reported(db: Database, other: Database):
+    db.poll_changes()
+    db.add_record("2024-01-05", 100.0, "salary")
+    with db.transaction():
+        db.add_record("2024-02-05", 5.0, "other")
+        db.add_record("2024-02-06", 5.0, "other")
+    assert db.poll_changes() is None
+
+
+def test_external_changes_are_reported_by_month(db: Database, other: Database):
+    db.add_record("2024-01-05", 100.0, "salary")
+    db.poll_changes()
+    version = db.data_version
+
+    record = other.add_record("2024-02-05", 30.0, "advance").inserted[0]
+    change = db.poll_changes()
+    assert change is not None and change.months == {"2024-02"}
+    assert ("2024-02", 30.0, 30.0) in change.changes.summary_updated
+    assert db.data_version > version
+    assert db.poll_changes() is None
+
+    # сдвиг даты внутри месяца не меняет сумм, но меняет revision месяца
+    other.update_record(record.id, "2024-02-20", 30.0, "advance")
+    change = db.poll_changes()
+    assert change is not None and change.months == {"2024-02"}
+
+    other.delete_records_by_month("2024-02")
+    change = db.poll_changes()
+    assert change is not None and change.months == {"2024-02"}
+    assert change.changes.summary_removed == ["2024-02"]
+
+
+def test_external_change_invalidates_cache(db_path):
+    cached = Database(db_path, cache_size=16)
+    writer = Database(db_path)
+    try:
+        cached.poll_changes()
+        assert cached.get_grand_total() == 0.0
+        writer.add_record("2024-01-05", 100.0, "other")
+        assert cached.get_grand_total() == 0.0  # кэш ещё не знает о чужой записи
+        assert cached.poll_changes() is not None
+        assert cached.get_grand_total() == 100.0
+    finally:
+        writer.close()
+        cached.close()
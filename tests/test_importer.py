@@ -0,0 +1,78 @@
+"""Импорт CSV и JSON Lines: корректные строки попадают в базу, остальные — в отчёт."""
+import json
+
+from database import Database
+from importer import import_records
+
+
+def write_jsonl(path, *items):
+    path.write_text("".join((item if isinstance(item, str) else json.dumps(item)) + "\n" for item in items),
+                    encoding="utf-8")
+    return path
+
+
+def test_csv_with_header_imports_valid_rows(db: Database, tmp_path):
+    path = tmp_path / "records.csv"
+    path.write_text(
+        "date,amount,category\n"
+        "2024-01-05,100,salary\n"
+        "2024-01-20,40.5,advance\n"
+        "\n"
+        "2024-02-01,7,\n",
+        encoding="utf-8",
+    )
+    report = import_records(db, path)
+    assert (report.imported, report.rejected, report.errors) == (3, 0, [])
+    assert db.get_monthly_breakdown("2024-02") == {"salary": 0.0, "advance": 0.0, "other": 7.0}
+
+
+def test_csv_rejected_rows_are_reported_by_line(db: Database, tmp_path):
+    db.add_record("2024-01-05", 100.0, "salary")
+    path = tmp_path / "records.csv"
+    path.write_text(
+        "2024-01-25,100,salary\n"     # зарплата января уже есть в базе
+        "2024-02-05,-1,other\n"
+        "2024-13-01,10,other\n"
+        "2024-02-06,10,bonus\n"
+        "2024-02-07\n"
+        "2024-03-05,50,advance\n"
+        "2024-03-06,50,advance\n",    # второй аванс марта в том же файле
+        encoding="utf-8",
+    )
+    report = import_records(db, path)
+    assert report.imported == 1
+    assert report.rejected == 6
+    assert [line_no for line_no, _reason in report.errors] == [1, 2, 3, 4, 5, 7]
+    assert "Неизвестная категория" in report.errors[3][1]
+    assert db.get_grand_total() == 150.0
+
+
+def test_jsonl_rejects_malformed_and_wrongly_typed_rows(db: Database, tmp_path):
+    path = write_jsonl(
+        tmp_path / "records.jsonl",
+        {"date": "2024-01-05", "amount": 100, "category": "salary"},
+        "{not json",
+        [1, 2, 3],
+        {"date": 20240105, "amount": 10},
+        {"date": "2024-01-06", "amount": 10, "category": ["other"]},
+        {"date": "2024-01-07", "amount": [10]},
+        {"date": "2024-01-08", "amount": "NaN"},
+        {"date": "2024-01-09", "amount": 5},
+    )
+    report = import_records(db, path)
+    assert (report.imported, report.rejected) == (2, 6)
+    reasons = dict(report.errors)
+    assert reasons[2] == "Некорректный JSON"
+    assert reasons[3] == "Ожидался объект JSON"
+    assert "строкой" in reasons[4] and "строкой" in reasons[5]
+    assert db.get_monthly_breakdown("2024-01") == {"salary": 100.0, "advance": 0.0, "other": 5.0}
+
+
+def test_import_reports_progress_to_the_end(db: Database, tmp_path):
+    path = write_jsonl(tmp_path / "records.jsonl",
+                       *({"date": f"2024-01-{day:02d}", "amount": 1} for day in range(1, 21)))
+    calls = []
+    report = import_records(db, path, progress=lambda read, total: calls.append((read, total)), batch_size=5)
+    assert report.imported == 20
+    assert calls[-1] == (path.stat().st_size,) * 2
+    assert [read for read, _total in calls] == sorted(read for read, _total in calls)
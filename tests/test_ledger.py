@@ -0,0 +1,64 @@
+"""Колоночный журнал в памяти (columnar=True) считает то же, что SQLite."""
+import pytest
+
+from database import Database
+
+pytest.importorskip("numpy")
+
+
+@pytest.fixture
+def pair(db_path):
+    """Два Database над одним файлом: с журналом в памяти (пишет) и без него (эталон)."""
+    columnar = Database(db_path, columnar=True)
+    sql = Database(db_path)
+    yield columnar, sql
+    columnar.close()
+    sql.close()
+
+
+def assert_same_results(columnar: Database, sql: Database):
+    expected = sql.get_monthly_summary()
+    summary = columnar.get_monthly_summary()
+    assert [month for month, _total, _shown in summary] == [month for month, _total, _shown in expected]
+    for (_month, total, shown), (_m, want_total, want_shown) in zip(summary, expected):
+        assert (total, shown) == (pytest.approx(want_total), pytest.approx(want_shown))
+    for month, _total, _shown in expected:
+        assert columnar.get_monthly_breakdown(month) == pytest.approx(sql.get_monthly_breakdown(month))
+    assert columnar.get_monthly_breakdown("2099-01") == sql.get_monthly_breakdown("2099-01")
+    assert columnar.get_grand_total() == pytest.approx(sql.get_grand_total())
+
+
+def test_columnar_matches_sqlite_through_writes(pair):
+    columnar, sql = pair
+    assert_same_results(columnar, sql)
+
+    columnar.add_records([
+        ("2024-01-05", 100000.0, "salary"),
+        ("2024-01-20", 40000.5, "advance"),
+        ("2024-02-05", 101000.0, "salary"),
+        ("2024-02-11", 0.1, "other"),
+        ("2024-04-20", 30000.0, "advance"),
+    ])
+    assert_same_results(columnar, sql)
+
+    # журнал уже загружен: новые записи дописываются в него, а не перечитываются
+    columnar.add_record("2024-03-05", 99000.0, "salary")
+    columnar.add_record("2024-02-12", 0.2, "other")
+    assert_same_results(columnar, sql)
+
+    records = {record.date: record for record in sql.get_all_records()}
+    columnar.update_record(records["2024-02-11"].id, "2024-05-01", 7.0, "other")
+    columnar.update_record(records["2024-01-20"].id, "2024-01-21", 45000.0, "advance")
+    assert_same_results(columnar, sql)
+
+    columnar.delete_records([records["2024-03-05"].id])
+    columnar.delete_records_by_month("2024-04")
+    assert_same_results(columnar, sql)
+
+
+def test_columnar_reloads_after_batch_insert(pair):
+    columnar, sql = pair
+    columnar.add_record("2024-01-05", 10.0, "other")
+    assert_same_results(columnar, sql)
+    columnar.insert_batches([[(f"2024-{month:02d}-15", 3.0, "other", 202400 + month) for month in range(1, 13)]])
+    assert_same_results(columnar, sql)
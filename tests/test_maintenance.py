@@ -0,0 +1,120 @@
+"""Резервные копии, восстановление и компактизация базы (maintenance)."""
+import os
+import sqlite3
+import time
+from contextlib import closing
+
+import pytest
+
+import maintenance
+from database import Database
+
+
+def age(path, seconds: float):
+    """Сдвигает mtime копии в прошлое: порядок копий не зависит от скорости теста."""
+    stamp = time.time() - seconds
+    os.utime(path, (stamp, stamp))
+
+
+def test_backup_is_a_consistent_copy(db: Database):
+    db.add_records([("2024-01-05", 100.0, "salary"), ("2024-01-20", 40.0, "advance")])
+    report = maintenance.backup(db, pause=0)
+    assert report.path.parent == maintenance.backup_dir(db)
+    assert report.size == report.path.stat().st_size > 0
+    assert not list(report.path.parent.glob("*.part"))
+
+    copy = Database(report.path, storage_profile="read-only")
+    try:
+        assert copy.get_grand_total() == 140.0
+    finally:
+        copy.close()
+
+
+def test_backup_rotation_keeps_newest(db: Database):
+    db.add_record("2024-01-05", 1.0, "other")
+    old = []
+    for i in range(4):
+        path = maintenance.backup(db, keep=None, pause=0).path
+        age(path, 1000 - i * 100)
+        old.append(path)
+
+    report = maintenance.backup(db, keep=2, pause=0)
+    assert sorted(report.removed) == sorted(old[:3])
+    assert maintenance.list_backups(db) == [report.path, old[3]]
+
+
+def test_restore_round_trip_keeps_safety_copy(db: Database):
+    db.add_record("2024-01-05", 100.0, "salary")
+    source = maintenance.backup(db, pause=0).path
+    db.add_record("2024-02-05", 5.0, "other")
+
+    report = maintenance.restore(db)
+    assert report.source == source
+    assert report.safety_copy is not None and maintenance.SAFETY_COPY_SUFFIX in report.safety_copy.name
+    assert db.get_grand_total() == 100.0
+    assert db.rebuild_rollups(repair=False) == []
+
+    saved = Database(report.safety_copy, storage_profile="read-only")
+    try:
+        assert saved.get_grand_total() == 105.0
+    finally:
+        saved.close()
+
+
+def test_safety_copies_are_not_default_source_nor_rotated(db: Database):
+    db.add_record("2024-01-05", 100.0, "salary")
+    regular = maintenance.backup(db, pause=0).path
+    age(regular, 1000)
+    first = maintenance.restore(db)
+    second = maintenance.restore(db)
+    # вторая копия перед восстановлением новее обычной, но по умолчанию берётся обычная
+    assert second.source == regular
+    assert maintenance.list_backups(db) == [regular]
+    safety = maintenance.list_backups(db, safety_copies=True)
+    assert sorted(safety) == sorted([first.safety_copy, second.safety_copy])
+
+    for _ in range(3):
+        maintenance.backup(db, keep=1, pause=0)
+    assert len(maintenance.list_backups(db)) == 1
+    assert all(path.exists() for path in safety)
+
+
+def test_restore_without_backups_or_from_damaged_copy(db: Database, tmp_path):
+    db.add_record("2024-01-05", 1.0, "other")
+    with pytest.raises(FileNotFoundError):
+        maintenance.restore(db)
+    damaged = tmp_path / "damaged.db"
+    damaged.write_bytes(b"not a database" * 100)
+    with pytest.raises(sqlite3.DatabaseError):
+        maintenance.restore(db, damaged)
+    assert db.get_grand_total() == 1.0
+
+
+def test_compact_reclaims_space(db: Database):
+    db.add_records([(f"2024-01-{i % 28 + 1:02d}", float(i + 1), "other") for i in range(5000)])
+    db.delete_records_by_month("2024-01")
+    report = maintenance.compact(db, pause=0)
+    assert not report.full_vacuum and not report.needs_conversion
+    assert report.pages_freed > 0
+    assert report.size_after < report.size_before
+    assert maintenance.due_tasks(db) == ["backup"]
+
+
+def test_old_database_is_converted_only_on_request(db_path):
+    with closing(sqlite3.connect(db_path)) as connection:
+        # база, созданная до auto_vacuum=INCREMENTAL
+        connection.execute("CREATE TABLE placeholder (x)")
+    db = Database(db_path)
+    try:
+        db.add_record("2024-01-05", 1.0, "other")
+        idle = maintenance.compact(db, pause=0)
+        assert idle.needs_conversion and not idle.full_vacuum
+        assert "SalaryTracker compact" in idle.describe()
+
+        converted = maintenance.compact(db, pause=0, convert=True)
+        assert converted.full_vacuum and not converted.needs_conversion
+        with closing(sqlite3.connect(db_path)) as connection:
+            assert connection.execute("PRAGMA auto_vacuum").fetchone()[0] == maintenance.AUTO_VACUUM_INCREMENTAL
+        assert db.get_grand_total() == 1.0
+    finally:
+        db.close()
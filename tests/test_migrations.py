@@ -0,0 +1,142 @@
+"""Миграции схемы: новая база, обновление со старых версий, повторы зарплаты/аванса."""
+import sqlite3
+from contextlib import closing, contextmanager
+from typing import Iterator
+
+import pytest
+
+import migrations
+from database import Database
+
+
+@contextmanager
+def raw(path) -> Iterator[sqlite3.Connection]:
+    """Соединение sqlite3 мимо Database; изменения фиксируются на выходе."""
+    with closing(sqlite3.connect(path)) as connection, connection:
+        yield connection
+
+
+def execute_raw(path, *statements: str):
+    with raw(path) as connection:
+        for statement in statements:
+            connection.execute(statement)
+
+
+def schema_version(path) -> int:
+    with raw(path) as connection:
+        return int(connection.execute("SELECT value FROM settings WHERE key = 'schema_version'").fetchone()[0])
+
+
+def downgrade_to_v5(path):
+    """Схема версии 5: monthly_rollup без revision и триггеры без счётчика."""
+    execute_raw(
+        path,
+        *(f"DROP TRIGGER {name}" for name in migrations.ROLLUP_TRIGGER_NAMES),
+        "ALTER TABLE monthly_rollup DROP COLUMN revision",
+        *migrations.ORG_ROLLUP_TRIGGERS,
+        "UPDATE settings SET value = '5' WHERE key = 'schema_version'",
+    )
+
+
+def downgrade_to_v4(path):
+    """Схема версии 4: ещё без уникального индекса зарплаты/аванса."""
+    downgrade_to_v5(path)
+    execute_raw(
+        path,
+        "DROP INDEX ux_financial_records_once_per_month",
+        "UPDATE settings SET value = '4' WHERE key = 'schema_version'",
+    )
+
+
+def insert_raw(path, *records):
+    """Записи мимо Database — как их оставила старая версия приложения."""
+    with raw(path) as connection:
+        connection.executemany(
+            "INSERT INTO financial_records (org_id, date, amount, category, month) VALUES (1, ?, ?, ?, ?)",
+            [(date, amount, category, int(date[:4] + date[5:7])) for date, amount, category in records],
+        )
+
+
+@pytest.fixture
+def created(db: Database, db_path):
+    db.get_grand_total()
+    db.close()
+    return db_path
+
+
+def test_new_database_is_stamped_with_latest_version(created):
+    assert schema_version(created) == migrations.LATEST_VERSION
+
+
+def test_upgrade_from_v5_adds_rollup_revision(created):
+    downgrade_to_v5(created)
+    insert_raw(created, ("2024-01-05", 100.0, "salary"))
+
+    db = Database(created)
+    try:
+        assert db.get_monthly_breakdown("2024-01")["salary"] == 100.0
+        db.add_record("2024-01-20", 10.0, "other")
+        assert db.rebuild_rollups(repair=False) == []
+    finally:
+        db.close()
+    assert schema_version(created) == migrations.LATEST_VERSION
+    with raw(created) as connection:
+        revision = connection.execute("SELECT revision FROM monthly_rollup WHERE month = 202401").fetchone()[0]
+    assert revision == 1
+
+
+def test_duplicates_abort_upgrade_without_touching_data(created):
+    downgrade_to_v4(created)
+    insert_raw(
+        created,
+        ("2023-07-01", 100.0, "salary"),
+        ("2023-07-15", 50.0, "salary"),
+        ("2023-07-20", 5.0, "advance"),
+    )
+
+    db = Database(created)
+    try:
+        with pytest.raises(migrations.DuplicateRecordsError) as error:
+            db.get_grand_total()
+    finally:
+        db.close()
+    assert error.value.duplicates == [migrations.Duplicate(1, 202307, "salary", (1, 2))]
+    assert "2023-07" in str(error.value)
+    assert schema_version(created) == 4
+    with raw(created) as connection:
+        categories = connection.execute("SELECT category FROM financial_records ORDER BY id").fetchall()
+    assert categories == [("salary",), ("salary",), ("advance",)]
+
+
+def test_repair_duplicates_keeps_earliest_record(created):
+    downgrade_to_v4(created)
+    insert_raw(created, ("2023-07-01", 100.0, "salary"), ("2023-07-15", 50.0, "salary"))
+
+    db = Database(created)
+    try:
+        assert db.repair_duplicates() == [migrations.Duplicate(1, 202307, "salary", (1, 2))]
+        assert db.get_monthly_breakdown("2023-07") == {"salary": 100.0, "advance": 0.0, "other": 50.0}
+        assert db.repair_duplicates() == []
+    finally:
+        db.close()
+    assert schema_version(created) == migrations.LATEST_VERSION
+
+
+def test_repair_on_current_schema_is_a_no_op(db: Database):
+    db.add_record("2024-01-05", 100.0, "salary")
+    assert db.repair_duplicates() == []
+    assert db.get_monthly_breakdown("2024-01")["salary"] == 100.0
+
+
+def test_migrations_are_idempotent_on_current_tables(created):
+    # новая база проходит все миграции поверх таблиц, уже созданных create_all
+    insert_raw(created, ("2024-02-01", 70.0, "advance"))
+    execute_raw(created, "UPDATE settings SET value = '0' WHERE key = 'schema_version'")
+
+    db = Database(created)
+    try:
+        assert db.get_monthly_summary() == [("2024-02", 70.0, 70.0)]
+        assert db.rebuild_rollups(repair=False) == []
+    finally:
+        db.close()
+    assert schema_version(created) == migrations.LATEST_VERSION
@@ -0,0 +1,118 @@
+"""Суммы за периоды: PrefixSumIndex против прямого сложения месяцев и через Database."""
+import random
+
+import pytest
+
+from database import Database
+from periods import FIELDS, PADDING_MONTHS, PeriodTotals, PrefixSumIndex, index_month, month_index
+
+
+def brute_totals(values: dict[int, tuple], first: int, last: int) -> PeriodTotals:
+    sums = [0.0] * len(FIELDS)
+    for month, row in values.items():
+        if first <= month <= last:
+            sums = [s + v for s, v in zip(sums, row)]
+    salary, advance, other, total, records = sums
+    return PeriodTotals(salary, advance, other, total, round(records))
+
+
+def assert_totals(index: PrefixSumIndex, values: dict[int, tuple], first: int, last: int):
+    got, want = index.totals(first, last), brute_totals(values, first, last)
+    assert got.records == want.records
+    for name in FIELDS[:-1]:
+        assert getattr(got, name) == pytest.approx(getattr(want, name)), (first, last, name)
+
+
+def month_row(salary=0.0, advance=0.0, other=0.0, records=1) -> tuple:
+    return salary, advance, other, salary + advance + other, records
+
+
+def all_ranges(months: list[int]):
+    axis = range(month_index(months[0]) - 3, month_index(months[-1]) + 4)
+    for first in axis[::5]:
+        for last in axis[::7]:
+            yield index_month(first), index_month(last)
+
+
+def test_range_totals_match_brute_force():
+    rng = random.Random(19)
+    values = {
+        index_month(month_index(202001) + offset): month_row(rng.randint(0, 9) * 1000.0, 500.5, 0.25, rng.randint(1, 5))
+        for offset in rng.sample(range(60), 40)
+    }
+    index = PrefixSumIndex((month, *row) for month, row in values.items())
+    for first, last in all_ranges(sorted(values)):
+        assert_totals(index, values, first, last)
+    assert index.totals(202412, 202401) == PeriodTotals()
+    assert index.bounds() == (min(values), max(values))
+
+
+def test_empty_index():
+    index = PrefixSumIndex()
+    assert index.totals(202001, 203012) == PeriodTotals()
+    assert index.bounds() is None
+    index.set_month(202403, month_row(other=5.0))
+    assert index.totals(202401, 202412).other == 5.0
+
+
+def test_set_month_updates_and_removes():
+    values = {202401: month_row(salary=100.0), 202403: month_row(advance=40.0)}
+    index = PrefixSumIndex((month, *row) for month, row in values.items())
+
+    values[202403] = month_row(advance=40.0, other=2.0, records=2)
+    index.set_month(202403, values[202403])
+    values[202402] = month_row(other=7.0)
+    index.set_month(202402, values[202402])
+    del values[202401]
+    index.set_month(202401, None)
+    index.set_month(202312, None)  # месяца и не было
+
+    for first, last in all_ranges([202401, 202403]):
+        assert_totals(index, values, first, last)
+    assert index.bounds() == (202402, 202403)
+
+
+@pytest.mark.parametrize("offset", [PADDING_MONTHS, PADDING_MONTHS + 1, -PADDING_MONTHS - 1, 120, -120])
+def test_set_month_past_padding_rebuilds(offset):
+    values = {202401: month_row(salary=100.0), 202406: month_row(other=3.0)}
+    index = PrefixSumIndex((month, *row) for month, row in values.items())
+    edge = 202406 if offset > 0 else 202401
+    far = index_month(month_index(edge) + offset)
+    values[far] = month_row(advance=9.0)
+    index.set_month(far, values[far])
+
+    for first, last in all_ranges(sorted(values)):
+        assert_totals(index, values, first, last)
+    assert index.bounds() == (min(values), max(values))
+    # после пересборки обновления внутри оси снова идут по дереву
+    values[202406] = month_row(other=4.0)
+    index.set_month(202406, values[202406])
+    assert_totals(index, values, min(values), max(values))
+
+
+def test_database_periods_follow_writes(db: Database):
+    assert db.get_month_range() is None
+    assert db.get_period_totals("2024-01", "2024-12") == PeriodTotals()
+
+    db.add_records([("2024-01-05", 100.0, "salary"), ("2024-02-20", 40.0, "advance")])
+    assert db.get_month_range() == ("2024-01", "2024-02")
+    assert db.get_period_totals("2024-01", "2024-12") == PeriodTotals(100.0, 40.0, 0.0, 140.0, 2)
+
+    # индекс уже построен: записи далеко за его осью и удаления идут через set_month
+    db.add_record("2031-07-01", 5.0, "other")
+    db.add_record("2019-03-01", 1.0, "other")
+    assert db.get_month_range() == ("2019-03", "2031-07")
+    assert db.get_period_totals("2019-01", "2031-12").total == 146.0
+
+    record = db.get_records_by_month("2024-02")[0]
+    db.update_record(record.id, "2024-03-01", 50.0, "advance")
+    assert db.get_period_totals("2024-02", "2024-02") == PeriodTotals()
+    assert db.get_period_totals("2024-01", "2024-03") == PeriodTotals(100.0, 50.0, 0.0, 150.0, 2)
+
+    db.delete_records_by_month("2019-03")
+    db.delete_records_by_month("2031-07")
+    assert db.get_month_range() == ("2024-01", "2024-03")
+    assert db.get_period_totals("2000-01", "2099-12").total == 150.0
+
+    with pytest.raises(ValueError):
+        db.get_period_totals("2024", "2024-12")
@@ -0,0 +1,76 @@
+"""
+Планы запросов: помесячные методы Database идут через индексы (org_id, month, ...),
+а сводка — через monthly_rollup, без полного просмотра financial_records.
+В базе две организации, чтобы фильтр по org_id участвовал в выборе плана.
+"""
+import pytest
+from sqlalchemy import event
+
+from database import Database
+
+MONTH = "2025-03"
+
+# метод -> аргументы; все они должны обходиться без полного просмотра financial_records
+MONTH_SCOPED_CALLS = {
+    "get_monthly_summary": (),
+    "get_records_by_month": (MONTH,),
+    "get_records_page": (MONTH, (f"{MONTH}-10", 1), 50),
+    "get_monthly_summary_page": ("2024-12", 50),
+    "get_monthly_breakdown": (MONTH,),
+    "has_salary_or_advance_in_month": (MONTH, "salary"),
+    "get_month_status": (MONTH,),
+    "add_record": (f"{MONTH}-26", 1.0, "other"),
+    # запись 3 — аванс второй организации
+    "update_records": ([(3, f"{MONTH}-11", 2000.0, "advance")],),
+    "delete_records": ([3],),
+    "delete_records_by_month": (MONTH,),
+    "get_grand_total": (),
+    "count_records": (),
+    "poll_changes": (),
+}
+
+
+@pytest.fixture
+def two_orgs(db: Database) -> Database:
+    db.add_record(f"{MONTH}-10", 40000.0, "advance")
+    db.add_record(f"{MONTH}-25", 60000.0, "salary")
+    db.switch_organization(db.create_organization("Вторая"))
+    db.add_record(f"{MONTH}-10", 1000.0, "advance")
+    return db
+
+
+def capture_statements(db: Database, method_name: str, args: tuple) -> list[tuple[str, object]]:
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith("EXPLAIN"):
+            # у executemany план один на все наборы параметров
+            statements.append((statement, parameters[0] if executemany else parameters))
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        getattr(db, method_name)(*args)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+    return statements
+
+
+def query_plan(db: Database, statement: str, parameters) -> list[str]:
+    with db.engine.connect() as connection:
+        cursor = connection.connection.cursor()
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+@pytest.mark.parametrize("method_name", MONTH_SCOPED_CALLS)
+def test_no_full_scan_of_records(two_orgs: Database, method_name: str):
+    statements = capture_statements(two_orgs, method_name, MONTH_SCOPED_CALLS[method_name])
+    for statement, parameters in statements:
+        plan = query_plan(two_orgs, statement, parameters)
+        scans = [line for line in plan if line.startswith("SCAN") and "financial_records" in line]
+        assert not scans, f"{statement}: {' | '.join(plan)}"
+
+
+def test_poll_changes_queries_are_captured(two_orgs: Database):
+    # первый вызов снимает снимок monthly_rollup — проверка выше не должна быть пустой
+    assert capture_statements(two_orgs, "poll_changes", ())
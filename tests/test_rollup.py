@@ -0,0 +1,66 @@
+"""monthly_rollup, которую ведут триггеры, совпадает с financial_records после любой записи."""
+import pytest
+
+from database import Database
+from validation import DuplicateRecordError
+
+
+def expected_summary(records) -> dict[str, tuple[float, int]]:
+    months: dict[str, tuple[float, int]] = {}
+    for _id, date, amount, _category in records:
+        total, count = months.get(date[:7], (0.0, 0))
+        months[date[:7]] = (total + amount, count + 1)
+    return months
+
+
+def assert_consistent(db: Database):
+    assert db.rebuild_rollups(repair=False) == []
+    expected = expected_summary(db.get_all_records())
+    assert {month: total for month, total, _shown in db.get_monthly_summary()} == {
+        month: pytest.approx(total) for month, (total, _count) in expected.items()
+    }
+
+
+def test_add_update_delete_keep_rollup_in_sync(db: Database):
+    db.add_record("2024-01-05", 100.0, "salary")
+    db.add_records([("2024-01-20", 40.0, "advance"), ("2024-02-03", 7.5, "other")])
+    assert_consistent(db)
+
+    first = db.get_records_by_month("2024-01")[0]
+    db.update_record(first.id, "2024-03-05", 120.0, "salary")  # запись переезжает в другой месяц
+    assert_consistent(db)
+    assert db.get_monthly_breakdown("2024-03") == {"salary": 120.0, "advance": 0.0, "other": 0.0}
+
+    db.delete_records([record.id for record in db.get_records_by_month("2024-02")])
+    assert "2024-02" not in {month for month, _total, _shown in db.get_monthly_summary()}
+    db.delete_records_by_month("2024-01")
+    assert_consistent(db)
+    assert db.get_grand_total() == 120.0
+
+
+def test_rejected_write_leaves_rollup_untouched(db: Database):
+    db.add_record("2024-01-05", 100.0, "salary")
+    with pytest.raises(DuplicateRecordError):
+        db.add_records([("2024-01-06", 1.0, "other"), ("2024-01-25", 200.0, "salary")])
+    assert_consistent(db)
+    assert db.get_grand_total() == 100.0
+
+
+def test_rollup_is_per_organization(db: Database):
+    db.add_record("2024-01-05", 100.0, "salary")
+    first = db.org_id
+    db.switch_organization(db.create_organization("Вторая"))
+    db.add_record("2024-01-05", 5.0, "salary")
+    assert db.get_monthly_summary() == [("2024-01", 5.0, 0.0)]
+    assert_consistent(db)
+    db.switch_organization(first)
+    assert db.get_grand_total() == 100.0
+    assert_consistent(db)
+
+
+def test_rebuild_rollups_repairs_drift(db: Database):
+    db.add_record("2024-01-05", 100.0, "salary")
+    with db.engine.begin() as connection:
+        connection.exec_driver_sql("UPDATE monthly_rollup SET total = total + 1")
+    assert db.rebuild_rollups() == ["2024-01"]
+    assert_consistent(db)
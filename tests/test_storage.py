@@ -0,0 +1,27 @@
+"""Профили хранения: PRAGMA новых соединений пула."""
+import sqlite3
+from contextlib import closing
+
+from database import Database
+from storage import PROFILES, create_storage_engine
+
+
+def test_new_database_uses_incremental_auto_vacuum(db: Database, db_path):
+    db.get_grand_total()
+    with closing(sqlite3.connect(db_path)) as connection:
+        assert connection.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+
+def test_new_connection_opens_while_another_writes(db: Database, db_path):
+    db.add_record("2024-01-05", 1.0, "other")
+    engine = create_storage_engine(db_path, PROFILES["durable"])
+    with closing(sqlite3.connect(db_path, isolation_level=None)) as writer:
+        writer.execute("BEGIN IMMEDIATE")
+        writer.execute("DELETE FROM financial_records")
+        try:
+            # PRAGMA нового соединения не ждут блокировку записи, чтение идёт по снимку WAL
+            with engine.connect() as connection:
+                assert connection.exec_driver_sql("SELECT COUNT(*) FROM financial_records").scalar() == 1
+        finally:
+            writer.execute("ROLLBACK")
+            engine.dispose()
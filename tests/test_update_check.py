@@ -0,0 +1,200 @@
+"""
+Кэш проверки обновлений (update_check) на локальной заглушке GitHub API.
+
+Заглушка на 127.0.0.1 отдаёт релиз с ETag и Last-Modified, отвечает 304 на
+совпавший If-None-Match и запоминает заголовки запросов. Каждый тест — синхронная
+функция, которая запускает свой сценарий через asyncio.run.
+"""
+import asyncio
+import json
+from pathlib import Path
+from typing import Awaitable, Callable
+
+import pytest
+
+from update_check import UpdateChecker, UpdateCheckError
+
+LAST_MODIFIED = "Wed, 01 Jan 2025 00:00:00 GMT"
+
+
+class StubGitHub:
+    """Минимальный HTTP/1.1-сервер с ответом releases/latest."""
+
+    def __init__(self, tag: str):
+        self.tag = tag
+        self.status = 200
+        self.requests: list[dict[str, str]] = []
+        self.server: asyncio.Server | None = None
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.tag}"'
+
+    @property
+    def url(self) -> str:
+        assert self.server is not None
+        port = self.server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/repos/owner/repo/releases/latest"
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+
+    async def close(self):
+        assert self.server is not None
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                headers = {}
+                for line in head[1:]:
+                    name, _, value = line.partition(":")
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+                self.requests.append(headers)
+                # пауза, за которую одновременные проверки успевают встать в очередь за одним ответом
+                await asyncio.sleep(0.05)
+                writer.write(self._response(headers))
+                await writer.drain()
+        finally:
+            writer.close()
+
+    def _response(self, headers: dict[str, str]) -> bytes:
+        if self.status != 200:
+            body, status = b"{}", f"{self.status} Error"
+        elif headers.get("if-none-match") == self.etag:
+            body, status = b"", "304 Not Modified"
+        else:
+            body, status = json.dumps({"tag_name": f"v{self.tag}"}).encode(), "200 OK"
+        head = (
+            f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+            f"ETag: {self.etag}\r\nLast-Modified: {LAST_MODIFIED}\r\n\r\n"
+        )
+        return head.encode("latin-1") + body
+
+
+Scenario = Callable[[StubGitHub, UpdateChecker], Awaitable[None]]
+
+
+@pytest.fixture
+def cache_path(tmp_path) -> Path:
+    return tmp_path / "update_check.json"
+
+
+@pytest.fixture
+def run(cache_path: Path) -> Callable[[Scenario], None]:
+    """Выполняет сценарий с заглушкой и UpdateChecker, настроенным на неё."""
+
+    def run_scenario(scenario: Scenario):
+        async def main():
+            stub = StubGitHub("9.9.0")
+            await stub.start()
+            checker = UpdateChecker(url=stub.url, cache_path=cache_path)
+            try:
+                await scenario(stub, checker)
+            finally:
+                await checker.aclose()
+                await stub.close()
+
+        asyncio.run(main())
+
+    return run_scenario
+
+
+def test_first_check_fetches_release(run):
+    async def scenario(stub: StubGitHub, checker: UpdateChecker):
+        check = await checker.check()
+        assert len(stub.requests) == 1
+        assert check.latest_version == "9.9.0" and check.is_newer()
+        assert (check.etag, check.last_modified) == (stub.etag, LAST_MODIFIED)
+
+    run(scenario)
+
+
+def test_fresh_result_is_served_from_cache(run, cache_path):
+    async def scenario(stub: StubGitHub, checker: UpdateChecker):
+        check = await checker.check()
+        await checker.check()
+        assert len(stub.requests) == 1
+
+        restarted = UpdateChecker(url=stub.url, cache_path=cache_path)
+        try:
+            assert restarted.cached() == check
+            await restarted.check()
+        finally:
+            await restarted.aclose()
+        assert len(stub.requests) == 1
+
+    run(scenario)
+
+
+def test_forced_check_revalidates_with_304(run):
+    async def scenario(stub: StubGitHub, checker: UpdateChecker):
+        check = await checker.check()
+        revalidated = await checker.check(force=True)
+        last = stub.requests[-1]
+        assert last.get("if-none-match") == stub.etag
+        assert last.get("if-modified-since") == LAST_MODIFIED
+        assert revalidated.latest_version == "9.9.0"
+        assert revalidated.checked_at >= check.checked_at
+
+    run(scenario)
+
+
+def test_new_release_replaces_cached_version(run):
+    async def scenario(stub: StubGitHub, checker: UpdateChecker):
+        await checker.check()
+        stub.tag = "10.0.0"
+        released = await checker.check(force=True)
+        assert (released.latest_version, released.etag) == ("10.0.0", stub.etag)
+
+    run(scenario)
+
+
+def test_concurrent_checks_share_one_request(run):
+    async def scenario(stub: StubGitHub, checker: UpdateChecker):
+        await asyncio.gather(*(checker.check(force=True) for _ in range(3)))
+        assert len(stub.requests) == 1
+
+    run(scenario)
+
+
+def test_server_error_keeps_cache(run):
+    async def scenario(stub: StubGitHub, checker: UpdateChecker):
+        await checker.check()
+        stub.status = 500
+        with pytest.raises(UpdateCheckError, match="500"):
+            await checker.check(force=True)
+        cached = checker.cached()
+        assert cached is not None and cached.latest_version == "9.9.0"
+
+    run(scenario)
+
+
+def test_cache_is_per_url(run, cache_path):
+    async def scenario(stub: StubGitHub, checker: UpdateChecker):
+        await checker.check()
+        assert UpdateChecker(url=stub.url + "?other", cache_path=cache_path).cached() is None
+
+    run(scenario)
+
+
+def test_unreachable_server_reports_error(cache_path):
+    async def scenario():
+        stub = StubGitHub("9.9.0")
+        await stub.start()
+        url = stub.url
+        await stub.close()  # порт свободен: подключиться некуда
+        checker = UpdateChecker(url=url, cache_path=cache_path)
+        try:
+            with pytest.raises(UpdateCheckError, match="подключения"):
+                await checker.check()
+        finally:
+            await checker.aclose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,165 @@
+"""
+Проверка новой версии на GitHub с кэшем и условными запросами.
+
+Ответ GitHub (тег последнего релиза, ETag, Last-Modified) хранится в небольшом
+JSON-файле в каталоге кэша пользователя. Пока с последней успешной проверки
+не прошло UPDATE_CHECK_TTL, check() отвечает из кэша без сети; потом
+перепроверяет с If-None-Match/If-Modified-Since, и неизменившийся релиз
+приходит коротким 304. Кэш лежит в файле, а не в settings базы: запись в базу
+меняла бы Database.data_version и сбрасывала ETag-и локального API.
+
+Один UpdateChecker держит общий httpx.AsyncClient со строгими таймаутами;
+одновременные проверки (фоновая при запуске и кнопка "Проверить") делят
+один запрос. Адрес можно подменить переменной окружения SALARY_UPDATE_URL —
+например, на локальную заглушку (её использует tests/test_update_check.py).
+httpx импортируется при первом запросе, а не при запуске приложения.
+"""
+import asyncio
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from platformdirs import user_cache_dir
+
+from app.constants import APP_NAME, APP_VERSION, GITHUB_REPO
+
+if TYPE_CHECKING:
+    import httpx
+
+APP_AUTHOR = "SalaryAuthor"  # как в database.py
+
+GITHUB_API_URL = f"https://api.github.com/repos/{GITHUB_REPO}/releases/latest"
+GITHUB_RELEASES_PAGE = f"https://github.com/{GITHUB_REPO}/releases"
+UPDATE_URL_ENV = "SALARY_UPDATE_URL"
+UPDATE_CACHE_PATH = Path(user_cache_dir(APP_NAME, APP_AUTHOR)) / "update_check.json"
+
+# не чаще раза в шесть часов; кнопка "Проверить" перепроверяет сразу
+UPDATE_CHECK_TTL = 6 * 60 * 60
+# проверка обновлений не должна заметно висеть ни при запуске, ни в окне "О версии"
+CONNECT_TIMEOUT = 3.0
+READ_TIMEOUT = 5.0
+
+
+class UpdateCheckError(Exception):
+    """Проверка не удалась; текст пригоден для показа пользователю."""
+
+
+@dataclass(frozen=True)
+class ReleaseCheck:
+    """Результат последней успешной проверки."""
+    latest_version: str         # тег релиза без "v"
+    checked_at: float           # time.time() последнего ответа 200 или 304
+    etag: str | None = None
+    last_modified: str | None = None
+    url: str = GITHUB_API_URL
+
+    def is_newer(self, current: str = APP_VERSION) -> bool:
+        return self.latest_version != current.lstrip("v")
+
+    def is_fresh(self, ttl: float, now: float | None = None) -> bool:
+        return (time.time() if now is None else now) - self.checked_at < ttl
+
+
+class UpdateChecker:
+    def __init__(
+        self,
+        url: str | None = None,
+        cache_path: Path | str = UPDATE_CACHE_PATH,
+        ttl: float = UPDATE_CHECK_TTL,
+    ):
+        """url по умолчанию — из SALARY_UPDATE_URL или GITHUB_API_URL."""
+        self.url = url or os.environ.get(UPDATE_URL_ENV) or GITHUB_API_URL
+        self.cache_path = Path(cache_path)
+        self.ttl = ttl
+        self._client: "httpx.AsyncClient | None" = None
+        self._lock: asyncio.Lock | None = None
+
+    def cached(self) -> ReleaseCheck | None:
+        """Последний сохранённый результат для этого адреса (без сети) или None."""
+        try:
+            data = json.loads(self.cache_path.read_text(encoding="utf-8"))
+            check = ReleaseCheck(**data)
+        except (OSError, ValueError, TypeError):
+            return None
+        return check if check.url == self.url else None
+
+    def _save(self, check: ReleaseCheck):
+        # кэш пишется через временный файл, чтобы оборванная запись не испортила прежний
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(asdict(check)), encoding="utf-8")
+            os.replace(tmp, self.cache_path)
+        except OSError:
+            pass  # без кэша проверка просто повторится в следующий раз
+
+    def _http(self) -> "httpx.AsyncClient":
+        if self._client is None:
+            import httpx
+
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+                headers={"Accept": "application/vnd.github+json", "User-Agent": f"{APP_NAME}/{APP_VERSION}"},
+                follow_redirects=True,
+            )
+        return self._client
+
+    async def check(self, force: bool = False) -> ReleaseCheck:
+        """
+        Свежий результат из кэша или ответ GitHub. force=True перепроверяет
+        даже свежий кэш (условным запросом, если есть ETag/Last-Modified).
+        Бросает UpdateCheckError.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        started = time.time()
+        async with self._lock:
+            cached = self.cached()
+            # пока ждали блокировку, другая проверка могла уже сходить в сеть
+            if cached is not None and (cached.is_fresh(self.ttl) if not force else cached.checked_at >= started):
+                return cached
+            result = await self._fetch(cached)
+            self._save(result)
+            return result
+
+    async def _fetch(self, cached: ReleaseCheck | None) -> ReleaseCheck:
+        import httpx
+
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+        try:
+            resp = await self._http().get(self.url, headers=headers)
+        except httpx.TimeoutException:
+            raise UpdateCheckError("Сервер обновлений не ответил вовремя") from None
+        except httpx.TransportError:
+            raise UpdateCheckError("Нет подключения к интернету") from None
+
+        if resp.status_code == 304 and cached is not None:
+            return replace(cached, checked_at=time.time())
+        if resp.status_code == 404:
+            raise UpdateCheckError("Репозиторий не найден (404)")
+        if resp.status_code != 200:
+            raise UpdateCheckError(f"Ошибка GitHub: {resp.status_code}")
+        try:
+            tag = str(resp.json()["tag_name"])
+        except (ValueError, KeyError, TypeError):
+            raise UpdateCheckError("Неожиданный ответ GitHub") from None
+        return ReleaseCheck(
+            latest_version=tag.lstrip("v"),
+            checked_at=time.time(),
+            etag=resp.headers.get("ETag"),
+            last_modified=resp.headers.get("Last-Modified"),
+            url=self.url,
+        )
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
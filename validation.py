@@ -0,0 +1,84 @@
+"""
+Правила проверки записи о доходе — общие для AddRecordDialog и импорта.
+"""
+import math
+from datetime import date, datetime
+from functools import lru_cache
+
+CATEGORIES = ("salary", "advance", "other")
+# Категории, которые допускаются не более одного раза в месяц
+ONCE_PER_MONTH = ("salary", "advance")
+CATEGORY_NAMES = {"salary": "зарплата", "advance": "аванс", "other": "другое"}
+
+
+class RecordValidationError(ValueError):
+    """Запись не проходит проверку; текст исключения можно показать пользователю."""
+
+
+class DuplicateRecordError(RecordValidationError):
+    """Зарплата или аванс в месяце уже есть; бросает Database при конфликте с уникальным индексом."""
+
+    def __init__(self, category: str):
+        super().__init__(duplicate_message(category))
+        self.category = category
+
+
+@lru_cache(maxsize=65536)
+def parse_date(date_str: str) -> date:
+    """Разбирает "YYYY-MM-DD" так же, как datetime.strptime(date_str, "%Y-%m-%d").
+
+    Канонические строки разбираются напрямую, а результаты кэшируются: в журнале
+    даты повторяются, и при импорте миллионов строк это заметно быстрее strptime.
+    """
+    if len(date_str) == 10 and date_str[4] == "-" and date_str[7] == "-":
+        year, month, day = date_str[:4], date_str[5:7], date_str[8:]
+        if year.isdigit() and month.isdigit() and day.isdigit() and year.isascii() and month.isascii() and day.isascii():
+            return date(int(year), int(month), int(day))
+    return datetime.strptime(date_str, "%Y-%m-%d").date()
+
+
+def duplicate_message(category: str) -> str:
+    return f"В этом месяце уже есть запись '{CATEGORY_NAMES[category]}'. Нельзя добавить вторую."
+
+
+def parse_amount(amount) -> float:
+    """Сумма записи: конечное положительное число."""
+    try:
+        value = float(str(amount).strip())
+        if not (value > 0 and math.isfinite(value)):
+            raise ValueError
+    except ValueError:
+        raise RecordValidationError("Сумма должна быть положительным числом") from None
+    return value
+
+
+def validate_record(date_str: str | None, amount, category: str = "other") -> tuple[str, float, str, int]:
+    """
+    Проверяет поля записи и возвращает (дата, сумма, категория, месяц YYYYMM).
+    Правило "одна зарплата/один аванс в месяц" проверяет база: методы записи
+    Database (add_record(s), update_record(s)) бросают DuplicateRecordError.
+    """
+    # из JSON (импорт, API) может прийти что угодно, не только строка
+    if date_str is not None and not isinstance(date_str, str):
+        raise RecordValidationError("Дата должна быть строкой ГГГГ-ММ-ДД")
+    if category is not None and not isinstance(category, str):
+        raise RecordValidationError("Категория должна быть строкой")
+
+    date_str = (date_str or "").strip()
+    amount_str = "" if amount is None else str(amount).strip()
+    category = (category or "other").strip()
+
+    if not date_str or not amount_str:
+        raise RecordValidationError("Заполните все поля")
+
+    amount = parse_amount(amount_str)
+
+    try:
+        parsed = parse_date(date_str)
+    except ValueError:
+        raise RecordValidationError("Неверный формат даты (используйте ГГГГ-ММ-ДД)") from None
+
+    if category not in CATEGORIES:
+        raise RecordValidationError(f"Неизвестная категория '{category}'")
+
+    return date_str, amount, category, parsed.year * 100 + parsed.month